@@ -1,11 +1,21 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, status
-from main import ExcelProcessor
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from main import ExcelProcessor, PROCESSOR_VERSION, DEFAULT_DATABASE_URL, init_database, parse_file_worker
+from result_cache import ResultCache
+from database.engine import get_engine, dispose_engines
+from executors import DEFAULT_BATCH_PARALLELISM, ExecutorLayer, fan_out
+from jobs import JOB_SUCCEEDED, JobQueue, open_job_store
+from result_stream import iter_ndjson, select_result
 from printer import PrintManager
 from template_manager import TemplateManager
-import tempfile
+import aiofiles
+import aiofiles.tempfile
+import hashlib
 import os
+import json
 import uvicorn
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 import logging
@@ -17,6 +27,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ชื่อไฟล์ต้นทางที่ใช้เมื่อ client ไม่ได้ส่งชื่อไฟล์มากับการอัปโหลด
+DEFAULT_UPLOAD_NAME = "upload"
+
+# ขนาดข้อมูลที่อ่านจากไฟล์อัปโหลดต่อครั้งขณะเขียนลงดิสก์
+DEFAULT_UPLOAD_CHUNK_SIZE = int(os.getenv("API_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
 app = FastAPI(
     title="Excel Processor API",
     description="ระบบประมวลผลและจัดการเทมเพลต Excel อัจฉริยะ",
@@ -26,6 +42,30 @@ app = FastAPI(
 # สร้าง instances ที่ใช้งานร่วมกัน
 print_manager = PrintManager()
 template_manager = TemplateManager()
+result_cache = ResultCache(version=PROCESSOR_VERSION)
+database_engine = get_engine(DEFAULT_DATABASE_URL)
+executors = ExecutorLayer()
+job_queue = JobQueue(
+    open_job_store(), executors,
+    lambda file_path, **options: ExcelProcessor(
+        file_path, cache=result_cache, engine=database_engine, **options
+    )
+)
+
+@app.on_event("startup")
+async def startup():
+    """เตรียมโครงสร้างฐานข้อมูลครั้งเดียวเมื่อเริ่มระบบ"""
+    init_database(database_engine)
+    interrupted = await executors.run_io(job_queue.store.fail_interrupted)
+    if interrupted:
+        logger.warning(f"พบงานที่ค้างจากการปิดระบบครั้งก่อน {interrupted} งาน")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """ปิด pool ของงานเบื้องหลังและ connection pool ของฐานข้อมูล"""
+    await job_queue.shutdown()
+    executors.shutdown()
+    dispose_engines()
 
 class Template(BaseModel):
     name: str
@@ -50,29 +90,142 @@ class SystemStatus(BaseModel):
     components: Dict[str, bool]
     template_count: int
     printer_count: int
+    executors: Dict[str, Any] = {}
+
+def _source_name(file: UploadFile) -> str:
+    """ชื่อไฟล์ต้นทางสำหรับบันทึกในฐานข้อมูล (ชื่อไฟล์ที่อัปโหลดไม่รวมนามสกุล)"""
+    return os.path.splitext(file.filename or "")[0] or DEFAULT_UPLOAD_NAME
+
+async def _save_upload(file: UploadFile, directory: Optional[str] = None,
+                       chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE) -> Tuple[str, str]:
+    """
+    เขียนไฟล์ที่อัปโหลดลงไฟล์ชั่วคราวทีละ chunk และคำนวณ SHA-256 ไประหว่างเขียน
+    
+    หน่วยความจำที่ใช้ไม่ขึ้นกับขนาดไฟล์ และได้ content_hash สำหรับแคชโดยไม่ต้องอ่านไฟล์ซ้ำ
+    
+    Returns:
+        (พาธของไฟล์ชั่วคราว, SHA-256 ของเนื้อหาแบบ hex)
+    """
+    digest = hashlib.sha256()
+    async with aiofiles.tempfile.NamedTemporaryFile(
+        "wb", delete=False, suffix=".xlsx", dir=directory
+    ) as temp_file:
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await temp_file.write(chunk)
+        except BaseException:
+            await temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+    return temp_file.name, digest.hexdigest()
+
+async def _process_upload(file_path: str, **options) -> Dict[str, Any]:
+    """
+    ประมวลผลไฟล์โดยไม่บล็อก event loop
+    
+    อ่านแคชและบันทึกลงฐานข้อมูลใน thread pool ส่วนการแยกวิเคราะห์ไฟล์ใช้ process pool
+    """
+    processor = ExcelProcessor(file_path, cache=result_cache, engine=database_engine, **options)
+    if processor.incremental:
+        # incremental อ่านไฟล์สลับกับเทียบลายนิ้วมือในฐานข้อมูลภายใน transaction เดียว
+        return await executors.run_io(processor.process_file)
+    
+    cached = await executors.run_io(processor.cached_result)
+    if cached is not None:
+        return cached
+    processed_data = await executors.run_cpu(parse_file_worker, file_path, processor.parse_options)
+    await executors.run_io(processor.store, processed_data)
+    return processed_data
 
 @app.post("/process-excel/")
-async def process_excel_file(file: UploadFile = File(...)):
-    """อัปโหลดและประมวลผลไฟล์ Excel"""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-        content = await file.read()
-        temp_file.write(content)
-        temp_file_path = temp_file.name
+async def process_excel_file(
+    file: UploadFile = File(...),
+    incremental: bool = False,
+    stream: bool = False,
+    include_structure: bool = True,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    อัปโหลดและประมวลผลไฟล์ Excel
+    
+    incremental=true จะบันทึกใหม่เฉพาะ sheet และ block แถวที่เปลี่ยนจากการอัปโหลด
+    ไฟล์ชื่อเดียวกันครั้งก่อน และคืนสรุปผลแยกตาม sheet แทนข้อมูลที่ประมวลผลแล้ว
+    
+    ลดขนาดผลลัพธ์ของไฟล์ใหญ่ได้ด้วย:
+    - include_structure=false ไม่ส่งข้อมูลการจัดรูปแบบรายเซลล์
+    - offset และ limit แบ่งหน้าแถว content ของแต่ละ sheet (ได้ total_rows เพิ่มต่อ sheet)
+    - stream=true ส่งผลเป็น NDJSON ทีละ sheet และทีละแถว (ดู result_stream.iter_ndjson)
+    """
+    temp_file_path, content_hash = await _save_upload(file)
 
     try:
-        processor = ExcelProcessor(temp_file_path)
-        result = processor.process_file()
-        return {"status": "success", "data": result}
+        async with executors.slot("process-excel"):
+            result = await _process_upload(
+                temp_file_path, incremental=incremental, content_hash=content_hash,
+                source_name=_source_name(file)
+            )
+        if stream:
+            return StreamingResponse(
+                iter_ndjson(result, include_structure, offset, limit),
+                media_type="application/x-ndjson"
+            )
+        return {"status": "success", "data": select_result(result, include_structure, offset, limit)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     finally:
         os.unlink(temp_file_path)
 
+@app.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(file: UploadFile = File(...), incremental: bool = False):
+    """
+    รับไฟล์ Excel เข้าคิวประมวลผลในเบื้องหลัง แล้วคืนรหัสงานทันที
+    
+    ใช้แทน /process-excel/ สำหรับไฟล์ใหญ่ที่ประมวลผลนานเกิน timeout ของ proxy
+    ติดตามความคืบหน้าที่ GET /jobs/{job_id} และรับผลที่ GET /jobs/{job_id}/result
+    """
+    file_path, content_hash = await _save_upload(file, directory=job_queue.upload_dir)
+    try:
+        job = await job_queue.submit(
+            file_path, file.filename, incremental=incremental, content_hash=content_hash,
+            source_name=_source_name(file)
+        )
+    except Exception:
+        _remove_upload(file_path)
+        raise
+    return {"status": "success", "job_id": job["id"], "job": job}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """สถานะและความคืบหน้าของงาน (จำนวน sheet ที่เสร็จและจำนวนแถวที่ประมวลผลแล้ว)"""
+    job = await executors.run_io(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"ไม่พบงาน {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """ผลลัพธ์ของงานที่เสร็จแล้ว (409 ถ้างานยังไม่เสร็จหรือล้มเหลว)"""
+    job = await executors.run_io(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"ไม่พบงาน {job_id}")
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"status": job["status"], "error": job["error"]}
+        )
+    result = await executors.run_io(job_queue.result, job_id)
+    return {"status": "success", "data": result}
+
 @app.post("/save-template/")
 async def save_template(template: Template):
     """บันทึกเทมเพลต"""
     try:
-        processor = ExcelProcessor("")  # สร้างอินสแตนซ์เปล่า
+        processor = ExcelProcessor("", engine=database_engine)  # สร้างอินสแตนซ์เปล่า
         processor.save_as_template(template.name, template.structure)
         return {"status": "success", "message": f"บันทึกเทมเพลต {template.name} เรียบร้อยแล้ว"}
     except Exception as e:
@@ -207,7 +360,8 @@ async def check_system_status():
             "version": "1.0.0",
             "components": components,
             "template_count": len(template_manager.list_templates()),
-            "printer_count": len(print_manager.get_available_printers())
+            "printer_count": len(print_manager.get_available_printers()),
+            "executors": executors.metrics()
         }
     except Exception as e:
         logger.error(f"เกิดข้อผิดพลาดในการตรวจสอบสถานะ: {str(e)}")
@@ -216,6 +370,11 @@ async def check_system_status():
             detail="ไม่สามารถตรวจสอบสถานะระบบได้"
         )
 
+@app.get("/metrics/executors")
+async def executor_metrics():
+    """ตัวชี้วัดของ process pool, thread pool และความยาวคิวของแต่ละ endpoint"""
+    return executors.metrics()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """จัดการข้อผิดพลาดทั้งหมดในระบบ"""
@@ -226,29 +385,77 @@ async def global_exception_handler(request, exc):
         "path": request.url.path
     }
 
-@app.post("/templates/bulk-suggest")
-async def bulk_suggest_templates(files: List[UploadFile] = File(...)):
-    """แนะนำเทมเพลตสำหรับไฟล์หลายไฟล์พร้อมกัน"""
+def _remove_upload(file_path: str) -> None:
+    """ลบไฟล์ชั่วคราวของไฟล์ที่อัปโหลด (ถ้ายังอยู่)"""
+    if os.path.exists(file_path):
+        os.unlink(file_path)
+
+async def _stream_batch(files: List[UploadFile], handle: Callable[..., Awaitable[Any]],
+                        result_key: str, max_parallel: int) -> StreamingResponse:
+    """
+    ประมวลผลไฟล์ที่อัปโหลดพร้อมกัน แล้วส่งผลกลับเป็น NDJSON ตามลำดับที่ประมวลผลเสร็จ
+    
+    หนึ่งบรรทัดต่อไฟล์ ไฟล์ที่ล้มเหลวได้บรรทัด status "error" โดยไม่หยุดไฟล์อื่น:
+    {"index": 0, "filename": "a.xlsx", "status": "success", "<result_key>": ...}
+    {"index": 1, "filename": "b.xlsx", "status": "error", "error": "..."}
+    
+    handle รับพาธของไฟล์ชั่วคราว และตัวเลือกของ ExcelProcessor (content_hash, source_name)
+    """
+    # เขียนไฟล์ลงดิสก์ก่อนเริ่มส่งผล เพราะ UploadFile ใช้ได้เฉพาะระหว่างรับ request
+    uploads = []
     try:
-        results = []
         for file in files:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                
-                # วิเคราะห์และแนะนำเทมเพลต
-                processor = ExcelProcessor(temp_file.name)
-                data = processor.process_file()
-                suggestions = template_manager.suggest_template(data)
-                
-                results.append({
-                    "filename": file.filename,
-                    "suggestions": suggestions
-                })
-                
-                os.unlink(temp_file.name)
-                
-        return {"status": "success", "data": results}
+            file_path, content_hash = await _save_upload(file)
+            uploads.append((file.filename, file_path, {
+                "content_hash": content_hash, "source_name": _source_name(file)
+            }))
+    except Exception:
+        for _, file_path, _ in uploads:
+            _remove_upload(file_path)
+        raise
+    
+    async def process(upload):
+        _, file_path, options = upload
+        try:
+            return await handle(file_path, **options)
+        finally:
+            _remove_upload(file_path)
+    
+    async def lines():
+        try:
+            async for entry in fan_out(uploads, process, max_parallel):
+                record = {"index": entry.index, "filename": entry.item[0]}
+                if entry.error is None:
+                    record.update({"status": "success", result_key: entry.result})
+                else:
+                    logger.error(f"ประมวลผลไฟล์ {entry.item[0]} ไม่สำเร็จ: {str(entry.error)}")
+                    record.update({"status": "error", "error": str(entry.error)})
+                yield json.dumps(jsonable_encoder(record), ensure_ascii=False) + "\n"
+        finally:
+            # ไฟล์ที่ยังไม่ได้เริ่มประมวลผลเมื่อผู้ใช้ยกเลิกการเชื่อมต่อ
+            for _, file_path, _ in uploads:
+                _remove_upload(file_path)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/templates/bulk-suggest")
+async def bulk_suggest_templates(
+    files: List[UploadFile] = File(...),
+    max_parallel: int = Query(DEFAULT_BATCH_PARALLELISM, ge=1)
+):
+    """
+    แนะนำเทมเพลตสำหรับไฟล์หลายไฟล์พร้อมกัน
+    
+    ส่งผลกลับเป็น NDJSON ทีละไฟล์ตามลำดับที่เสร็จ (ดู _stream_batch)
+    max_parallel คือจำนวนไฟล์ที่ประมวลผลพร้อมกันสูงสุดของ request นี้
+    """
+    async def suggest(file_path: str, **options):
+        async with executors.slot("bulk-suggest"):
+            data = await _process_upload(file_path, **options)
+            return await executors.run_io(template_manager.suggest_template, data)
+    
+    try:
+        return await _stream_batch(files, suggest, "suggestions", max_parallel)
     except Exception as e:
         logger.error(f"เกิดข้อผิดพลาดในการแนะนำเทมเพลต: {str(e)}")
         raise HTTPException(
@@ -259,31 +466,26 @@ async def bulk_suggest_templates(files: List[UploadFile] = File(...)):
 @app.post("/templates/batch-process")
 async def batch_process_files(
     files: List[UploadFile] = File(...),
-    template_id: Optional[str] = None
+    template_id: Optional[str] = None,
+    max_parallel: int = Query(DEFAULT_BATCH_PARALLELISM, ge=1)
 ):
-    """ประมวลผลไฟล์หลายไฟล์พร้อมกัน"""
+    """
+    ประมวลผลไฟล์หลายไฟล์พร้อมกัน
+    
+    ส่งผลกลับเป็น NDJSON ทีละไฟล์ตามลำดับที่เสร็จ (ดู _stream_batch)
+    max_parallel คือจำนวนไฟล์ที่ประมวลผลพร้อมกันสูงสุดของ request นี้
+    """
+    async def process(file_path: str, **options):
+        async with executors.slot("batch-process"):
+            if template_id:
+                processor = ExcelProcessor(
+                    file_path, cache=result_cache, engine=database_engine, **options
+                )
+                return await executors.run_io(processor.process_with_template, template_id)
+            return await _process_upload(file_path, **options)
+    
     try:
-        results = []
-        for file in files:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                
-                # ประมวลผลไฟล์
-                processor = ExcelProcessor(temp_file.name)
-                if template_id:
-                    result = processor.process_with_template(template_id)
-                else:
-                    result = processor.process_file()
-                    
-                results.append({
-                    "filename": file.filename,
-                    "result": result
-                })
-                
-                os.unlink(temp_file.name)
-                
-        return {"status": "success", "data": results}
+        return await _stream_batch(files, process, "result", max_parallel)
     except Exception as e:
         logger.error(f"เกิดข้อผิดพลาดในการประมวลผลแบบกลุ่ม: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,171 @@
+"""
+ระบบจัดการ engine ของฐานข้อมูลที่ใช้ร่วมกันทั้ง process
+รองรับ:
+- engine หนึ่งตัวต่อ URL พร้อม connection pool
+- สร้างตาราง (metadata.create_all) เพียงครั้งเดียวต่อ engine
+- ตั้งค่า PRAGMA ของ SQLite ทุกครั้งที่เปิด connection
+"""
+
+import os
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+# ตั้งค่า logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# ขนาด connection pool
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+# ชุดค่า PRAGMA สำหรับไฟล์ SQLite
+# performance: WAL ให้ผู้อ่านไม่ถูกบล็อกระหว่างเขียน และรอ lock แทนการแจ้ง "database is locked"
+SQLITE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,  # 256 MB
+        "cache_size": -64 * 1024,        # ค่าติดลบมีหน่วยเป็น KiB (64 MB)
+        "busy_timeout": 30000,           # มิลลิวินาที
+        "temp_store": "MEMORY"
+    }
+}
+DEFAULT_SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+
+_engines: Dict[Tuple[str, str], Engine] = {}
+_initialized_schemas: "weakref.WeakKeyDictionary[Engine, Set[int]]" = weakref.WeakKeyDictionary()
+_engine_lock = threading.Lock()
+_schema_lock = threading.Lock()
+
+def _engine_options(url: str) -> Dict:
+    """กำหนดค่า connection pool ตามประเภทฐานข้อมูล"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database in (None, "", ":memory:"):
+            # ฐานข้อมูลในหน่วยความจำใช้ pool ค่าเริ่มต้นของ SQLAlchemy
+            return {}
+        return {
+            "poolclass": QueuePool,
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            # connection ถูกใช้ข้าม thread ของ web server
+            "connect_args": {"check_same_thread": False}
+        }
+    return {
+        "pool_size": POOL_SIZE,
+        "max_overflow": MAX_OVERFLOW,
+        "pool_pre_ping": True
+    }
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    ตั้งค่า PRAGMA ให้ทุก connection ที่ engine เปิดใหม่
+
+    Args:
+        engine: engine ของฐานข้อมูล SQLite
+        pragmas: ชื่อและค่าของ PRAGMA
+    """
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def sqlite_pragmas(sqlite_profile: Optional[str] = None) -> Dict[str, Any]:
+    """
+    ค่า PRAGMA ของชุดค่า SQLite
+
+    Args:
+        sqlite_profile: ชื่อชุดค่าใน SQLITE_PROFILES (ค่าเริ่มต้นจากตัวแปรสภาพแวดล้อม SQLITE_PROFILE)
+
+    Raises:
+        ValueError: ถ้าไม่รู้จักชุดค่า
+    """
+    sqlite_profile = sqlite_profile or DEFAULT_SQLITE_PROFILE
+    if sqlite_profile not in SQLITE_PROFILES:
+        raise ValueError(f"ไม่รู้จักชุดค่า SQLite: {sqlite_profile}")
+    return SQLITE_PROFILES[sqlite_profile]
+
+def get_engine(url: str, sqlite_profile: Optional[str] = None) -> Engine:
+    """
+    ดึง engine ที่ใช้ร่วมกันสำหรับ URL (สร้างใหม่เมื่อเรียกครั้งแรก)
+
+    Args:
+        url: URL ของฐานข้อมูล
+        sqlite_profile: ชุดค่า PRAGMA ใน SQLITE_PROFILES สำหรับไฟล์ SQLite
+            (ค่าเริ่มต้นจากตัวแปรสภาพแวดล้อม SQLITE_PROFILE)
+
+    Returns:
+        Engine ที่มี connection pool
+    """
+    sqlite_profile = sqlite_profile or DEFAULT_SQLITE_PROFILE
+    pragmas = sqlite_pragmas(sqlite_profile)
+
+    key = (url, sqlite_profile)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _engine_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            parsed = make_url(url)
+            logger.info(f"กำลังเชื่อมต่อกับฐานข้อมูล {parsed.get_backend_name()}...")
+            engine = create_engine(url, **_engine_options(url))
+            if parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:"):
+                apply_sqlite_pragmas(engine, pragmas)
+            _engines[key] = engine
+        return engine
+
+def ensure_schema(engine: Engine, metadata: MetaData,
+                  upgrade: Optional[Callable[[Engine, MetaData], None]] = None) -> bool:
+    """
+    สร้างตารางของ metadata ในฐานข้อมูลเพียงครั้งเดียวต่อ engine
+
+    Args:
+        engine: engine ของฐานข้อมูล
+        metadata: โครงสร้างตาราง
+        upgrade: ฟังก์ชันปรับโครงสร้างตารางเดิม เรียกหลัง create_all
+
+    Returns:
+        True ถ้ามีการสร้างตารางในการเรียกครั้งนี้
+    """
+    initialized = _initialized_schemas.get(engine)
+    if initialized is not None and id(metadata) in initialized:
+        return False
+
+    with _schema_lock:
+        initialized = _initialized_schemas.setdefault(engine, set())
+        if id(metadata) in initialized:
+            return False
+        metadata.create_all(engine)
+        if upgrade is not None:
+            upgrade(engine, metadata)
+        initialized.add(id(metadata))
+        logger.info("สร้างโครงสร้างฐานข้อมูลเรียบร้อย")
+        return True
+
+def dispose_engines() -> None:
+    """ปิด connection pool ของทุก engine ที่สร้างไว้"""
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+    with _schema_lock:
+        _initialized_schemas.clear()
@@ -14,6 +14,7 @@ from sqlalchemy import create_engine, MetaData
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
+from database.engine import apply_sqlite_pragmas, sqlite_pragmas
 
 # ตั้งค่า logging
 logging.basicConfig(
@@ -47,10 +48,17 @@ class DatabaseManager:
             
         Returns:
             bool: True ถ้าเชื่อมต่อสำเร็จ
+            
+        Raises:
+            ValueError: ถ้าตัวแปรสภาพแวดล้อม SQLITE_PROFILE ไม่ใช่ชุดค่าที่รู้จัก
         """
+        # ชุดค่า SQLite ที่ตั้งผิดเป็นข้อผิดพลาดของการตั้งค่า ไม่ใช่การเชื่อมต่อล้มเหลว
+        pragmas = sqlite_pragmas() if self.db_type == "sqlite" else None
         try:
             connection_url = self._build_connection_url(config)
             self.engine = create_engine(connection_url)
+            if pragmas is not None:
+                apply_sqlite_pragmas(self.engine, pragmas)
             self.Session = sessionmaker(bind=self.engine)
             
             # ทดสอบการเชื่อมต่อ
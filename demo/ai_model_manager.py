@@ -28,6 +28,7 @@ from sklearn.model_selection import train_test_split
 from prophet import Prophet
 from memory_profiler import profile
 import gc
+from excel_processor.sidecar import SidecarCache, shared_sidecar
 
 # ตั้งค่า logging
 logging.basicConfig(level=logging.INFO)
@@ -43,14 +44,21 @@ class AIModelManager:
     4. ทดลองปรับแต่ง hyperparameters
     """
     
-    def __init__(self):
+    def __init__(self, sidecar: SidecarCache = None):
         """
         กำหนดค่าเริ่มต้นสำหรับ AI Model Manager
         
+        Args:
+            sidecar: แคช Arrow ของไฟล์ Excel ที่ใช้ร่วมกันทุกการวิเคราะห์
+                (ค่าเริ่มต้นใช้แคชร่วมของทั้ง process)
+        
         สำหรับนักศึกษา:
         - สังเกตการตั้งค่า GPU
         - ศึกษาการจัดการ memory
+        - ไฟล์เดียวกันถูก parse ครั้งเดียว การวิเคราะห์ครั้งต่อไปอ่านจากแคช
         """
+        self.sidecar = sidecar or shared_sidecar()
+        
         # ตั้งค่า GPU
         self._setup_gpu()
         
@@ -206,7 +214,7 @@ class AIModelManager:
         """
         try:
             # อ่านข้อมูล
-            df = pd.read_excel(file_path)
+            df = self.sidecar.read_excel(file_path)
             
             # สกัด features
             features = self._extract_sequence_features(df)
@@ -298,7 +306,7 @@ class AIModelManager:
                 structure_labels.append(self._get_structure_label(file))
                 
                 # Content data
-                df = pd.read_excel(file)
+                df = self.sidecar.read_excel(file)
                 features = self._extract_sequence_features(df)
                 content_sequences.append(features)
                 content_labels.append(self._get_content_labels(df))
@@ -431,7 +439,7 @@ class AIModelManager:
         """
         try:
             # อ่านข้อมูล
-            df = pd.read_excel(file_path)
+            df = self.sidecar.read_excel(file_path)
             self._validate_input_data(df)
             
             # เตรียมข้อมูลสำหรับ Prophet
@@ -496,7 +504,7 @@ class AIModelManager:
         """
         try:
             # อ่านและเตรียมข้อมูล
-            df = pd.read_excel(file_path)
+            df = self.sidecar.read_excel(file_path)
             
             # สร้างคุณลักษณะเพิ่มเติม
             df['month'] = df.index.month
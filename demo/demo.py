@@ -25,6 +25,7 @@ from datetime import datetime
 import re
 from colorama import init, Fore, Style
 from ai_model_manager import AIModelManager
+from excel_processor.readers import read_excel, select_engine
 
 # เริ่มต้นใช้งาน colorama สำหรับแสดงสีในเทอร์มินอล
 init()
@@ -164,10 +165,9 @@ def read_all_sheets(file_path):
     """อ่านข้อมูลจากทุกหน้าในไฟล์ Excel
     
     สำหรับนักศึกษา:
-    1. ใช้ pandas.ExcelFile ในการอ่านไฟล์ Excel
-    2. ใช้ sheet_names เพื่อดูรายชื่อ sheet ทั้งหมด
-    3. ใช้ read_excel เพื่ออ่านข้อมูลแต่ละ sheet
-    4. แปลงข้อมูลเป็น dictionary ด้วย to_dict('records')
+    1. ใช้ read_excel ของ excel_processor.readers อ่านทุก sheet ในครั้งเดียว (sheet_name=None)
+    2. ตัวอ่านเลือกอัตโนมัติ (calamine ถ้าติดตั้งไว้ ไม่เช่นนั้น openpyxl)
+    3. แปลงข้อมูลเป็น dictionary ด้วย to_dict('records')
     
     Args:
         file_path (str): พาธของไฟล์ Excel
@@ -176,13 +176,12 @@ def read_all_sheets(file_path):
         dict: ข้อมูลจากทุก sheet ในรูปแบบ dictionary
     """
     print_header(f"กำลังอ่านข้อมูลจากไฟล์: {file_path}")
+    print(f"{Fore.CYAN}ตัวอ่าน Excel: {select_engine(file_path=file_path)}{Style.RESET_ALL}")
     
-    excel_file = pd.ExcelFile(file_path)
     all_data = {}
     
-    for sheet_name in excel_file.sheet_names:
+    for sheet_name, df in read_excel(file_path, sheet_name=None).items():
         print(f"\n{Fore.CYAN}กำลังอ่านหน้า: {sheet_name}{Style.RESET_ALL}")
-        df = pd.read_excel(excel_file, sheet_name=sheet_name)
         
         print_success(f"พบข้อมูล {len(df)} แถว, {len(df.columns)} คอลัมน์")
         print(f"{Fore.CYAN}คอลัมน์ที่พบ:{Style.RESET_ALL}")
@@ -0,0 +1,420 @@
+"""
+ระบบอ่านและสรุปสถิติไฟล์ Excel ขนาดใหญ่ทีละ block แถว
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - อ่าน sheet ทีละ chunk_size แถว (openpyxl แบบ read-only หรือตัวอ่านที่เลือกด้วย engine)
+   - เก็บสถิติของแต่ละคอลัมน์ในตัวสะสม (accumulator) ที่รวมกันได้
+   - หน่วยความจำขึ้นกับขนาด chunk ไม่ใช่จำนวนแถวทั้งไฟล์
+
+2. ความแม่นยำเทียบกับการโหลดทั้งไฟล์ (profile_dataframe):
+   - row_count, null_counts, count, min, max: ตรงกันทุกค่า
+   - mean/std: รวมแบบ Welford/Chan ต่างจากการคำนวณรอบเดียวไม่เกิน
+     ความคลาดเคลื่อนของเลขทศนิยม (relative error ราว 1e-9)
+   - distinct_counts: ตรงกันเมื่อค่าที่ไม่ซ้ำน้อยกว่า DISTINCT_SKETCH_SIZE
+     มากกว่านั้นเป็นค่าประมาณแบบ KMV (relative error ราว 1/sqrt(DISTINCT_SKETCH_SIZE) ≈ 1.6%)
+   - value_counts: ตรงกันเมื่อค่าที่ไม่ซ้ำไม่เกิน TOP_K_CAPACITY มากกว่านั้นเก็บเฉพาะ
+     ค่าที่พบบ่อยแบบ Misra-Gries โดยจำนวนที่รายงานอาจต่ำกว่าจริงไม่เกิน
+     row_count / (TOP_K_CAPACITY + 1)
+   - inferred_types: ชนิดข้อมูลและจำนวนค่าที่ไม่ใช่ตัวเลขตรงกัน แต่ sampled อาจต่างกัน
+     เพราะการสุ่มตัวอย่างทำแยกในแต่ละ block
+   - duplicate_count: เทียบแถวด้วยลายนิ้วมือ uint64 (excel_processor.fingerprints)
+     ใช้หน่วยความจำ 8 ไบต์ต่อแถว
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Union
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from .fingerprints import duplicated_fingerprints, row_fingerprints
+from .inference import ColumnTypeInference, infer_column_type
+from .profiling import DataProfile
+from .readers import _convert_calamine_cell, select_engine
+
+# ขนาดเริ่มต้นของ block แถว
+DEFAULT_CHUNK_SIZE = 50_000
+
+# จำนวน hash ที่เก็บสำหรับประมาณจำนวนค่าที่ไม่ซ้ำ
+DISTINCT_SKETCH_SIZE = 4096
+
+# จำนวนค่าสูงสุดที่เก็บสำหรับค่าที่พบบ่อย
+TOP_K_CAPACITY = 1000
+
+_NUMERIC_KINDS = ("int", "float")
+
+def _header_names(row) -> List[str]:
+    """ตั้งชื่อคอลัมน์แบบเดียวกับ pd.read_excel (Unnamed: n และเติม .1 ให้ชื่อซ้ำ)"""
+    names = []
+    seen: Dict[str, int] = {}
+    for idx, value in enumerate(row):
+        name = f"Unnamed: {idx}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _iter_openpyxl_rows(file_path: Union[str, Path], sheet_name: Union[str, int, None]):
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if isinstance(sheet_name, str):
+            sheet = workbook[sheet_name]
+        else:
+            sheet = workbook.worksheets[sheet_name or 0]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _iter_calamine_rows(file_path: Union[str, Path], sheet_name: Union[str, int, None]):
+    from python_calamine import CalamineWorkbook
+
+    workbook = CalamineWorkbook.from_path(str(file_path))
+    try:
+        if isinstance(sheet_name, str):
+            sheet = workbook.get_sheet_by_name(sheet_name)
+        else:
+            sheet = workbook.get_sheet_by_index(sheet_name or 0)
+        # calamine ตัดคอลัมน์ว่างด้านซ้ายออก และคืนเซลล์ว่างเป็น ""
+        padding = (None,) * sheet.start[1] if sheet.start else ()
+        for row in sheet.iter_rows():
+            yield padding + tuple(None if value == "" else _convert_calamine_cell(value) for value in row)
+    finally:
+        workbook.close()
+
+def _iter_xlrd_rows(file_path: Union[str, Path], sheet_name: Union[str, int, None]):
+    import xlrd
+
+    workbook = xlrd.open_workbook(str(file_path), on_demand=True)
+    try:
+        if isinstance(sheet_name, str):
+            sheet = workbook.sheet_by_name(sheet_name)
+        else:
+            sheet = workbook.sheet_by_index(sheet_name or 0)
+        for idx in range(sheet.nrows):
+            row = []
+            for cell in sheet.row(idx):
+                if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+                    row.append(None)
+                elif cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+                elif cell.ctype == xlrd.XL_CELL_BOOLEAN:
+                    row.append(bool(cell.value))
+                elif cell.ctype == xlrd.XL_CELL_NUMBER:
+                    row.append(_convert_calamine_cell(cell.value))
+                else:
+                    row.append(cell.value)
+            yield tuple(row)
+    finally:
+        workbook.release_resources()
+
+# ตัวอ่านค่าในเซลล์ทีละแถวของแต่ละ engine (ค่าเดียวกับที่ openpyxl คืน)
+_ROW_READERS = {
+    "openpyxl": _iter_openpyxl_rows,
+    "calamine": _iter_calamine_rows,
+    "xlrd": _iter_xlrd_rows,
+}
+
+def iter_excel_chunks(file_path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      sheet_name: Union[str, int, None] = None,
+                      engine: str = "openpyxl") -> Iterator[pd.DataFrame]:
+    """
+    อ่าน sheet ทีละ block แถวเป็น DataFrame
+
+    แถวแรกเป็นหัวตาราง แถวว่างท้าย sheet ถูกตัดออกเหมือน pd.read_excel
+
+    Args:
+        file_path: พาธของไฟล์ Excel
+        chunk_size: จำนวนแถวต่อ block
+        sheet_name: ชื่อหรือลำดับของ sheet (ค่าเริ่มต้นใช้ sheet แรก)
+        engine: ตัวอ่านไฟล์ Excel หรือ "auto" (ดู excel_processor.readers)
+            openpyxl อ่านแบบ streaming ส่วน calamine และ xlrd โหลดค่าของทั้ง sheet ก่อน
+
+    Yields:
+        DataFrame ของแต่ละ block ที่มีคอลัมน์เหมือนกันทุก block
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size ต้องมากกว่า 0")
+
+    rows = _ROW_READERS[select_engine(engine, file_path)](file_path, sheet_name)
+    try:
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+
+        block: List[tuple] = []
+        blank_rows: List[tuple] = []  # แถวว่างที่ยังไม่รู้ว่าอยู่ท้าย sheet หรือไม่
+        yielded = False
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                blank_rows.append(row)
+                continue
+            block.extend(blank_rows)
+            blank_rows = []
+            block.append(row)
+            if len(block) >= chunk_size:
+                yield pd.DataFrame(block[:chunk_size], columns=columns)
+                yielded = True
+                block = block[chunk_size:]
+        if block or not yielded:
+            yield pd.DataFrame(block, columns=columns)
+    finally:
+        rows.close()
+
+def _series_kind(series: pd.Series, non_null: pd.Series) -> str:
+    """ชนิดข้อมูลของคอลัมน์ใน block (empty ถ้าไม่มีค่าเลย)"""
+    if non_null.empty:
+        return "empty"
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "object"
+
+def _merge_kind(current: str, new: str) -> str:
+    """รวมชนิดข้อมูลของสอง block ตามการอนุมานชนิดของ pandas ทั้งคอลัมน์"""
+    if current == "empty" or current == new:
+        return new
+    if new == "empty":
+        return current
+    if current in _NUMERIC_KINDS and new in _NUMERIC_KINDS:
+        return "float"
+    return "object"
+
+class ColumnAccumulator:
+    """
+    ตัวสะสมสถิติของคอลัมน์เดียว ที่รับข้อมูลทีละ block และรวมกับตัวสะสมอื่นได้
+    """
+
+    def __init__(self, distinct_size: int = DISTINCT_SKETCH_SIZE,
+                 top_k_capacity: int = TOP_K_CAPACITY):
+        self.distinct_size = distinct_size
+        self.top_k_capacity = top_k_capacity
+        self.kind = "empty"
+        self.rows = 0
+        self.nulls = 0
+        # Welford/Chan: จำนวน ค่าเฉลี่ย และผลรวมกำลังสองของส่วนเบี่ยงเบนของค่าตัวเลข
+        self.numeric_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Any = None
+        self.max: Any = None
+        self.inference = ColumnTypeInference("empty")
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.top_counts = pd.Series(dtype=np.int64)
+
+    def update(self, series: pd.Series) -> None:
+        """เพิ่มข้อมูลของคอลัมน์จาก block ใหม่"""
+        non_null = series.dropna()
+        kind = _series_kind(series, non_null)
+        self.kind = _merge_kind(self.kind, kind)
+        self.rows += len(series)
+        self.nulls += len(series) - len(non_null)
+        if non_null.empty:
+            return
+
+        # ตัวเลขแปลงเป็น float64 ก่อน hash เพราะ block ที่มีค่าว่างกลายเป็น float64
+        # ค่า 1 ของ block ชนิด int64 จึงต้องได้ hash เดียวกับ 1.0 ของ block อื่น
+        values = non_null.to_numpy()
+        if kind in _NUMERIC_KINDS:
+            values = values.astype(np.float64, copy=False)
+            self._merge_moments(len(values), values.mean(), ((values - values.mean()) ** 2).sum())
+        self.inference.merge(infer_column_type(non_null))
+
+        if kind != "object":
+            self._merge_range(non_null.min(), non_null.max())
+        self._merge_distinct(pd.util.hash_array(values))
+        self._merge_top(non_null.value_counts())
+
+    def merge(self, other: "ColumnAccumulator") -> "ColumnAccumulator":
+        """รวมสถิติจากตัวสะสมอื่นของคอลัมน์เดียวกัน"""
+        self.kind = _merge_kind(self.kind, other.kind)
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.inference.merge(other.inference)
+        if other.numeric_count:
+            self._merge_moments(other.numeric_count, other.mean, other.m2)
+        if other.min is not None:
+            self._merge_range(other.min, other.max)
+        self._merge_distinct(other.hashes)
+        self._merge_top(other.top_counts)
+        return self
+
+    def _merge_moments(self, count: int, mean: float, m2: float) -> None:
+        total = self.numeric_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.numeric_count * count / total
+        self.numeric_count = total
+
+    def _merge_range(self, low: Any, high: Any) -> None:
+        try:
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+        except TypeError:
+            # ค่าต่างชนิดกันในคอลัมน์ข้อความเปรียบเทียบกันไม่ได้
+            self.min = self.max = None
+
+    def _merge_distinct(self, hashes: np.ndarray) -> None:
+        """เก็บเฉพาะ hash ที่น้อยที่สุด distinct_size ค่า (K minimum values)"""
+        merged = np.unique(np.concatenate([self.hashes, hashes]))
+        self.hashes = merged[:self.distinct_size]
+
+    def _merge_top(self, counts: pd.Series) -> None:
+        """รวมจำนวนครั้งที่พบแต่ละค่า และตัดให้เหลือไม่เกิน top_k_capacity ค่า (Misra-Gries)"""
+        combined = self.top_counts.add(counts, fill_value=0).astype(np.int64)
+        if len(combined) > self.top_k_capacity:
+            threshold = combined.nlargest(self.top_k_capacity + 1).iloc[-1]
+            combined = combined - threshold
+            combined = combined[combined > 0]
+        self.top_counts = combined
+
+    @property
+    def dtype(self) -> str:
+        """ชนิดข้อมูลของคอลัมน์ทั้งหมดแบบเดียวกับที่ pd.read_excel จะได้"""
+        if self.kind == "empty":
+            return "float64" if self.rows else "object"
+        if self.kind == "int":
+            return "int64" if self.nulls == 0 else "float64"
+        if self.kind == "float":
+            return "float64"
+        if self.kind == "bool":
+            return "bool" if self.nulls == 0 else "object"
+        if self.kind == "datetime":
+            return "datetime64[ns]"
+        return "object"
+
+    @property
+    def distinct_count(self) -> int:
+        """จำนวนค่าที่ไม่ซ้ำ (ค่าจริงหรือค่าประมาณ KMV)"""
+        if len(self.hashes) < self.distinct_size:
+            return len(self.hashes)
+        kth = float(self.hashes[self.distinct_size - 1]) / 2.0 ** 64
+        return int(round((self.distinct_size - 1) / kth))
+
+    def numeric_stats(self) -> Dict[str, Any]:
+        """count/mean/std/min/max ของคอลัมน์ตัวเลข"""
+        count = self.numeric_count
+        has_values = count > 0
+        return {
+            "count": count,
+            "mean": np.float64(self.mean) if has_values else np.float64(np.nan),
+            "std": np.float64(np.sqrt(self.m2 / (count - 1))) if count > 1 else np.float64(np.nan),
+            "min": self.min if has_values else np.float64(np.nan),
+            "max": self.max if has_values else np.float64(np.nan)
+        }
+
+class ChunkedProfiler:
+    """สรุปสถิติของตารางจาก DataFrame ทีละ block โดยใช้หน่วยความจำจำกัด"""
+
+    def __init__(self, include_duplicates: bool = True,
+                 distinct_size: int = DISTINCT_SKETCH_SIZE,
+                 top_k_capacity: int = TOP_K_CAPACITY):
+        """
+        Args:
+            include_duplicates: นับจำนวนแถวที่ซ้ำกัน (เก็บลายนิ้วมือของทุกแถว)
+            distinct_size: จำนวน hash ที่เก็บสำหรับประมาณจำนวนค่าที่ไม่ซ้ำ
+            top_k_capacity: จำนวนค่าที่พบบ่อยสูงสุดที่เก็บต่อคอลัมน์
+        """
+        self.include_duplicates = include_duplicates
+        self.distinct_size = distinct_size
+        self.top_k_capacity = top_k_capacity
+        self.columns: Optional[List[Any]] = None
+        self.accumulators: List[ColumnAccumulator] = []
+        self.row_count = 0
+        self._fingerprints: List[np.ndarray] = []
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """เพิ่มข้อมูลจาก block ใหม่"""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.accumulators = [
+                ColumnAccumulator(self.distinct_size, self.top_k_capacity) for _ in self.columns
+            ]
+        self.row_count += len(chunk)
+        for position, accumulator in enumerate(self.accumulators):
+            accumulator.update(chunk.iloc[:, position])
+
+        if self.include_duplicates and len(chunk):
+            self._fingerprints.append(row_fingerprints(chunk))
+
+    def merge(self, other: "ChunkedProfiler") -> "ChunkedProfiler":
+        """รวมสถิติจากตัวสะสมของส่วนอื่นในตารางเดียวกัน (เช่น ที่คำนวณใน process อื่น)"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self.accumulators = [
+                ColumnAccumulator(self.distinct_size, self.top_k_capacity) for _ in self.columns
+            ]
+        self.row_count += other.row_count
+        for accumulator, other_accumulator in zip(self.accumulators, other.accumulators):
+            accumulator.merge(other_accumulator)
+        self._fingerprints.extend(other._fingerprints)
+        return self
+
+    def to_profile(self) -> DataProfile:
+        """สร้าง DataProfile รูปแบบเดียวกับ profile_dataframe"""
+        columns = self.columns or []
+        fingerprints = None
+        duplicate_count = np.int64(0)
+        if self.include_duplicates:
+            fingerprints = (np.concatenate(self._fingerprints) if self._fingerprints
+                            else np.empty(0, dtype=np.uint64))
+            duplicate_count = duplicated_fingerprints(fingerprints).sum()
+        profile = DataProfile(
+            row_count=self.row_count,
+            columns=columns,
+            null_counts=pd.Series(
+                [accumulator.nulls for accumulator in self.accumulators],
+                index=pd.Index(columns, dtype=object), dtype=np.int64
+            ),
+            duplicate_count=duplicate_count,
+            row_fingerprints=fingerprints
+        )
+        for column, accumulator in zip(columns, self.accumulators):
+            dtype = accumulator.dtype
+            profile.dtypes[column] = dtype
+            profile.distinct_counts[column] = accumulator.distinct_count
+            if dtype in ("int64", "float64"):
+                profile.numeric[column] = accumulator.numeric_stats()
+            elif dtype in ("object", "datetime64[ns]"):
+                profile.value_counts[column] = accumulator.top_counts.sort_values(
+                    ascending=False, kind="stable"
+                )
+            if dtype == "object":
+                profile.inferred_types[column] = accumulator.inference
+        return profile
+
+def profile_excel(file_path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  sheet_name: Union[str, int, None] = None, include_duplicates: bool = True,
+                  engine: str = "openpyxl") -> DataProfile:
+    """
+    สรุปสถิติของ sheet ในไฟล์ Excel โดยอ่านทีละ block
+
+    Args:
+        file_path: พาธของไฟล์ Excel
+        chunk_size: จำนวนแถวต่อ block
+        sheet_name: ชื่อหรือลำดับของ sheet (ค่าเริ่มต้นใช้ sheet แรก)
+        include_duplicates: นับจำนวนแถวที่ซ้ำกันด้วย
+        engine: ตัวอ่านไฟล์ Excel (ดู iter_excel_chunks)
+
+    Returns:
+        DataProfile ของ sheet
+    """
+    profiler = ChunkedProfiler(include_duplicates=include_duplicates)
+    for chunk in iter_excel_chunks(file_path, chunk_size, sheet_name, engine):
+        profiler.update(chunk)
+    return profiler.to_profile()
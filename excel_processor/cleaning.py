@@ -0,0 +1,253 @@
+"""
+ระบบทำความสะอาดข้อมูลตามกฎที่ประกาศไว้ในแม่แบบ (declarative cleaning pipeline)
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - กฎการทำความสะอาดเขียนเป็น dict ต่อคอลัมน์ใน FormTemplate.validation_rules
+     แทนการเขียนขั้นตอนตายตัวในโค้ด
+   - "คอมไพล์" กฎเป็นแผนต่อคอลัมน์ครั้งเดียวต่อหัวตาราง (ชื่อคอลัมน์ชุดเดียวกัน)
+     แล้วใช้แผนเดิมซ้ำกับทุกไฟล์ของแม่แบบเดียวกัน
+   - ทุกขั้นตอนทำงานกับ Series ทีละคอลัมน์แบบ vectorized และประกอบ DataFrame
+     ด้วย pd.concat(copy=False) ซึ่งไม่คัดลอกข้อมูล คอลัมน์ที่ไม่ถูกแก้ไขจึงไม่ถูกคัดลอกเลย
+
+2. กฎที่รองรับ (key ใน validation_rules[column] ที่ไม่รู้จักจะถูกข้าม):
+   - "drop": True      ลบคอลัมน์นี้
+   - "fill": ค่า        เติมค่าว่างด้วยค่านี้
+   - "strip": True     ตัดช่องว่างหน้า-หลังข้อความ
+   - "date_format": รูปแบบ strftime ของคอลัมน์วันที่ (ค่าเริ่มต้นใช้ date_format ของ pipeline)
+
+3. การนับสำเนา:
+   - ขั้นตอนเดิมของ clean_data (drop, fillna, กรองแถวซ้ำ) สร้าง DataFrame ใหม่ทั้งตารางทุกขั้น
+   - pipeline นี้คัดลอกทั้งตารางอย่างมากครั้งเดียว คือตอนกรองแถวซ้ำออก (ถ้ามี)
+   - CleaningReport บอกจำนวนสำเนาทั้งตารางที่เกิดจริงและที่หลีกเลี่ยงได้
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fingerprints import duplicated_fingerprints, row_fingerprints
+
+# กฎเริ่มต้นเมื่อไม่ได้กำหนดแม่แบบ (ตรงกับขั้นตอนเดิมของ clean_data)
+DEFAULT_CLEANING_RULES: Dict[str, Dict[str, Any]] = {
+    'ชื่อ-นามสกุล': {'fill': 'ไม่ระบุ'},
+    'ที่อยู่': {'fill': 'ไม่ระบุ'},
+    'เลขประจำตัวผู้เสียภาษี': {'fill': '0000000000'},
+}
+
+# รูปแบบวันที่เริ่มต้นของคอลัมน์ datetime
+DEFAULT_DATE_FORMAT = '%Y-%m-%d'
+
+# จำนวนสำเนาทั้งตารางของขั้นตอนเดิม: drop คอลัมน์, fillna และกรองแถวซ้ำ
+LEGACY_FRAME_COPIES = 3
+
+# จำนวนหัวตารางที่เก็บแผนที่คอมไพล์แล้วไว้สูงสุด
+MAX_COMPILED_PLANS = 32
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """ขั้นตอนที่คอมไพล์แล้วของคอลัมน์หนึ่ง"""
+    position: int
+    fill: Any = None
+    strip: bool = False
+    date_format: Optional[str] = None
+
+@dataclass
+class CleaningReport:
+    """
+    ผลการทำความสะอาดข้อมูลหนึ่งชุด
+
+    Attributes:
+        rows_in: จำนวนแถวก่อนทำความสะอาด
+        rows_out: จำนวนแถวหลังทำความสะอาด
+        dropped_columns: คอลัมน์ที่ถูกลบ
+        modified_columns: คอลัมน์ที่ถูกสร้างใหม่ (เติมค่าว่าง ตัดช่องว่าง หรือแปลงวันที่)
+        frame_copies: จำนวนครั้งที่คัดลอกทั้งตาราง (0 หรือ 1 ต่อ DataFrame)
+        legacy_copies: จำนวนครั้งที่ขั้นตอนเดิมคัดลอกทั้งตารางกับข้อมูลเดียวกัน
+    """
+    rows_in: int
+    rows_out: int
+    dropped_columns: List[Any] = field(default_factory=list)
+    modified_columns: List[Any] = field(default_factory=list)
+    frame_copies: int = 0
+    legacy_copies: int = LEGACY_FRAME_COPIES
+
+    @property
+    def copies_avoided(self) -> int:
+        """จำนวนสำเนาทั้งตารางที่หลีกเลี่ยงได้เมื่อเทียบกับขั้นตอนเดิม"""
+        return self.legacy_copies - self.frame_copies
+
+    def merge(self, other: "CleaningReport") -> "CleaningReport":
+        """รวมผลของสอง block (เช่น ในโหมด chunked)"""
+        return CleaningReport(
+            rows_in=self.rows_in + other.rows_in,
+            rows_out=self.rows_out + other.rows_out,
+            dropped_columns=self.dropped_columns,
+            modified_columns=self.modified_columns + [
+                column for column in other.modified_columns if column not in self.modified_columns
+            ],
+            frame_copies=self.frame_copies + other.frame_copies,
+            legacy_copies=self.legacy_copies + other.legacy_copies
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """แปลงเป็น dict สำหรับรายงานผล"""
+        return {
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "dropped_columns": [str(column) for column in self.dropped_columns],
+            "modified_columns": [str(column) for column in self.modified_columns],
+            "frame_copies": self.frame_copies,
+            "copies_avoided": self.copies_avoided
+        }
+
+class CleaningPipeline:
+    """
+    ขั้นตอนทำความสะอาดข้อมูลที่คอมไพล์จากกฎของแม่แบบ
+
+    สร้างครั้งเดียวต่อแม่แบบ แล้วส่งให้ ExcelProcessor ของทุกไฟล์ในแม่แบบนั้น
+    แผนต่อคอลัมน์ถูกคอมไพล์ครั้งแรกที่พบหัวตารางใหม่ แล้วเก็บไว้ใช้ซ้ำ
+    """
+
+    def __init__(self, rules: Optional[Mapping[str, Mapping[str, Any]]] = None,
+                 drop_unnamed: bool = True, drop_duplicates: bool = True,
+                 date_format: Optional[str] = DEFAULT_DATE_FORMAT):
+        """
+        Args:
+            rules: กฎต่อคอลัมน์ในรูปแบบเดียวกับ FormTemplate.validation_rules
+                (None = DEFAULT_CLEANING_RULES)
+            drop_unnamed: ลบคอลัมน์ที่ไม่มีชื่อ ("Unnamed: ...")
+            drop_duplicates: ลบแถวที่ซ้ำกับแถวก่อนหน้า
+            date_format: รูปแบบของคอลัมน์วันที่ทุกคอลัมน์ (None = ไม่แปลงวันที่)
+        """
+        self.rules = {
+            column: dict(rule) for column, rule in
+            (DEFAULT_CLEANING_RULES if rules is None else rules).items()
+            if isinstance(rule, Mapping)
+        }
+        self.drop_unnamed = drop_unnamed
+        self.drop_duplicates = drop_duplicates
+        self.date_format = date_format
+        self._plans: Dict[Tuple, Tuple[List[ColumnPlan], List[Any]]] = {}
+        self.files_cleaned = 0
+        self.copies_avoided = 0
+
+    @classmethod
+    def from_template(cls, template: Any, **kwargs) -> "CleaningPipeline":
+        """สร้าง pipeline จาก validation_rules ของ FormTemplate"""
+        return cls(template.validation_rules, **kwargs)
+
+    def compile(self, df: pd.DataFrame) -> Tuple[List[ColumnPlan], List[Any]]:
+        """
+        คอมไพล์กฎเป็นแผนต่อคอลัมน์สำหรับหัวตารางและชนิดข้อมูลของ df
+
+        Returns:
+            แผนของคอลัมน์ที่เก็บไว้ และรายชื่อคอลัมน์ที่ถูกลบ
+        """
+        key = tuple(zip(df.columns, map(str, df.dtypes)))
+        compiled = self._plans.get(key)
+        if compiled is not None:
+            return compiled
+
+        plans: List[ColumnPlan] = []
+        dropped: List[Any] = []
+        for position, (column, dtype) in enumerate(df.dtypes.items()):
+            rule = self.rules.get(column, {})
+            if rule.get('drop') or (self.drop_unnamed and 'Unnamed:' in str(column)):
+                dropped.append(column)
+                continue
+            is_date = pd.api.types.is_datetime64_any_dtype(dtype)
+            plans.append(ColumnPlan(
+                position=position,
+                fill=rule.get('fill'),
+                strip=bool(rule.get('strip')) and not pd.api.types.is_numeric_dtype(dtype),
+                date_format=rule.get('date_format', self.date_format) if is_date else None
+            ))
+
+        if len(self._plans) >= MAX_COMPILED_PLANS:
+            self._plans.pop(next(iter(self._plans)))
+        self._plans[key] = (plans, dropped)
+        return plans, dropped
+
+    def apply(self, df: pd.DataFrame,
+              seen_rows: Optional[set] = None) -> Tuple[pd.DataFrame, CleaningReport]:
+        """
+        ทำความสะอาด DataFrame (df ไม่ถูกแก้ไข)
+
+        Args:
+            df: ข้อมูลที่ต้องการทำความสะอาด
+            seen_rows: ลายนิ้วมือของแถวที่พบแล้วจาก block ก่อนหน้า สำหรับลบแถวซ้ำข้าม block
+                (None = ลบแถวซ้ำภายใน df เท่านั้น)
+
+        Returns:
+            DataFrame ที่ทำความสะอาดแล้ว และ CleaningReport
+        """
+        plans, dropped = self.compile(df)
+        report = CleaningReport(rows_in=len(df), rows_out=len(df), dropped_columns=list(dropped))
+        columns = [df.columns[plan.position] for plan in plans]
+
+        # เติมค่าว่างและตัดช่องว่าง: สร้างใหม่เฉพาะคอลัมน์ที่มีการเปลี่ยนแปลง
+        series_list = []
+        for plan in plans:
+            series = df.iloc[:, plan.position]
+            modified = False
+            if plan.fill is not None and series.hasnans:
+                # คอลัมน์ category ต้องมีค่าที่ใช้เติมอยู่ในรายการ category ก่อน
+                if isinstance(series.dtype, pd.CategoricalDtype) \
+                        and plan.fill not in series.cat.categories:
+                    series = series.cat.add_categories([plan.fill])
+                series = series.fillna(plan.fill)
+                modified = True
+            if plan.strip and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+                series = series.str.strip()
+                modified = True
+            if modified:
+                report.modified_columns.append(series.name)
+            series_list.append(series)
+
+        # ลบแถวซ้ำด้วยลายนิ้วมือของข้อมูลที่เติมค่าแล้ว (ประกอบตารางแบบไม่คัดลอก)
+        keep = None
+        if self.drop_duplicates and series_list:
+            fingerprints = row_fingerprints(self._assemble(series_list, columns, df.index))
+            if seen_rows is None:
+                duplicated = duplicated_fingerprints(fingerprints)
+                if duplicated.any():
+                    keep = ~duplicated
+            else:
+                keep = np.zeros(len(fingerprints), dtype=bool)
+                for idx, row_hash in enumerate(fingerprints.tolist()):
+                    if row_hash not in seen_rows:
+                        seen_rows.add(row_hash)
+                        keep[idx] = True
+                if keep.all():
+                    keep = None
+
+        index = df.index
+        if keep is not None:
+            series_list = [series[keep] for series in series_list]
+            index = index[keep]
+            report.frame_copies = 1
+
+        # แปลงรูปแบบวันที่หลังลบแถวซ้ำ (แปลงเฉพาะแถวที่เหลือ)
+        for idx, plan in enumerate(plans):
+            if plan.date_format is not None:
+                series_list[idx] = series_list[idx].dt.strftime(plan.date_format)
+                if series_list[idx].name not in report.modified_columns:
+                    report.modified_columns.append(series_list[idx].name)
+
+        result = self._assemble(series_list, columns, index)
+        report.rows_out = len(result)
+        self.files_cleaned += 1
+        self.copies_avoided += report.copies_avoided
+        return result, report
+
+    @staticmethod
+    def _assemble(series_list: List[pd.Series], columns: List[Any], index: pd.Index) -> pd.DataFrame:
+        """ประกอบ DataFrame จาก Series โดยไม่คัดลอกข้อมูล"""
+        if not series_list:
+            return pd.DataFrame(index=index)
+        frame = pd.concat(series_list, axis=1, copy=False)
+        frame.columns = columns
+        return frame
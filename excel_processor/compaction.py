@@ -0,0 +1,105 @@
+"""
+ระบบลดขนาดหน่วยความจำของ DataFrame หลังโหลดไฟล์
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - ลดขนาดคอลัมน์ตัวเลข เช่น int64 -> int8/int16/int32 ตามช่วงของค่า
+   - float64 -> float32 เฉพาะเมื่อทุกค่าแปลงกลับได้ตรงเดิม (ไม่เสียความแม่นยำ)
+   - คอลัมน์ข้อความที่ค่าซ้ำกันมาก (เช่น จังหวัด สถานะ) -> category
+     เก็บข้อความแต่ละค่าครั้งเดียว แล้วใช้รหัสตัวเลขแทนในแต่ละแถว
+   - คอลัมน์ข้อความที่เหลือ -> string[pyarrow] เก็บข้อความต่อกันในหน่วยความจำเดียว
+     แทน object ของ Python ทีละค่า
+
+2. ข้อควรรู้:
+   - คอลัมน์ object ที่มีทั้งตัวเลขและข้อความไม่ถูกแปลง
+   - ขนาดหน่วยความจำวัดด้วย DataFrame.memory_usage(deep=True)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# สัดส่วนจำนวนค่าที่ไม่ซ้ำต่อจำนวนค่าที่ไม่ว่างสูงสุดที่จะแปลงเป็น category
+CATEGORY_RATIO = 0.5
+
+@dataclass
+class CompactionReport:
+    """
+    ผลการลดขนาดหน่วยความจำ
+
+    Attributes:
+        before_bytes: ขนาดก่อนลด (ไบต์)
+        after_bytes: ขนาดหลังลด (ไบต์)
+        conversions: ชนิดข้อมูลเดิมและชนิดข้อมูลใหม่ของคอลัมน์ที่ถูกแปลง
+    """
+    before_bytes: int
+    after_bytes: int
+    conversions: Dict[Any, Tuple[str, str]] = field(default_factory=dict)
+
+    @property
+    def saved_bytes(self) -> int:
+        """ขนาดที่ลดลง (ไบต์)"""
+        return self.before_bytes - self.after_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """แปลงเป็น dict สำหรับรายงานผล (หน่วย MB)"""
+        return {
+            "before_mb": round(self.before_bytes / 1024 ** 2, 3),
+            "after_mb": round(self.after_bytes / 1024 ** 2, 3),
+            "saved_ratio": round(self.saved_bytes / self.before_bytes, 4) if self.before_bytes else 0.0,
+            "conversions": {
+                column: {"from": old, "to": new} for column, (old, new) in self.conversions.items()
+            }
+        }
+
+def _is_text(series: pd.Series) -> bool:
+    """คอลัมน์ object ที่ทุกค่าที่ไม่ว่างเป็นข้อความ"""
+    return pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+def _compact_column(series: pd.Series, category_ratio: float, arrow_strings: bool) -> pd.Series:
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(dtype):
+        narrow = series.astype(np.float32)
+        lossless = np.array_equal(narrow.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True)
+        return narrow if lossless else series
+    if dtype == object and _is_text(series):
+        non_null = series.count()
+        if non_null and series.nunique() / non_null <= category_ratio:
+            return series.astype("category")
+        if arrow_strings:
+            return series.astype("string[pyarrow]")
+    return series
+
+def compact_dataframe(df: pd.DataFrame, category_ratio: float = CATEGORY_RATIO,
+                      arrow_strings: bool = True) -> Tuple[pd.DataFrame, CompactionReport]:
+    """
+    ลดขนาดหน่วยความจำของ DataFrame
+
+    Args:
+        df: DataFrame ที่ต้องการลดขนาด (ไม่ถูกแก้ไข)
+        category_ratio: สัดส่วนค่าที่ไม่ซ้ำสูงสุดที่จะแปลงคอลัมน์ข้อความเป็น category
+        arrow_strings: แปลงคอลัมน์ข้อความที่เหลือเป็น string[pyarrow]
+
+    Returns:
+        DataFrame ที่ลดขนาดแล้ว และ CompactionReport
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    columns = {}
+    conversions = {}
+    for position, column in enumerate(df.columns):
+        series = df.iloc[:, position]
+        compacted = _compact_column(series, category_ratio, arrow_strings)
+        if compacted.dtype != series.dtype:
+            conversions[column] = (str(series.dtype), str(compacted.dtype))
+        columns[position] = compacted
+
+    result = pd.concat(columns, axis=1) if columns else df.copy()
+    result.columns = df.columns
+    result.index = df.index
+    return result, CompactionReport(before, int(result.memory_usage(deep=True).sum()), conversions)
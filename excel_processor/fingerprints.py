@@ -0,0 +1,136 @@
+"""
+ระบบตรวจหาแถวซ้ำด้วยลายนิ้วมือ (fingerprint) ของแถว
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - hash ทุกแถวเป็นเลข uint64 หนึ่งค่าด้วย pd.util.hash_pandas_object
+   - หาแถวซ้ำในไฟล์เดียวกันด้วย hash table ของเลข uint64 (O(n))
+     แทนการเทียบทุกคอลัมน์ของทุกแถวแบบ DataFrame.duplicated()
+   - เก็บลายนิ้วมือของแถวที่เคยประมวลผลแล้วแยกตามแม่แบบ (template)
+     เป็นไฟล์ .npy ที่เรียงลำดับไว้ (8 ไบต์ต่อแถว) เพื่อตรวจไฟล์ที่ส่งซ้ำข้ามไฟล์
+   - ค้นหาในไฟล์ด้วย binary search แบบ memory-map โดยไม่ต้องโหลดทั้งชุดเข้าหน่วยความจำ
+
+2. ข้อควรรู้:
+   - คอลัมน์ตัวเลขทุกขนาดถูกแปลงเป็น float64 ก่อน hash เพื่อให้ค่า 5 และ 5.0
+     (คอลัมน์เดียวกันในไฟล์ที่มีค่าว่าง หรือที่ถูกลดขนาดเป็น int8/float32) ได้ลายนิ้วมือเดียวกัน
+   - ลายนิ้วมือไม่รวมชื่อคอลัมน์ และมีโอกาสชนกันราว n² / 2⁶⁵
+   - การบันทึกเพิ่มล็อกไฟล์ .lock ระหว่างอ่าน รวม และแทนที่ไฟล์ .npy
+     ไฟล์ของแม่แบบเดียวกันที่ประมวลผลพร้อมกัน (หลาย process) จึงไม่ทำลายลายนิ้วมือของกันและกัน
+"""
+
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+# โฟลเดอร์เริ่มต้นสำหรับเก็บลายนิ้วมือของแต่ละแม่แบบ
+DEFAULT_FINGERPRINT_DIR = "data/fingerprints"
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """ลายนิ้วมือ uint64 ของทุกแถว ตามลำดับแถวใน df"""
+    numeric_columns = [
+        column for column, dtype in df.dtypes.items()
+        if (pd.api.types.is_numeric_dtype(dtype) and dtype != np.float64
+            and not isinstance(dtype, pd.CategoricalDtype))
+    ]
+    if numeric_columns:
+        df = df.astype({column: np.float64 for column in numeric_columns})
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+def duplicated_fingerprints(fingerprints: np.ndarray) -> np.ndarray:
+    """mask ของแถวที่ลายนิ้วมือซ้ำกับแถวก่อนหน้า (เทียบเท่า DataFrame.duplicated())"""
+    return pd.Series(fingerprints, dtype=np.uint64).duplicated().to_numpy()
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """ล็อกไฟล์แบบ exclusive ข้าม process (รอจนกว่าจะได้ล็อก)"""
+    with open(path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK รอได้ราว 10 วินาทีแล้วจึงแจ้ง error ให้ลองใหม่
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+class RowFingerprintIndex:
+    """
+    ชุดลายนิ้วมือของแถวที่เคยประมวลผลแล้วของแม่แบบหนึ่ง เก็บเป็นไฟล์ .npy ที่เรียงลำดับไว้
+    """
+
+    def __init__(self, template: str, directory: Union[str, Path] = DEFAULT_FINGERPRINT_DIR):
+        """
+        Args:
+            template: ชื่อแม่แบบ (ไฟล์ที่ใช้แม่แบบเดียวกันใช้ชุดลายนิ้วมือร่วมกัน)
+            directory: โฟลเดอร์สำหรับเก็บไฟล์ลายนิ้วมือ
+        """
+        self.template = template
+        file_name = re.sub(r"[^\w.-]", "_", template)
+        self.path = Path(directory) / f"{file_name}.npy"
+
+    def load(self) -> np.ndarray:
+        """ลายนิ้วมือที่บันทึกไว้ (เรียงจากน้อยไปมาก อ่านแบบ memory-map)"""
+        if not self.path.exists():
+            return np.empty(0, dtype=np.uint64)
+        return np.load(self.path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        """mask ของลายนิ้วมือที่เคยบันทึกไว้แล้ว"""
+        stored = self.load()
+        if not len(stored) or not len(fingerprints):
+            return np.zeros(len(fingerprints), dtype=bool)
+        positions = np.searchsorted(stored, fingerprints)
+        found = positions < len(stored)
+        found[found] = stored[positions[found]] == fingerprints[found]
+        return found
+
+    def add(self, fingerprints: np.ndarray) -> int:
+        """
+        บันทึกลายนิ้วมือเพิ่ม
+
+        Returns:
+            int: จำนวนลายนิ้วมือใหม่ที่ยังไม่เคยบันทึก
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.path.with_suffix(".lock")):
+            stored = self.load()
+            merged = np.union1d(stored, np.asarray(fingerprints, dtype=np.uint64))
+            added = len(merged) - len(stored)
+            if added:
+                # ไฟล์ชั่วคราวชื่อไม่ซ้ำในโฟลเดอร์เดียวกัน เพื่อให้ os.replace แทนที่ได้ในครั้งเดียว
+                fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp.npy")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.save(f, merged)
+                    del stored  # ปิด memory-map ก่อนแทนที่ไฟล์
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.unlink(temp_path)
+                    raise
+        return added
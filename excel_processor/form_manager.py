@@ -10,6 +10,7 @@ import pandas as pd
 from sqlalchemy import create_engine, MetaData, Table, Column, String, DateTime
 from sqlalchemy.orm import sessionmaker
 from .processor import ExcelProcessor
+from .sidecar import SidecarCache, shared_sidecar
 import tensorflow as tf
 import numpy as np
 from tensorflow.keras import layers, Model
@@ -57,7 +58,12 @@ class FormTemplate:
 class DeepFormAnalyzer:
     """คลาสสำหรับวิเคราะห์เอกสารด้วย Deep Learning"""
     
-    def __init__(self):
+    def __init__(self, sidecar: Optional[SidecarCache] = None):
+        """
+        Args:
+            sidecar: แคช Arrow ของไฟล์ Excel (ค่าเริ่มต้นใช้แคชร่วมของทั้ง process)
+        """
+        self.sidecar = sidecar or shared_sidecar()
         self.document_model = self._build_document_model()
         self.field_model = self._build_field_model()
         self.label_encoder = LabelEncoder()
@@ -123,8 +129,8 @@ class DeepFormAnalyzer:
         
     def analyze_fields(self, excel_file: str):
         """วิเคราะห์ฟิลด์ข้อมูลในเอกสาร"""
-        # อ่านข้อมูลจาก Excel
-        df = pd.read_excel(excel_file)
+        # อ่านข้อมูลจาก Excel (ผ่านแคช sidecar)
+        df = self.sidecar.read_excel(excel_file)
         
         field_info = {}
         for col in df.columns:
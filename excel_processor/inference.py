@@ -0,0 +1,112 @@
+"""
+ระบบอนุมานชนิดข้อมูลของคอลัมน์ข้อความ
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - แปลงตัวอย่างบางส่วนของคอลัมน์เป็นตัวเลขด้วย errors='coerce' ก่อน
+   - ถ้าตัวอย่างไม่มีค่าที่เป็นตัวเลขเลย ถือว่าเป็นคอลัมน์ข้อความโดยไม่ต้องแปลงทั้งคอลัมน์
+   - ถ้าไม่ใช่ จึงแปลงทั้งคอลัมน์เพื่อยืนยันชนิดข้อมูลและนับค่าที่แปลงไม่ได้ (NaN)
+   - ไม่มีการสร้าง exception ต่อคอลัมน์เหมือน errors='raise'
+   - กรณีตัดสินจากตัวอย่าง (sampled) invalid_count เป็นค่าประมาณที่ถือว่าทุกค่าเป็นข้อความ
+
+2. ชนิดข้อมูลที่อนุมานได้:
+   - integer, float: ทุกค่าแปลงเป็นตัวเลขได้
+   - string: ไม่มีค่าใดแปลงเป็นตัวเลขได้
+   - mixed: มีทั้งค่าที่แปลงได้และแปลงไม่ได้
+   - empty: ไม่มีค่า
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# จำนวนค่าตัวอย่างที่ตรวจก่อนตัดสินใจแปลงทั้งคอลัมน์
+SAMPLE_SIZE = 200
+
+@dataclass
+class ColumnTypeInference:
+    """
+    ผลการอนุมานชนิดข้อมูลของคอลัมน์
+
+    Attributes:
+        inferred_type: ชนิดข้อมูลที่อนุมานได้ (integer/float/string/mixed/empty)
+        non_null_count: จำนวนค่าที่ไม่ว่าง
+        invalid_count: จำนวนค่าที่แปลงเป็นตัวเลขไม่ได้
+        sampled: invalid_count ประมาณจากค่าตัวอย่าง (คอลัมน์ข้อความล้วน)
+    """
+    inferred_type: str
+    non_null_count: int = 0
+    invalid_count: int = 0
+    sampled: bool = False
+
+    @property
+    def invalid_ratio(self) -> float:
+        """สัดส่วนค่าที่แปลงเป็นตัวเลขไม่ได้ต่อค่าที่ไม่ว่าง"""
+        if not self.non_null_count:
+            return 0.0
+        return self.invalid_count / self.non_null_count
+
+    def merge(self, other: "ColumnTypeInference") -> "ColumnTypeInference":
+        """รวมผลของคอลัมน์เดียวกันจากอีกส่วนของข้อมูล"""
+        self.inferred_type = _merge_type(self.inferred_type, other.inferred_type)
+        self.non_null_count += other.non_null_count
+        self.invalid_count += other.invalid_count
+        self.sampled = self.sampled or other.sampled
+        return self
+
+    def to_dict(self) -> dict:
+        """แปลงเป็น dict สำหรับรายงานผล"""
+        return {
+            "inferred_type": self.inferred_type,
+            "invalid_count": self.invalid_count,
+            "invalid_ratio": round(self.invalid_ratio, 4),
+            "sampled": self.sampled
+        }
+
+def _merge_type(current: str, new: str) -> str:
+    """รวมชนิดข้อมูลที่อนุมานได้จากสองส่วนของคอลัมน์"""
+    if current == "empty" or current == new:
+        return new
+    if new == "empty":
+        return current
+    if {current, new} == {"integer", "float"}:
+        return "float"
+    return "mixed"
+
+def _numeric_type(values: pd.Series) -> str:
+    """integer ถ้าทุกค่าเป็นจำนวนเต็ม ไม่เช่นนั้น float"""
+    numbers = values.to_numpy(dtype=np.float64)
+    finite = numbers[np.isfinite(numbers)]
+    return "integer" if np.array_equal(finite, np.floor(finite)) else "float"
+
+def infer_column_type(series: pd.Series, sample_size: int = SAMPLE_SIZE) -> ColumnTypeInference:
+    """
+    อนุมานชนิดข้อมูลและนับค่าที่แปลงเป็นตัวเลขไม่ได้ของคอลัมน์
+
+    Args:
+        series: ข้อมูลของคอลัมน์
+        sample_size: จำนวนค่าตัวอย่าง (เลือกกระจายทั่วทั้งคอลัมน์)
+
+    Returns:
+        ColumnTypeInference ของคอลัมน์
+    """
+    non_null = series.dropna()
+    if non_null.empty:
+        return ColumnTypeInference("empty")
+
+    if len(non_null) > sample_size:
+        positions = np.linspace(0, len(non_null) - 1, sample_size).astype(np.int64)
+        sample = pd.to_numeric(non_null.iloc[positions], errors="coerce")
+        if sample.isna().all():
+            return ColumnTypeInference("string", len(non_null), len(non_null), sampled=True)
+
+    numbers = pd.to_numeric(non_null, errors="coerce")
+    invalid = int(numbers.isna().sum())
+    if invalid == len(non_null):
+        inferred_type = "string"
+    elif invalid:
+        inferred_type = "mixed"
+    else:
+        inferred_type = _numeric_type(numbers)
+    return ColumnTypeInference(inferred_type, len(non_null), invalid)
@@ -21,16 +21,29 @@
 import os
 import pandas as pd
 import logging
-from typing import Dict, Any, Optional, List, Union
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Optional, List, Union
 from pathlib import Path
 import numpy as np
 import traceback
 from datetime import datetime
+from .profiling import DataProfile, profile_dataframe
+from .chunked import iter_excel_chunks, profile_excel
+from .readers import DEFAULT_READER_ENGINE, read_excel, select_engine, sheet_names
+from .sidecar import SidecarCache
+from .compaction import CompactionReport, compact_dataframe
+from .cleaning import CleaningPipeline, CleaningReport
+from .timeseries import TimeSeriesAccumulator
+from .fingerprints import DEFAULT_FINGERPRINT_DIR, RowFingerprintIndex
 
 # ตั้งค่า logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# จำนวน sheet ที่ parse แล้วเก็บไว้ในหน่วยความจำพร้อมกันสูงสุด
+DEFAULT_SHEET_CACHE_SIZE = 4
+
 class ExcelProcessorError(Exception):
     """Base class สำหรับ error ทั้งหมดใน ExcelProcessor"""
     pass
@@ -47,6 +60,91 @@ class ProcessingError(ExcelProcessorError):
     """Error สำหรับการประมวลผลล้มเหลว"""
     pass
 
+class LazyWorkbook(Mapping):
+    """
+    สมุดงาน Excel ที่อ่านแต่ละ sheet เมื่อถูกเรียกใช้ครั้งแรก
+    
+    ใช้งานเหมือน dict ของ {ชื่อ sheet: DataFrame} (เรียกด้วยลำดับ sheet ได้ด้วย)
+    sheet ที่ parse แล้วเก็บไว้ไม่เกิน max_cached_sheets sheet
+    ถ้าเกินจะลบ sheet ที่ไม่ได้ใช้นานที่สุดออกก่อน (LRU)
+    """
+    
+    def __init__(self, file_path: Union[str, Path],
+                 max_cached_sheets: int = DEFAULT_SHEET_CACHE_SIZE,
+                 reader_engine: str = DEFAULT_READER_ENGINE,
+                 sidecar: Optional[SidecarCache] = None) -> None:
+        """
+        Args:
+            file_path: พาธของไฟล์ Excel
+            max_cached_sheets: จำนวน sheet สูงสุดที่เก็บไว้ในหน่วยความจำ
+            reader_engine: ตัวอ่านไฟล์ Excel (ดู excel_processor.readers)
+            sidecar: แคช Arrow ของ sheet ที่เคยอ่านแล้ว
+            
+        Raises:
+            ValueError: ถ้า max_cached_sheets น้อยกว่า 1
+        """
+        if max_cached_sheets < 1:
+            raise ValueError("max_cached_sheets ต้องมากกว่า 0")
+        self.file_path = Path(file_path)
+        self.max_cached_sheets = max_cached_sheets
+        self.reader_engine = reader_engine
+        self.sidecar = sidecar
+        self._sheet_names: Optional[List[str]] = None
+        self._sheets: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self.parse_count = 0
+    
+    @property
+    def sheet_names(self) -> List[str]:
+        """รายชื่อ sheet ตามลำดับในไฟล์ (ไม่ parse ข้อมูลในเซลล์)"""
+        if self._sheet_names is None:
+            self._sheet_names = sheet_names(self.file_path, self.reader_engine)
+        return self._sheet_names
+    
+    @property
+    def cached_sheets(self) -> List[str]:
+        """sheet ที่ parse แล้วและยังอยู่ในหน่วยความจำ เรียงจากใช้ล่าสุดไปเก่าสุด"""
+        return list(reversed(self._sheets))
+    
+    def _resolve(self, sheet: Union[str, int]) -> str:
+        if isinstance(sheet, int):
+            return self.sheet_names[sheet]
+        if sheet not in self.sheet_names:
+            raise KeyError(sheet)
+        return sheet
+    
+    def __getitem__(self, sheet: Union[str, int]) -> pd.DataFrame:
+        name = self._resolve(sheet)
+        if name in self._sheets:
+            self._sheets.move_to_end(name)
+            return self._sheets[name]
+        
+        if self.sidecar is not None:
+            df = self.sidecar.read_excel(self.file_path, name)
+        else:
+            df = read_excel(self.file_path, sheet_name=name, engine=self.reader_engine)
+        self.parse_count += 1
+        self._sheets[name] = df
+        while len(self._sheets) > self.max_cached_sheets:
+            evicted, _ = self._sheets.popitem(last=False)
+            logger.debug(f"นำ sheet ออกจากหน่วยความจำ: {evicted}")
+        return df
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sheet_names)
+    
+    def __len__(self) -> int:
+        return len(self.sheet_names)
+    
+    def __contains__(self, sheet: object) -> bool:
+        return sheet in self.sheet_names
+    
+    def evict(self, sheet: Optional[Union[str, int]] = None) -> None:
+        """ลบ sheet ออกจากหน่วยความจำ (None = ลบทุก sheet)"""
+        if sheet is None:
+            self._sheets.clear()
+        else:
+            self._sheets.pop(self._resolve(sheet), None)
+
 class ExcelProcessor:
     """
     ประมวลผลไฟล์ Excel
@@ -57,40 +155,93 @@ class ExcelProcessor:
     3. ปรับปรุงประสิทธิภาพ
     """
     
-    def __init__(self, file_path: Union[str, Path]) -> None:
+    def __init__(self, file_path: Union[str, Path], chunk_size: Optional[int] = None,
+                 template: Optional[str] = None,
+                 fingerprint_dir: Union[str, Path] = DEFAULT_FINGERPRINT_DIR,
+                 reader_engine: str = DEFAULT_READER_ENGINE,
+                 sidecar: Optional[SidecarCache] = None,
+                 compact: bool = False,
+                 max_cached_sheets: int = DEFAULT_SHEET_CACHE_SIZE,
+                 cleaning: Optional[CleaningPipeline] = None,
+                 sheet_name: Union[str, int] = 0) -> None:
         """
         กำหนดค่าเริ่มต้น
         
         Args:
             file_path: พาธของไฟล์ Excel
+            chunk_size: จำนวนแถวต่อ block สำหรับโหมดอ่านทีละส่วน (chunked)
+                ถ้ากำหนด validate_data, analyze_data และ clean_data จะอ่านไฟล์ทีละ block
+                โดยไม่โหลดทั้งไฟล์เข้า self.df (ความแม่นยำดูที่ excel_processor.chunked)
+            template: ชื่อแม่แบบสำหรับตรวจแถวที่เคยประมวลผลแล้วจากไฟล์ก่อนหน้า
+                (None = ตรวจแถวซ้ำเฉพาะภายในไฟล์)
+            fingerprint_dir: โฟลเดอร์เก็บลายนิ้วมือแถวของแต่ละแม่แบบ
+            reader_engine: ตัวอ่านไฟล์ Excel ของ load_file ("auto" = calamine ถ้าติดตั้งไว้
+                ไม่เช่นนั้น openpyxl ดู excel_processor.readers)
+            sidecar: แคช Arrow ของไฟล์ที่เคยอ่านแล้ว (None = อ่านไฟล์ Excel ทุกครั้ง)
+            compact: ลดขนาดหน่วยความจำของ self.df หลังโหลด (ลดขนาดตัวเลข,
+                ข้อความที่ค่าซ้ำมากเป็น category ที่เหลือเป็น string[pyarrow])
+            max_cached_sheets: จำนวน sheet ที่ parse แล้วเก็บไว้ใน self.workbook พร้อมกันสูงสุด
+            cleaning: ขั้นตอนทำความสะอาดข้อมูลของ clean_data
+                (None = กฎเริ่มต้น; ใช้ CleaningPipeline.from_template ตัวเดียวร่วมกันทุกไฟล์ของแม่แบบ)
+            sheet_name: ชื่อหรือลำดับของ sheet ที่ประมวลผล ทั้งใน load_file และโหมด chunked
             
         Raises:
             FileNotFoundError: ถ้าไม่พบไฟล์
             FileNotSupportedError: ถ้าไฟล์ไม่ใช่ไฟล์ Excel
+            ValueError: ถ้า chunk_size หรือ max_cached_sheets น้อยกว่า 1 หรือใช้ reader_engine ไม่ได้
         """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size ต้องมากกว่า 0")
         self.file_path = Path(file_path)
-        self.df: Optional[pd.DataFrame] = None
-        self.logger = logging.getLogger(__name__)
         
         if not self.file_path.exists():
             raise FileNotFoundError(f"ไม่พบไฟล์: {self.file_path}")
             
         if self.file_path.suffix not in ['.xlsx', '.xls']:
             raise FileNotSupportedError(f"ไม่รองรับไฟล์นามสกุล: {self.file_path.suffix}")
+        
+        self.reader_engine = select_engine(reader_engine, self.file_path)
+        self.chunk_size = chunk_size
+        self.sidecar = sidecar
+        self.compact = compact
+        self.compaction_report: Optional[CompactionReport] = None
+        self.cleaning = cleaning if cleaning is not None else CleaningPipeline()
+        self.cleaning_report: Optional[CleaningReport] = None
+        self.workbook = LazyWorkbook(self.file_path, max_cached_sheets, self.reader_engine, sidecar)
+        self.sheet_name: Union[str, int] = sheet_name
+        self.template = template
+        self.fingerprint_index = (
+            RowFingerprintIndex(template, fingerprint_dir) if template is not None else None
+        )
+        self.df: Optional[pd.DataFrame] = None
+        self._profile: Optional[DataProfile] = None
+        self._profile_source: Optional[pd.DataFrame] = None
+        self.logger = logging.getLogger(__name__)
             
         self.processed_data = {}  # ข้อมูลที่ประมวลผลแล้ว
         
         logger.info(f"เริ่มต้นประมวลผลไฟล์: {file_path}")
     
-    def load_file(self) -> None:
+    def load_file(self, sheet_name: Optional[Union[str, int]] = None) -> None:
         """
         โหลดไฟล์ Excel
         
+        Args:
+            sheet_name: ชื่อหรือลำดับของ sheet ที่จะโหลดเข้า self.df
+                (None = sheet เดิมที่เลือกไว้ เริ่มต้นคือ sheet แรก)
+        
         Raises:
             ProcessingError: ถ้าโหลดไฟล์ไม่สำเร็จ
         """
         try:
-            self.df = pd.read_excel(self.file_path)
+            if sheet_name is not None:
+                self.sheet_name = sheet_name
+            self.df = self.workbook[self.sheet_name]
+            if self.compact:
+                self.df, self.compaction_report = compact_dataframe(self.df)
+                memory = self.compaction_report.to_dict()
+                logger.info(f"ลดขนาดหน่วยความจำ: {memory['before_mb']} MB -> {memory['after_mb']} MB")
+            self.invalidate_profile()
             logger.info(f"โหลดไฟล์สำเร็จ: {self.file_path}")
         except Exception as e:
             error_msg = f"เกิดข้อผิดพลาดในการโหลดไฟล์: {str(e)}"
@@ -98,6 +249,67 @@ class ExcelProcessor:
             self.logger.debug(traceback.format_exc())
             raise ProcessingError(error_msg)
     
+    @property
+    def chunked(self) -> bool:
+        """อยู่ในโหมดอ่านทีละ block และยังไม่ได้โหลดทั้งไฟล์"""
+        return self.chunk_size is not None and self.df is None
+    
+    def _iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """อ่าน sheet ที่เลือกทีละ block ด้วยตัวอ่านเดียวกับ load_file"""
+        return iter_excel_chunks(self.file_path, self.chunk_size, self.sheet_name, self.reader_engine)
+    
+    @property
+    def profile(self) -> DataProfile:
+        """
+        สถิติของ self.df ที่คำนวณครั้งเดียวแล้วใช้ร่วมกันใน validate_data,
+        _calculate_statistics และ analyze_data
+        
+        โหมด chunked จะสรุปสถิติจากไฟล์ทีละ block แทน
+        คำนวณใหม่เมื่อ self.df ถูกแทนที่ หรือเมื่อเรียก invalidate_profile()
+        """
+        if self._profile is not None and self._profile_source is self.df:
+            return self._profile
+        if self.chunked:
+            self._profile = profile_excel(self.file_path, self.chunk_size, self.sheet_name,
+                                          engine=self.reader_engine)
+        else:
+            if self.df is None:
+                self.load_file()
+            self._profile = profile_dataframe(self.df)
+        self._profile_source = self.df
+        return self._profile
+    
+    def _select_columns(self, include: List[Any]) -> List[Any]:
+        """ชื่อคอลัมน์ที่มีชนิดข้อมูลตาม include (ใช้ชนิดข้อมูลจาก profile ในโหมด chunked)"""
+        if self.chunked:
+            frame = pd.DataFrame({
+                column: pd.Series(dtype=dtype) for column, dtype in self.profile.dtypes.items()
+            })
+        else:
+            frame = self.df
+        return list(frame.select_dtypes(include=include).columns)
+    
+    def register_fingerprints(self) -> int:
+        """
+        บันทึกลายนิ้วมือแถวของไฟล์นี้ลงชุดของแม่แบบ
+        
+        Returns:
+            int: จำนวนแถวใหม่ที่ยังไม่เคยบันทึก
+            
+        Raises:
+            ValueError: ถ้าไม่ได้กำหนด template
+        """
+        if self.fingerprint_index is None:
+            raise ValueError("ต้องกำหนด template ก่อนบันทึกลายนิ้วมือแถว")
+        added = self.fingerprint_index.add(self.profile.row_fingerprints)
+        logger.info(f"บันทึกลายนิ้วมือแถวใหม่ {added} แถว: {self.fingerprint_index.path}")
+        return added
+    
+    def invalidate_profile(self) -> None:
+        """ล้างสถิติที่คำนวณไว้ (เรียกหลังแก้ไข self.df ในตัว)"""
+        self._profile = None
+        self._profile_source = None
+    
     def extract_customer_info(self) -> Dict[str, Any]:
         """
         ดึงข้อมูลลูกค้าจาก DataFrame
@@ -148,6 +360,12 @@ class ExcelProcessor:
                 "statistics": self._calculate_statistics(),
                 "processed_at": datetime.now().isoformat()
             }
+            if self.compaction_report is not None:
+                results["memory"] = self.compaction_report.to_dict()
+            
+            # บันทึกลายนิ้วมือแถวเมื่อข้อมูลผ่านการตรวจสอบ เพื่อปฏิเสธไฟล์ที่ส่งซ้ำครั้งถัดไป
+            if self.fingerprint_index is not None and validation_results["is_valid"]:
+                results["registered_rows"] = self.register_fingerprints()
             
             self.logger.info(f"ประมวลผลไฟล์สำเร็จ: {self.file_path}")
             return results
@@ -168,53 +386,92 @@ class ExcelProcessor:
         Raises:
             DataValidationError: ถ้าข้อมูลไม่ถูกต้อง
         """
-        if self.df is None:
+        if self.df is None and not self.chunked:
             self.load_file()
+        
+        try:
+            return self._validate_profile(self.profile)
+        except Exception as e:
+            error_msg = f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}"
+            self.logger.error(error_msg)
+            self.logger.debug(traceback.format_exc())
+            raise DataValidationError(error_msg)
+    
+    def validate_sheets(self, sheets: Optional[List[Union[str, int]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        ตรวจสอบความถูกต้องของข้อมูลทีละ sheet
+        
+        แต่ละ sheet ถูก parse เมื่อถึงคิวตรวจ และอยู่ในหน่วยความจำไม่เกิน
+        max_cached_sheets sheet พร้อมกัน
+        
+        Args:
+            sheets: ชื่อหรือลำดับของ sheet ที่ต้องการตรวจ (None = ทุก sheet)
             
+        Returns:
+            Dict[str, Dict[str, Any]]: ผลการตรวจสอบของแต่ละ sheet ตามชื่อ sheet
+            
+        Raises:
+            DataValidationError: ถ้าตรวจสอบ sheet ใดไม่สำเร็จ
+        """
+        results = {}
+        for sheet in (self.workbook.sheet_names if sheets is None else sheets):
+            name = self.workbook.sheet_names[sheet] if isinstance(sheet, int) else sheet
+            try:
+                results[name] = self._validate_profile(profile_dataframe(self.workbook[name]))
+            except Exception as e:
+                error_msg = f"เกิดข้อผิดพลาดในการตรวจสอบ sheet {name}: {str(e)}"
+                self.logger.error(error_msg)
+                self.logger.debug(traceback.format_exc())
+                raise DataValidationError(error_msg)
+        return results
+    
+    def _validate_profile(self, profile: DataProfile) -> Dict[str, Any]:
+        """ตรวจสอบความถูกต้องของข้อมูลจากสถิติของตาราง"""
         validation_results = {
             "is_valid": True,
             "errors": [],
             "warnings": []
         }
         
-        try:
-            # ตรวจสอบค่าว่าง
-            null_counts = self.df.isnull().sum()
-            if null_counts.any():
+        # ตรวจสอบค่าว่าง
+        null_counts = profile.null_counts
+        if null_counts.any():
+            validation_results["warnings"].append({
+                "type": "null_values",
+                "columns": null_counts[null_counts > 0].to_dict()
+            })
+            
+        # ตรวจสอบค่าซ้ำ
+        if profile.duplicate_count > 0:
+            validation_results["warnings"].append({
+                "type": "duplicates",
+                "count": profile.duplicate_count
+            })
+            
+        # ตรวจสอบประเภทข้อมูล (คอลัมน์ข้อความที่มีค่าแปลงเป็นตัวเลขไม่ได้)
+        for column, inference in profile.inferred_types.items():
+            if inference.invalid_count:
                 validation_results["warnings"].append({
-                    "type": "null_values",
-                    "columns": null_counts[null_counts > 0].to_dict()
+                    "type": "invalid_numeric",
+                    "column": column,
+                    **inference.to_dict()
                 })
-                
-            # ตรวจสอบค่าซ้ำ
-            duplicates = self.df.duplicated()
-            if duplicates.any():
-                validation_results["warnings"].append({
-                    "type": "duplicates",
-                    "count": duplicates.sum()
+        
+        # ตรวจสอบแถวที่เคยประมวลผลแล้วจากไฟล์ก่อนหน้าของแม่แบบเดียวกัน
+        if self.fingerprint_index is not None:
+            seen = self.fingerprint_index.contains(profile.row_fingerprints)
+            if seen.any():
+                validation_results["errors"].append({
+                    "type": "previously_processed",
+                    "template": self.template,
+                    "count": int(seen.sum()),
+                    "rows": np.flatnonzero(seen)[:10].tolist()
                 })
                 
-            # ตรวจสอบประเภทข้อมูล
-            for column in self.df.columns:
-                try:
-                    if self.df[column].dtype == 'object':
-                        pd.to_numeric(self.df[column], errors='raise')
-                except:
-                    validation_results["warnings"].append({
-                        "type": "invalid_numeric",
-                        "column": column
-                    })
-                    
-            if len(validation_results["errors"]) > 0:
-                validation_results["is_valid"] = False
-                
-            return validation_results
+        if len(validation_results["errors"]) > 0:
+            validation_results["is_valid"] = False
             
-        except Exception as e:
-            error_msg = f"เกิดข้อผิดพลาดในการตรวจสอบข้อมูล: {str(e)}"
-            self.logger.error(error_msg)
-            self.logger.debug(traceback.format_exc())
-            raise DataValidationError(error_msg)
+        return validation_results
     
     def _calculate_statistics(self) -> Dict[str, Any]:
         """
@@ -227,18 +484,20 @@ class ExcelProcessor:
             ProcessingError: ถ้าคำนวณไม่สำเร็จ
         """
         try:
+            profile = self.profile
             stats = {
-                "row_count": len(self.df),
-                "column_count": len(self.df.columns),
+                "row_count": profile.row_count,
+                "column_count": profile.column_count,
                 "numeric_columns": {}
             }
             
-            for column in self.df.select_dtypes(include=[np.number]).columns:
+            for column in self._select_columns([np.number]):
+                column_stats = profile.numeric[column]
                 stats["numeric_columns"][column] = {
-                    "mean": self.df[column].mean(),
-                    "std": self.df[column].std(),
-                    "min": self.df[column].min(),
-                    "max": self.df[column].max()
+                    "mean": column_stats["mean"],
+                    "std": column_stats["std"],
+                    "min": column_stats["min"],
+                    "max": column_stats["max"]
                 }
                 
             return stats
@@ -272,43 +531,74 @@ class ExcelProcessor:
             logger.error(f"เกิดข้อผิดพลาดในการบันทึกเทมเพลต: {str(e)}")
             raise
     
-    def clean_data(self) -> None:
+    def clean_data(self, output_path: Optional[Union[str, Path]] = None) -> None:
         """
         ทำความสะอาดข้อมูล
         
+        Args:
+            output_path: ไฟล์ CSV สำหรับเขียนข้อมูลที่ทำความสะอาดแล้ว
+                (จำเป็นในโหมด chunked ซึ่งไม่เก็บข้อมูลไว้ใน self.df)
+        
+        Raises:
+            ValueError: ถ้าอยู่ในโหมด chunked แต่ไม่ได้กำหนด output_path
+        
         Tips สำหรับนักศึกษา:
         - จัดการค่า null
         - ลบข้อมูลซ้ำ
         - แปลงรูปแบบข้อมูล
         """
+        if self.chunked:
+            if output_path is None:
+                raise ValueError("โหมด chunked ต้องกำหนด output_path สำหรับเขียนข้อมูลที่ทำความสะอาดแล้ว")
+            self._clean_chunks(output_path)
+            return
+        
         if self.df is None:
             self.load_file()
         
-        # ลบคอลัมน์ที่ไม่มีชื่อ
-        unnamed_cols = [col for col in self.df.columns if 'Unnamed:' in str(col)]
-        self.df = self.df.drop(columns=unnamed_cols)
-        
-        # จัดการค่า null
-        self.df = self.df.fillna({
-            'ชื่อ-นามสกุล': 'ไม่ระบุ',
-            'ที่อยู่': 'ไม่ระบุ',
-            'เลขประจำตัวผู้เสียภาษี': '0000000000'
-        })
-        
-        # ลบข้อมูลซ้ำ
-        self.df = self.df.drop_duplicates()
+        self.df = self._clean_frame(self.df)
+        self.invalidate_profile()
+        if output_path is not None:
+            self.df.to_csv(output_path, index=False)
         
-        # แปลงรูปแบบวันที่
-        date_columns = self.df.select_dtypes(include=['datetime64']).columns
-        for col in date_columns:
-            self.df[col] = pd.to_datetime(self.df[col]).dt.strftime('%Y-%m-%d')
+        logger.info(
+            f"ทำความสะอาดข้อมูลสำเร็จ: {len(self.df)} แถว "
+            f"(หลีกเลี่ยงการคัดลอกทั้งตาราง {self.cleaning_report.copies_avoided} ครั้ง)"
+        )
+    
+    def _clean_frame(self, df: pd.DataFrame, seen_rows: Optional[set] = None) -> pd.DataFrame:
+        """
+        ทำความสะอาด DataFrame หนึ่งชุดด้วย self.cleaning
         
-        logger.info(f"ทำความสะอาดข้อมูลสำเร็จ: {len(self.df)} แถว")
+        Args:
+            df: ข้อมูลที่ต้องการทำความสะอาด
+            seen_rows: ลายนิ้วมือของแถวที่พบแล้วจาก block ก่อนหน้า สำหรับลบแถวซ้ำข้าม block
+                (None = ลบแถวซ้ำภายใน df เท่านั้น)
+        """
+        df, self.cleaning_report = self.cleaning.apply(df, seen_rows)
+        return df
+    
+    def _clean_chunks(self, output_path: Union[str, Path]) -> None:
+        """ทำความสะอาดข้อมูลทีละ block แล้วเขียนต่อท้ายไฟล์ CSV"""
+        seen_rows: set = set()
+        rows = 0
+        total: Optional[CleaningReport] = None
+        for idx, chunk in enumerate(self._iter_chunks()):
+            cleaned = self._clean_frame(chunk, seen_rows)
+            cleaned.to_csv(output_path, mode="w" if idx == 0 else "a", header=idx == 0, index=False)
+            rows += len(cleaned)
+            total = self.cleaning_report if total is None else total.merge(self.cleaning_report)
+        self.cleaning_report = total
+        logger.info(f"ทำความสะอาดข้อมูลสำเร็จ: {rows} แถว -> {output_path}")
     
-    def analyze_data(self) -> Dict[str, Any]:
+    def analyze_data(self, freq: str = "auto") -> Dict[str, Any]:
         """
         วิเคราะห์ข้อมูลเชิงลึก
         
+        Args:
+            freq: ความถี่ของแนวโน้มตามเวลา "D" (วัน), "W" (สัปดาห์), "M" (เดือน)
+                หรือ "auto" (ละเอียดที่สุดที่ไม่เกิน MAX_TIME_BUCKETS ช่วง ดู excel_processor.timeseries)
+        
         Returns:
             Dict[str, Any]: ผลการวิเคราะห์
         
@@ -317,20 +607,23 @@ class ExcelProcessor:
         - วิเคราะห์แนวโน้ม
         - สร้างการจัดกลุ่ม
         """
-        if self.df is None:
+        if self.df is None and not self.chunked:
             self.load_file()
         
-        # สถิติพื้นฐาน
+        profile = self.profile
+        
+        # สถิติพื้นฐาน (ไม่นับค่า NaN)
         numeric_stats = {}
-        for col in self.df.select_dtypes(include=['int64', 'float64']).columns:
-            data = self.df[col].dropna()  # ลบค่า NaN ก่อนคำนวณ
-            if len(data) > 0:  # ตรวจสอบว่ามีข้อมูลก่อนคำนวณ
+        for col in self._select_columns([np.integer, np.floating]):
+            column_stats = profile.numeric[col]
+            count = column_stats["count"]
+            if count > 0:  # ตรวจสอบว่ามีข้อมูลก่อนคำนวณ
                 numeric_stats[col] = {
-                    "count": len(data),
-                    "mean": float(data.mean()),
-                    "std": float(data.std()) if len(data) > 1 else 0,
-                    "min": float(data.min()),
-                    "max": float(data.max())
+                    "count": count,
+                    "mean": float(column_stats["mean"]),
+                    "std": float(column_stats["std"]) if count > 1 else 0,
+                    "min": float(column_stats["min"]),
+                    "max": float(column_stats["max"])
                 }
             else:
                 numeric_stats[col] = {
@@ -343,14 +636,23 @@ class ExcelProcessor:
         
         # การจัดกลุ่ม
         groupby_results = {}
-        for col in self.df.select_dtypes(include=['object']).columns:
-            groupby_results[col] = self.df[col].value_counts().to_dict()
-        
-        # แนวโน้มตามเวลา
-        time_series = {}
-        date_columns = self.df.select_dtypes(include=['datetime64']).columns
-        for col in date_columns:
-            time_series[col] = self.df.groupby(col).size().to_dict()
+        for col in self._select_columns(['object', 'category', 'string']):
+            groupby_results[col] = profile.value_counts[col].to_dict()
+        
+        # แนวโน้มตามเวลา: count, sum และ mean ของคอลัมน์ตัวเลขในแต่ละช่วงเวลา
+        value_columns = list(numeric_stats)
+        accumulators = [
+            TimeSeriesAccumulator(col, value_columns) for col in self._select_columns(['datetime64'])
+        ]
+        if accumulators:
+            # โหมด chunked อ่านไฟล์อีกรอบ (เฉพาะเมื่อมีคอลัมน์วันที่) แล้วรวมผลรายวันของทุก block
+            frames = self._iter_chunks() if self.chunked else [self.df]
+            for frame in frames:
+                for accumulator in accumulators:
+                    accumulator.update(frame)
+        time_series = {
+            accumulator.time_column: accumulator.result(freq) for accumulator in accumulators
+        }
         
         analysis_results = {
             "numeric_stats": numeric_stats,
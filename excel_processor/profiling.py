@@ -0,0 +1,174 @@
+"""
+ระบบสรุปสถิติของ DataFrame ในรอบเดียว
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - จัดกลุ่มคอลัมน์ตามชนิดข้อมูล (column block)
+   - คำนวณสถิติของทุกคอลัมน์ใน block พร้อมกันด้วย NumPy
+   - เก็บผลลัพธ์ไว้ใช้ร่วมกันแทนการอ่าน DataFrame ซ้ำหลายรอบ
+
+2. สถิติที่คำนวณ:
+   - จำนวนค่าว่างของทุกคอลัมน์
+   - count/mean/std/min/max ของคอลัมน์ตัวเลข
+   - จำนวนค่าที่ไม่ซ้ำและค่าที่พบบ่อย (top-k) ของคอลัมน์ข้อความ
+   - จำนวนแถวที่ซ้ำกัน
+   - ชนิดข้อมูลที่อนุมานได้และสัดส่วนค่าที่ไม่ใช่ตัวเลขของคอลัมน์ข้อความ
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .fingerprints import duplicated_fingerprints, row_fingerprints
+from .inference import ColumnTypeInference, infer_column_type
+
+@dataclass
+class DataProfile:
+    """
+    สถิติของ DataFrame ที่คำนวณครั้งเดียวแล้วใช้ร่วมกัน
+
+    Attributes:
+        row_count: จำนวนแถว
+        columns: ชื่อคอลัมน์ตามลำดับใน DataFrame
+        null_counts: จำนวนค่าว่างของแต่ละคอลัมน์ (Series ที่มี index เป็นชื่อคอลัมน์)
+        numeric: count/mean/std/min/max ของคอลัมน์ตัวเลข
+        value_counts: จำนวนครั้งที่พบแต่ละค่าของคอลัมน์ข้อความ เรียงจากมากไปน้อย
+        distinct_counts: จำนวนค่าที่ไม่ซ้ำ (ไม่นับค่าว่าง) ของทุกคอลัมน์
+        duplicate_count: จำนวนแถวที่ซ้ำกับแถวก่อนหน้า
+        dtypes: ชนิดข้อมูลของแต่ละคอลัมน์ (ชื่อชนิดแบบ pandas)
+        inferred_types: ชนิดข้อมูลที่อนุมานได้และจำนวนค่าที่แปลงเป็นตัวเลขไม่ได้ของคอลัมน์ข้อความ
+        row_fingerprints: ลายนิ้วมือ uint64 ของทุกแถว (None ถ้าไม่ได้นับแถวซ้ำ)
+    """
+    row_count: int
+    columns: List[Any]
+    null_counts: pd.Series
+    numeric: Dict[Any, Dict[str, Any]] = field(default_factory=dict)
+    value_counts: Dict[Any, pd.Series] = field(default_factory=dict)
+    distinct_counts: Dict[Any, int] = field(default_factory=dict)
+    duplicate_count: Any = 0
+    dtypes: Dict[Any, str] = field(default_factory=dict)
+    inferred_types: Dict[Any, ColumnTypeInference] = field(default_factory=dict)
+    row_fingerprints: Optional[np.ndarray] = None
+
+    @property
+    def column_count(self) -> int:
+        """จำนวนคอลัมน์"""
+        return len(self.columns)
+
+    def top_values(self, column: Any, k: int = 10) -> Dict[Any, int]:
+        """ค่าที่พบบ่อยที่สุด k ค่าของคอลัมน์ข้อความ"""
+        return self.value_counts[column].head(k).to_dict()
+
+def _column_blocks(df: pd.DataFrame) -> Dict[np.dtype, List[int]]:
+    """จัดกลุ่มตำแหน่งคอลัมน์ตามชนิดข้อมูล"""
+    blocks: Dict[np.dtype, List[int]] = {}
+    for position, dtype in enumerate(df.dtypes):
+        blocks.setdefault(dtype, []).append(position)
+    return blocks
+
+def _numeric_block_stats(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    คำนวณ count/mean/std/min/max และจำนวนค่าที่ไม่ซ้ำของทุกคอลัมน์ใน block ตัวเลขพร้อมกัน
+
+    ใช้ลำดับการคำนวณเดียวกับ pandas (ผลรวมหารจำนวน แล้วผลรวมกำลังสองของส่วนเบี่ยงเบน
+    หารด้วย n - 1) เพื่อให้ได้ค่าเท่ากับ Series.mean() และ Series.std()
+    min/max และจำนวนค่าที่ไม่ซ้ำได้จากการเรียงลำดับ block ครั้งเดียว (NaN อยู่ท้ายสุด)
+    """
+    rows = values.shape[0]
+    mask = np.isnan(values) if values.dtype.kind == "f" else None
+    nulls = mask.sum(axis=0) if mask is not None else np.zeros(values.shape[1], dtype=np.int64)
+    counts = rows - nulls
+
+    filled = values if mask is None else np.where(mask, 0, values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = filled.sum(axis=0, dtype=np.float64) / counts
+        deviations = (means - values) ** 2
+        if mask is not None:
+            deviations[mask] = 0
+        variances = deviations.sum(axis=0, dtype=np.float64) / (counts - 1)
+    variances[counts <= 1] = np.nan
+
+    has_values = counts > 0
+    ordered = np.sort(values, axis=0)
+    changes = ordered[1:] != ordered[:-1]
+    if mask is not None:
+        changes &= ~np.isnan(ordered[1:])
+    distinct = np.where(has_values, changes.sum(axis=0) + 1, 0)
+    if rows and has_values.all():
+        columns = np.arange(values.shape[1])
+        mins = ordered[0]
+        maxs = ordered[counts - 1, columns]
+    else:
+        safe_last = np.maximum(counts - 1, 0)
+        first = ordered[0] if rows else np.zeros(values.shape[1])
+        last = ordered[safe_last, np.arange(values.shape[1])] if rows else np.zeros(values.shape[1])
+        mins = np.where(has_values, first, np.nan)
+        maxs = np.where(has_values, last, np.nan)
+
+    return {
+        "nulls": nulls,
+        "count": counts,
+        "mean": means,
+        "std": np.sqrt(variances),
+        "min": mins,
+        "max": maxs,
+        "distinct": distinct
+    }
+
+def _is_text_dtype(dtype: Any) -> bool:
+    """คอลัมน์ข้อความ: object, category หรือ string (รวม string[pyarrow])"""
+    return dtype == object or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+def profile_dataframe(df: pd.DataFrame, top_k: Optional[int] = None,
+                      include_duplicates: bool = True) -> DataProfile:
+    """
+    สรุปสถิติของ DataFrame โดยอ่านแต่ละ column block เพียงครั้งเดียว
+
+    Args:
+        df: DataFrame ที่ต้องการสรุป
+        top_k: จำนวนค่าที่พบบ่อยที่สุดที่เก็บต่อคอลัมน์ข้อความ (None = เก็บทุกค่า)
+        include_duplicates: นับจำนวนแถวที่ซ้ำกันด้วย
+
+    Returns:
+        DataProfile ของ DataFrame
+    """
+    columns = list(df.columns)
+    null_counts = np.zeros(len(columns), dtype=np.int64)
+    profile = DataProfile(row_count=len(df), columns=columns, null_counts=None)
+
+    for dtype, positions in _column_blocks(df).items():
+        block = df.iloc[:, positions]
+
+        if isinstance(dtype, np.dtype) and dtype.kind in "iuf":
+            values = block.to_numpy()
+            stats = _numeric_block_stats(values)
+            null_counts[positions] = stats["nulls"]
+            for idx, position in enumerate(positions):
+                profile.numeric[columns[position]] = {
+                    "count": int(stats["count"][idx]),
+                    "mean": stats["mean"][idx],
+                    "std": stats["std"][idx],
+                    "min": stats["min"][idx],
+                    "max": stats["max"][idx]
+                }
+                profile.distinct_counts[columns[position]] = int(stats["distinct"][idx])
+            continue
+
+        null_counts[positions] = pd.isna(block.to_numpy()).sum(axis=0)
+        for position in positions:
+            counts = df.iloc[:, position].value_counts()
+            profile.distinct_counts[columns[position]] = len(counts)
+            if _is_text_dtype(dtype):
+                if isinstance(dtype, pd.CategoricalDtype):
+                    counts = counts[counts > 0]
+                profile.value_counts[columns[position]] = counts if top_k is None else counts.head(top_k)
+                profile.inferred_types[columns[position]] = infer_column_type(df.iloc[:, position])
+
+    profile.dtypes = {column: str(dtype) for column, dtype in df.dtypes.items()}
+    profile.null_counts = pd.Series(null_counts, index=df.columns)
+    if include_duplicates:
+        profile.row_fingerprints = row_fingerprints(df)
+        profile.duplicate_count = duplicated_fingerprints(profile.row_fingerprints).sum()
+    return profile
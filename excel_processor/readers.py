@@ -0,0 +1,125 @@
+"""
+ระบบเลือกตัวอ่านไฟล์ Excel (reader engine)
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - openpyxl อ่านทุกเซลล์เป็น object ของ Python จึงช้าเมื่ออ่านเฉพาะค่าจากไฟล์ใหญ่
+   - calamine (แพ็คเกจ python-calamine เขียนด้วย Rust) อ่านเฉพาะค่าได้เร็วกว่าและใช้หน่วยความจำน้อยกว่า
+   - engine="auto" เลือก calamine เมื่อติดตั้งไว้ ไม่เช่นนั้นใช้ openpyxl (หรือ xlrd สำหรับ .xls)
+
+2. การทำงานกับ pandas:
+   - pandas ตั้งแต่ 2.2 รองรับ engine="calamine" โดยตรง
+   - pandas รุ่นเก่ากว่าใช้ python-calamine อ่านค่า แล้วส่งให้ TextParser ของ pandas
+     ตั้งชื่อคอลัมน์และอนุมานชนิดข้อมูลแบบเดียวกับ pd.read_excel
+"""
+
+import datetime
+import importlib.util
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# ตัวอ่านที่รองรับ เรียงตามลำดับที่ engine="auto" เลือกใช้
+READER_ENGINES = ("calamine", "openpyxl", "xlrd")
+
+# ตัวอ่านเริ่มต้น (กำหนดผ่าน environment variable ได้)
+DEFAULT_READER_ENGINE = os.getenv("EXCEL_READER_ENGINE", "auto")
+
+def _is_installed(engine: str) -> bool:
+    """ตรวจว่าติดตั้งแพ็คเกจของตัวอ่านไว้หรือไม่"""
+    module = "python_calamine" if engine == "calamine" else engine
+    return importlib.util.find_spec(module) is not None
+
+def _pandas_supports(engine: str) -> bool:
+    """pandas รุ่นที่ติดตั้งรองรับตัวอ่านนี้ใน pd.read_excel โดยตรงหรือไม่"""
+    return engine in getattr(pd.ExcelFile, "_engines", {})
+
+def available_engines() -> List[str]:
+    """ตัวอ่านที่ใช้ได้ในเครื่องนี้ เรียงตามลำดับความเร็ว"""
+    return [engine for engine in READER_ENGINES if _is_installed(engine)]
+
+def select_engine(engine: str = DEFAULT_READER_ENGINE,
+                  file_path: Union[str, Path, None] = None) -> str:
+    """
+    เลือกตัวอ่านสำหรับไฟล์
+
+    Args:
+        engine: ชื่อตัวอ่าน หรือ "auto" ให้เลือกตัวที่เร็วที่สุดที่ติดตั้งไว้
+        file_path: พาธของไฟล์ (ใช้ตรวจนามสกุล .xls ที่ openpyxl อ่านไม่ได้)
+
+    Raises:
+        ValueError: ถ้าไม่รู้จักตัวอ่าน หรือไม่ได้ติดตั้งแพ็คเกจของตัวอ่านนั้น
+    """
+    if engine == "auto":
+        if _is_installed("calamine"):
+            return "calamine"
+        legacy = file_path is not None and Path(file_path).suffix.lower() == ".xls"
+        return "xlrd" if legacy else "openpyxl"
+    if engine not in READER_ENGINES:
+        raise ValueError(f"ไม่รู้จักตัวอ่าน Excel: {engine} (รองรับ: auto, {', '.join(READER_ENGINES)})")
+    if not _is_installed(engine):
+        raise ValueError(f"ยังไม่ได้ติดตั้งแพ็คเกจสำหรับตัวอ่าน: {engine}")
+    return engine
+
+def sheet_names(file_path: Union[str, Path], engine: str = DEFAULT_READER_ENGINE) -> List[str]:
+    """รายชื่อ sheet ในไฟล์ตามลำดับ โดยไม่อ่านข้อมูลในเซลล์"""
+    engine = select_engine(engine, file_path)
+    if engine == "calamine":
+        from python_calamine import CalamineWorkbook
+        return list(CalamineWorkbook.from_path(str(file_path)).sheet_names)
+    with pd.ExcelFile(file_path, engine=engine) as excel_file:
+        return list(excel_file.sheet_names)
+
+def _convert_calamine_cell(value: Any) -> Any:
+    """แปลงค่าจาก calamine ให้ตรงกับที่ openpyxl คืน (จำนวนเต็มเป็น int, วันที่เป็น Timestamp)"""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return pd.Timestamp(value)
+    if isinstance(value, datetime.timedelta):
+        return pd.Timedelta(value)
+    return value
+
+def _read_calamine_sheet(sheet, **kwargs) -> pd.DataFrame:
+    rows = sheet.to_python(skip_empty_area=False)
+    for row in rows:
+        row[:] = map(_convert_calamine_cell, row)  # แปลงในที่เดิม ไม่สร้างสำเนาของทั้ง sheet
+    if not rows:
+        return pd.DataFrame()
+    with TextParser(rows, header=kwargs.pop("header", 0), **kwargs) as parser:
+        return parser.read()
+
+def _read_calamine(file_path: Union[str, Path], sheet_name: Union[str, int, None] = 0,
+                   **kwargs) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """อ่านไฟล์ด้วย python-calamine สำหรับ pandas ที่ยังไม่รองรับ engine="calamine" """
+    from python_calamine import CalamineWorkbook
+
+    workbook = CalamineWorkbook.from_path(str(file_path))
+    if sheet_name is None:
+        return {
+            name: _read_calamine_sheet(workbook.get_sheet_by_name(name), **kwargs)
+            for name in workbook.sheet_names
+        }
+    if isinstance(sheet_name, int):
+        return _read_calamine_sheet(workbook.get_sheet_by_index(sheet_name), **kwargs)
+    return _read_calamine_sheet(workbook.get_sheet_by_name(sheet_name), **kwargs)
+
+def read_excel(file_path: Union[str, Path], sheet_name: Union[str, int, None] = 0,
+               engine: str = DEFAULT_READER_ENGINE,
+               **kwargs) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    อ่านไฟล์ Excel ด้วยตัวอ่านที่เลือก ผลลัพธ์รูปแบบเดียวกับ pd.read_excel
+
+    Args:
+        file_path: พาธของไฟล์ Excel
+        sheet_name: ชื่อหรือลำดับของ sheet (None = อ่านทุก sheet เป็น dict)
+        engine: ชื่อตัวอ่าน หรือ "auto"
+        **kwargs: ตัวเลือกอื่นที่ส่งต่อให้ pandas (เช่น header, usecols, nrows)
+    """
+    engine = select_engine(engine, file_path)
+    if engine == "calamine" and not _pandas_supports(engine):
+        return _read_calamine(file_path, sheet_name, **kwargs)
+    return pd.read_excel(file_path, sheet_name=sheet_name, engine=engine, **kwargs)
@@ -0,0 +1,178 @@
+"""
+ระบบแคชไฟล์ Excel ที่แปลงเป็น Arrow แล้ว (sidecar)
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - แปลง sheet ของไฟล์ Excel เป็นไฟล์ Arrow IPC (Feather v2) เพียงครั้งเดียว
+   - ครั้งต่อไปอ่านจากไฟล์ Arrow แบบ memory-map แทนการ parse xlsx ใหม่
+   - กุญแจของแคชคือ พาธ + เวลาแก้ไขล่าสุด (mtime) + ขนาดไฟล์
+     ไฟล์ที่ถูกแก้ไขจะได้กุญแจใหม่ และ sidecar เก่าของพาธเดียวกันถูกลบทิ้ง
+
+2. ข้อควรรู้:
+   - ใช้ Arrow IPC แบบไม่บีบอัดเพราะ memory-map ได้โดยตรง (Parquet ต้องคลายการบีบอัดก่อน)
+   - แปลงเป็น DataFrame แบบ zero-copy เท่าที่ dtype อนุญาต (split_blocks, self_destruct):
+     คอลัมน์ตัวเลขและวันที่ที่ไม่มีค่าว่างอ้างถึงหน่วยความจำของไฟล์ที่ memory-map ไว้โดยตรง
+     ส่วนคอลัมน์ข้อความและคอลัมน์ที่มีค่าว่างยังถูกแปลงเป็นสำเนา
+   - คอลัมน์แบบ zero-copy อ่านได้อย่างเดียว การแทนที่ทั้งคอลัมน์ (df[col] = ...) ทำได้ตามปกติ
+     แต่การแก้ไขรายเซลล์ (df.loc[...] = ...) ต้อง df.copy() ก่อน แคชจึงไม่ถูกแก้ไขโดยไม่ตั้งใจ
+   - sheet ที่ Arrow แปลงไม่ได้ (เช่น คอลัมน์ที่มีทั้งตัวเลขและข้อความ) จะไม่ถูกแคช
+   - Arrow เก็บชื่อคอลัมน์เป็นข้อความเท่านั้น ชื่อคอลัมน์เดิมและชนิด (เช่น หัวคอลัมน์ปี 2024)
+     จึงถูกเก็บใน schema metadata และคืนค่าตอนอ่าน sheet ที่หัวคอลัมน์เป็นชนิดอื่น
+     (เช่น วันที่) จะไม่ถูกแคช
+"""
+
+import hashlib
+import json
+import logging
+import numbers
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+
+from .readers import DEFAULT_READER_ENGINE, read_excel
+
+logger = logging.getLogger(__name__)
+
+# โฟลเดอร์เริ่มต้นสำหรับเก็บไฟล์ sidecar
+DEFAULT_SIDECAR_DIR = os.getenv("SIDECAR_CACHE_DIR", "cache/sidecar")
+
+# คีย์ใน schema metadata ที่เก็บชื่อคอลัมน์เดิมพร้อมชนิด
+COLUMNS_METADATA_KEY = b"excel_processor.columns"
+
+def _encode_columns(columns) -> Optional[bytes]:
+    """แปลงชื่อคอลัมน์เป็น JSON ของ [ชนิด, ค่า] (None ถ้ามีชื่อที่เป็นชนิดอื่น)"""
+    labels = []
+    for label in columns:
+        if isinstance(label, str):
+            labels.append(["str", label])
+        elif isinstance(label, bool):
+            return None
+        elif isinstance(label, numbers.Integral):
+            labels.append(["int", int(label)])
+        elif isinstance(label, numbers.Real):
+            labels.append(["float", float(label)])
+        else:
+            return None
+    return json.dumps(labels, ensure_ascii=False).encode("utf-8")
+
+def _decode_columns(payload: bytes) -> list:
+    """คืนชื่อคอลัมน์เดิมจาก JSON ที่สร้างด้วย _encode_columns"""
+    types = {"str": str, "int": int, "float": float}
+    return [types[kind](value) for kind, value in json.loads(payload)]
+
+class SidecarCache:
+    """แคช DataFrame ของ sheet ในไฟล์ Excel เป็นไฟล์ Arrow ที่อ่านแบบ memory-map"""
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_SIDECAR_DIR,
+                 engine: str = DEFAULT_READER_ENGINE):
+        """
+        Args:
+            cache_dir: โฟลเดอร์เก็บไฟล์ sidecar
+            engine: ตัวอ่านไฟล์ Excel ตอนแปลงครั้งแรก (ดู excel_processor.readers)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.engine = engine
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+    def sidecar_path(self, file_path: Union[str, Path], sheet_name: Union[str, int] = 0) -> Path:
+        """พาธของไฟล์ sidecar สำหรับไฟล์และ sheet นี้ (ตาม mtime และขนาดปัจจุบัน)"""
+        source = Path(file_path).resolve()
+        stat = source.stat()
+        prefix = self._digest(f"{source}:{sheet_name!r}")
+        stamp = self._digest(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return self.cache_dir / f"{prefix}-{stamp}.arrow"
+
+    def read_excel(self, file_path: Union[str, Path], sheet_name: Union[str, int] = 0) -> pd.DataFrame:
+        """
+        อ่าน sheet จาก sidecar ถ้ามี ไม่เช่นนั้นอ่านไฟล์ Excel แล้วบันทึก sidecar
+
+        Args:
+            file_path: พาธของไฟล์ Excel
+            sheet_name: ชื่อหรือลำดับของ sheet
+        """
+        path = self.sidecar_path(file_path, sheet_name)
+        df = self._load(path)
+        if df is not None:
+            self.hits += 1
+            return df
+
+        self.misses += 1
+        df = read_excel(file_path, sheet_name=sheet_name, engine=self.engine)
+        self._store(path, df)
+        return df
+
+    def _load(self, path: Path) -> Optional[pd.DataFrame]:
+        if not path.exists():
+            return None
+        try:
+            # ไม่ปิด memory-map เอง: buffer ของคอลัมน์ zero-copy ถือ mapping ไว้จนกว่า DataFrame จะถูกทิ้ง
+            source = pa.memory_map(str(path), "r")
+            table = pa.ipc.open_file(source).read_all()
+            columns = (table.schema.metadata or {}).get(COLUMNS_METADATA_KEY)
+            if columns is None:
+                raise pa.ArrowInvalid("ไม่มีข้อมูลชื่อคอลัมน์เดิมใน schema metadata")
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            df.columns = _decode_columns(columns)
+            return df
+        except (OSError, pa.ArrowInvalid, ValueError) as e:
+            logger.warning(f"อ่านไฟล์ sidecar ไม่สำเร็จ จะแปลงใหม่: {path} ({e})")
+            return None
+
+    def _store(self, path: Path, df: pd.DataFrame) -> None:
+        columns = _encode_columns(df.columns)
+        if columns is None:
+            logger.info(f"ข้ามการสร้าง sidecar ที่ชื่อคอลัมน์เก็บชนิดไว้ไม่ได้: {path.name}")
+            return
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.info(f"ข้ามการสร้าง sidecar ที่ Arrow แปลงไม่ได้: {path.name} ({e})")
+            return
+        table = table.replace_schema_metadata({**table.schema.metadata, COLUMNS_METADATA_KEY: columns})
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # ไฟล์ชั่วคราวชื่อไม่ซ้ำ เพื่อให้หลาย process แปลงไฟล์เดียวกันพร้อมกันได้โดยไม่เขียนทับกัน
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(temp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        # ลบ sidecar ของไฟล์และ sheet เดียวกันที่สร้างจากเนื้อหาเวอร์ชันก่อน
+        prefix = path.name.split("-")[0]
+        for stale in self.cache_dir.glob(f"{prefix}-*.arrow"):
+            if stale != path:
+                try:
+                    stale.unlink(missing_ok=True)
+                except PermissionError:
+                    # Windows ลบไฟล์ที่ DataFrame ยัง memory-map อยู่ไม่ได้ จะลบในการบันทึกครั้งถัดไป
+                    pass
+
+    def clear(self) -> None:
+        """ลบไฟล์ sidecar ทั้งหมด"""
+        for path in self.cache_dir.glob("*.arrow"):
+            path.unlink(missing_ok=True)
+
+_shared_cache: Optional[SidecarCache] = None
+
+def shared_sidecar() -> SidecarCache:
+    """แคช sidecar ที่ใช้ร่วมกันทั้ง process"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = SidecarCache()
+    return _shared_cache
@@ -0,0 +1,136 @@
+"""
+ระบบสรุปข้อมูลตามช่วงเวลา (time-series resampling)
+
+สำหรับนักศึกษา:
+1. แนวคิดหลัก:
+   - groupby ด้วย timestamp ดิบได้หนึ่งกลุ่มต่อเวลาที่ไม่ซ้ำ ไฟล์ log ใหญ่จึงได้ dict ขนาดมหึมา
+   - resample รวมแถวเป็นช่วงเวลาคงที่ (วัน สัปดาห์ เดือน) แบบ vectorized
+     แล้วคำนวณ count, sum และ mean ของคอลัมน์ตัวเลขในแต่ละช่วง
+   - ผลลัพธ์เป็น list ของตัวเลขเรียงตามช่วงเวลา พร้อมป้ายเวลาของช่วงแรก (start) และความถี่
+     สร้างแกนเวลาคืนได้ด้วย pd.date_range(start, periods=len(count), freq=freq)
+     (ป้ายของ W คือวันอาทิตย์ท้ายสัปดาห์ และของ M คือวันสิ้นเดือน ตามแบบของ pandas)
+
+2. การทำงานทีละ block (chunked):
+   - สรุปแต่ละ block เป็นรายวันก่อน (count และ sum บวกรวมกันได้ตรง)
+   - รวมรายวันของทุก block แล้วจึง resample เป็นสัปดาห์หรือเดือน
+     ผลจึงตรงกับการคำนวณจากทั้งไฟล์ในครั้งเดียว
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ความถี่ที่รองรับ: D = รายวัน, W = รายสัปดาห์ (สิ้นสุดวันอาทิตย์), M = รายเดือน (ป้ายเป็นวันสิ้นเดือน)
+TIME_SERIES_FREQUENCIES = ("D", "W", "M")
+
+# ชื่อความถี่ของ pandas ที่ใช้จริง: pandas 2.2 ขึ้นไปเปลี่ยนชื่อรายเดือนจาก "M" เป็น "ME"
+# (ชื่อเดิมยังใช้ได้แต่เตือน FutureWarning) ผลลัพธ์ยังรายงาน freq เป็น "M" เหมือนเดิม
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+_RESAMPLE_RULES = {"D": "D", "W": "W", "M": "ME" if _PANDAS_VERSION >= (2, 2) else "M"}
+
+# จำนวนช่วงเวลาสูงสุดที่ freq="auto" ยอมให้ (เลือกความถี่ที่ละเอียดที่สุดที่ไม่เกินนี้)
+MAX_TIME_BUCKETS = 400
+
+def choose_frequency(first: pd.Timestamp, last: pd.Timestamp,
+                     max_buckets: int = MAX_TIME_BUCKETS) -> str:
+    """เลือกความถี่ที่ละเอียดที่สุดที่จำนวนช่วงเวลาไม่เกิน max_buckets"""
+    days = (last.normalize() - first.normalize()).days + 1
+    if days <= max_buckets:
+        return "D"
+    if math.ceil(days / 7) + 1 <= max_buckets:
+        return "W"
+    return "M"
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """แปลงเป็น list สำหรับ JSON (NaN เป็น None)"""
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+class TimeSeriesAccumulator:
+    """สะสมผลรวมรายวันของคอลัมน์ตัวเลขตามคอลัมน์วันที่หนึ่งคอลัมน์"""
+
+    def __init__(self, time_column: Any, value_columns: List[Any]):
+        """
+        Args:
+            time_column: คอลัมน์วันที่ที่ใช้แบ่งช่วงเวลา
+            value_columns: คอลัมน์ตัวเลขที่ต้องการ sum และ mean
+        """
+        self.time_column = time_column
+        self.value_columns = [column for column in value_columns if column != time_column]
+        self.rows: Optional[pd.Series] = None  # จำนวนแถวต่อวัน
+        self.sums: Optional[pd.DataFrame] = None  # ผลรวมต่อวัน
+        self.counts: Optional[pd.DataFrame] = None  # จำนวนค่าที่ไม่ว่างต่อวัน (ใช้คำนวณ mean)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """เพิ่มข้อมูลหนึ่ง block"""
+        times = pd.to_datetime(df[self.time_column], errors="coerce")
+        valid = times.notna().to_numpy()
+        index = pd.DatetimeIndex(times[valid], name=None)
+        if not len(index):
+            return
+
+        values = pd.DataFrame({
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)[valid]
+            for column in self.value_columns
+        }, index=index)
+        resampler = values.resample("D")
+        rows = pd.Series(1, index=index, dtype=np.int64).resample("D").sum()
+        sums, counts = resampler.sum(), resampler.count()
+
+        if self.rows is None:
+            self.rows, self.sums, self.counts = rows, sums, counts
+        else:
+            self.rows = self.rows.add(rows, fill_value=0).astype(np.int64)
+            self.sums = self.sums.add(sums, fill_value=0)
+            self.counts = self.counts.add(counts, fill_value=0)
+
+    def result(self, freq: str = "auto") -> Dict[str, Any]:
+        """
+        สรุปเป็นช่วงเวลาตามความถี่
+
+        Args:
+            freq: "D", "W", "M" หรือ "auto" (เลือกตามช่วงเวลาของข้อมูล)
+
+        Returns:
+            dict ที่มี freq, start, count (จำนวนแถว) และ sum, mean ของแต่ละคอลัมน์ตัวเลข
+            ช่วงเวลาที่ไม่มีข้อมูลมี count เป็น 0 และ mean เป็น None
+        """
+        if freq != "auto" and freq not in TIME_SERIES_FREQUENCIES:
+            raise ValueError(
+                f"ไม่รองรับความถี่: {freq} (รองรับ: auto, {', '.join(TIME_SERIES_FREQUENCIES)})"
+            )
+        if self.rows is None:
+            return {
+                "freq": None if freq == "auto" else freq,
+                "start": None,
+                "count": [],
+                "sum": {column: [] for column in self.value_columns},
+                "mean": {column: [] for column in self.value_columns}
+            }
+
+        if freq == "auto":
+            freq = choose_frequency(self.rows.index[0], self.rows.index[-1])
+        rule = _RESAMPLE_RULES[freq]
+        rows = self.rows.resample(rule).sum()
+        sums = self.sums.resample(rule).sum()
+        counts = self.counts.resample(rule).sum()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums.to_numpy() / counts.to_numpy()
+
+        return {
+            "freq": freq,
+            "start": rows.index[0].isoformat(),
+            "count": rows.tolist(),
+            "sum": {column: sums[column].tolist() for column in self.value_columns},
+            "mean": {
+                column: _to_list(means[:, idx]) for idx, column in enumerate(self.value_columns)
+            }
+        }
+
+def resample_time_series(df: pd.DataFrame, time_column: Any, value_columns: List[Any],
+                         freq: str = "auto") -> Dict[str, Any]:
+    """สรุป df ตามช่วงเวลาของ time_column (ดู TimeSeriesAccumulator.result)"""
+    accumulator = TimeSeriesAccumulator(time_column, value_columns)
+    accumulator.update(df)
+    return accumulator.result(freq)
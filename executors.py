@@ -0,0 +1,258 @@
+"""
+ระบบส่งงานที่บล็อกออกจาก event loop ของ API
+รองรับ:
+- process pool ขนาดจำกัดสำหรับงานที่ใช้ CPU (แยกวิเคราะห์ไฟล์ Excel)
+- thread pool สำหรับงาน I/O (ฐานข้อมูล แคช และไฟล์)
+- จำกัดจำนวนงานพร้อมกันแยกตาม endpoint ด้วย asyncio.Semaphore
+- ตัวชี้วัดความยาวคิว (งานที่รอ slot ของ endpoint และงานที่รอ worker ของ pool)
+- ประมวลผลหลายรายการพร้อมกันและคืนผลตามลำดับที่เสร็จ (fan_out)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+
+# ตั้งค่า logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# จำนวน process สำหรับงาน CPU และจำนวน thread สำหรับงาน I/O
+DEFAULT_PROCESS_WORKERS = int(os.getenv("API_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_IO_WORKERS = int(os.getenv("API_IO_WORKERS", "8"))
+
+# จำนวนไฟล์ที่ประมวลผลพร้อมกันสูงสุดต่อหนึ่ง request แบบกลุ่ม
+DEFAULT_BATCH_PARALLELISM = int(os.getenv("API_BATCH_PARALLELISM", "4"))
+
+# จำนวนงานพร้อมกันสูงสุดของแต่ละ endpoint รวมทุก request (endpoint อื่นใช้ DEFAULT_ENDPOINT_LIMIT)
+DEFAULT_ENDPOINT_LIMIT = int(os.getenv("API_ENDPOINT_LIMIT", "4"))
+ENDPOINT_LIMITS: Dict[str, int] = {
+    "process-excel": DEFAULT_ENDPOINT_LIMIT,
+    "bulk-suggest": DEFAULT_BATCH_PARALLELISM,
+    "batch-process": DEFAULT_BATCH_PARALLELISM
+}
+
+@dataclass
+class BatchItem:
+    """ผลของรายการหนึ่งใน fan_out (error เป็น None เมื่อสำเร็จ)"""
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+@dataclass
+class EndpointStats:
+    """สถิติของ endpoint หนึ่ง"""
+    limit: int
+    active: int = 0      # งานที่ได้ slot แล้วและกำลังทำงาน
+    waiting: int = 0     # งานที่รอ slot (ความยาวคิว)
+    completed: int = 0
+    failed: int = 0
+    max_waiting: int = 0
+
+class _PoolStats:
+    """นับงานที่ส่งเข้า pool แล้วยังไม่เสร็จ (ปลอดภัยเมื่อเรียกจากหลาย thread)"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def submitted(self):
+        with self._lock:
+            self.pending += 1
+
+    def finished(self, _future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def to_dict(self) -> Dict[str, int]:
+        # งานที่เกินจำนวน worker คืองานที่รออยู่ในคิวของ pool
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers)
+        }
+
+class ExecutorLayer:
+    """
+    ชั้นส่งงานสำหรับ handler แบบ async
+
+    handler เรียก await run_cpu(...) หรือ await run_io(...) แทนการเรียกฟังก์ชันที่บล็อกตรงๆ
+    event loop จึงว่างรับ request อื่น (เช่น /status) ระหว่างประมวลผลไฟล์ใหญ่
+    """
+
+    def __init__(self, process_workers: int = DEFAULT_PROCESS_WORKERS,
+                 io_workers: int = DEFAULT_IO_WORKERS,
+                 endpoint_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = DEFAULT_ENDPOINT_LIMIT):
+        """
+        Args:
+            process_workers: จำนวน process สำหรับงาน CPU
+            io_workers: จำนวน thread สำหรับงาน I/O
+            endpoint_limits: จำนวนงานพร้อมกันสูงสุดแยกตาม endpoint
+            default_limit: จำนวนงานพร้อมกันสูงสุดของ endpoint ที่ไม่ได้กำหนด
+        """
+        if process_workers < 1 or io_workers < 1 or default_limit < 1:
+            raise ValueError("จำนวน worker และจำนวนงานพร้อมกันต้องมากกว่า 0")
+        self.process_workers = process_workers
+        self.io_workers = io_workers
+        self.endpoint_limits = dict(ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits)
+        self.default_limit = default_limit
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._process_stats = _PoolStats(process_workers)
+        self._thread_stats = _PoolStats(io_workers)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """process pool (สร้างเมื่อใช้งานครั้งแรก)"""
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        """thread pool (สร้างเมื่อใช้งานครั้งแรก)"""
+        with self._pool_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.io_workers, thread_name_prefix="api-io"
+                )
+            return self._thread_pool
+
+    def _endpoint(self, endpoint: str):
+        """semaphore และสถิติของ endpoint (สร้างเมื่อใช้งานครั้งแรก)"""
+        if endpoint not in self._semaphores:
+            limit = self.endpoint_limits.get(endpoint, self.default_limit)
+            self._semaphores[endpoint] = asyncio.Semaphore(limit)
+            self.endpoints[endpoint] = EndpointStats(limit=limit)
+        return self._semaphores[endpoint], self.endpoints[endpoint]
+
+    def slot(self, endpoint: str) -> "_EndpointSlot":
+        """
+        จอง slot ของ endpoint สำหรับงานหลายขั้นตอน
+
+        ใช้กับ async with เพื่อให้ทุกขั้นตอนของไฟล์เดียว (อ่านแคช แยกวิเคราะห์ บันทึก)
+        นับเป็นงานเดียวของ endpoint
+        """
+        return _EndpointSlot(self, endpoint)
+
+    async def _submit(self, executor: Executor, stats: _PoolStats,
+                      func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        stats.submitted()
+        future = executor.submit(partial(func, *args, **kwargs))
+        future.add_done_callback(stats.finished)
+        return await asyncio.wrap_future(future, loop=loop)
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        รันงาน CPU ใน process pool
+
+        func และอาร์กิวเมนต์ต้อง pickle ได้ (ฟังก์ชันระดับโมดูล ไม่ใช่ method ของ object ที่ถือ connection)
+        """
+        return await self._submit(self.process_pool, self._process_stats, func, *args, **kwargs)
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """รันงาน I/O (ฐานข้อมูล แคช ไฟล์) ใน thread pool"""
+        return await self._submit(self.thread_pool, self._thread_stats, func, *args, **kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """ตัวชี้วัดของ pool และความยาวคิวของแต่ละ endpoint"""
+        return {
+            "process_pool": self._process_stats.to_dict(),
+            "thread_pool": self._thread_stats.to_dict(),
+            "endpoints": {
+                name: {
+                    "limit": stats.limit,
+                    "active": stats.active,
+                    "queue_depth": stats.waiting,
+                    "max_queue_depth": stats.max_waiting,
+                    "completed": stats.completed,
+                    "failed": stats.failed
+                }
+                for name, stats in self.endpoints.items()
+            }
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ปิด pool ทั้งหมด"""
+        with self._pool_lock:
+            for pool in (self._process_pool, self._thread_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait)
+            self._process_pool = None
+            self._thread_pool = None
+
+class _EndpointSlot:
+    """async context manager ที่จอง slot ของ endpoint และบันทึกสถิติ"""
+
+    def __init__(self, layer: ExecutorLayer, endpoint: str):
+        self.semaphore, self.stats = layer._endpoint(endpoint)
+
+    async def __aenter__(self) -> "_EndpointSlot":
+        stats = self.stats
+        if self.semaphore.locked():
+            # slot เต็ม: นับเป็นงานที่รอในคิวจนกว่าจะได้ slot
+            stats.waiting += 1
+            stats.max_waiting = max(stats.max_waiting, stats.waiting)
+            try:
+                await self.semaphore.acquire()
+            finally:
+                stats.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        stats.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.stats.active -= 1
+        if exc_type is None:
+            self.stats.completed += 1
+        else:
+            self.stats.failed += 1
+        self.semaphore.release()
+
+async def fan_out(items: Iterable[Any], func: Callable[[Any], Awaitable[Any]],
+                  max_parallel: int = DEFAULT_BATCH_PARALLELISM) -> AsyncIterator[BatchItem]:
+    """
+    เรียก await func(item) กับทุกรายการพร้อมกันไม่เกิน max_parallel รายการ
+
+    คืนผลทีละรายการตามลำดับที่ทำงานเสร็จ รายการที่ล้มเหลวได้ BatchItem ที่มี error
+    โดยไม่ยกเลิกรายการอื่น ถ้าผู้เรียกหยุดอ่านก่อนครบ งานที่เหลือจะถูกยกเลิก
+
+    Args:
+        items: รายการที่ต้องการประมวลผล
+        func: coroutine function ที่รับหนึ่งรายการ
+        max_parallel: จำนวนรายการที่ทำงานพร้อมกันสูงสุด
+    """
+    if max_parallel < 1:
+        raise ValueError("max_parallel ต้องมากกว่า 0")
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def run(index: int, item: Any) -> BatchItem:
+        async with semaphore:
+            try:
+                return BatchItem(index, item, result=await func(item))
+            except Exception as e:
+                return BatchItem(index, item, error=e)
+
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,353 @@
+"""
+ระบบงานเบื้องหลัง (job queue) สำหรับไฟล์ Excel ขนาดใหญ่
+รองรับ:
+- POST /jobs คืนรหัสงานทันที แล้วประมวลผลไฟล์ในเบื้องหลังผ่าน ExecutorLayer
+- ติดตามความคืบหน้า (จำนวน sheet ที่เสร็จและจำนวนแถวที่ประมวลผลแล้ว)
+- เก็บสถานะงานใน SQLite ในเครื่อง (ค่าเริ่มต้น) หรือ Redis เมื่อกำหนด JOB_STORE_URL=redis://...
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from executors import ExecutorLayer
+from main import parse_sheet_worker
+
+# ตั้งค่า logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# ที่เก็บสถานะงาน: พาธของไฟล์ SQLite หรือ URL ของ Redis (redis://...)
+DEFAULT_JOB_STORE = os.getenv("JOB_STORE_URL", "data/jobs/jobs.db")
+
+# โฟลเดอร์เก็บไฟล์ที่อัปโหลดระหว่างรอประมวลผล
+DEFAULT_JOB_UPLOAD_DIR = os.getenv("JOB_UPLOAD_DIR", "data/jobs/uploads")
+
+# สถานะของงาน
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# ข้อมูลของงานที่ส่งกลับให้ผู้ใช้
+JOB_FIELDS = (
+    "id", "filename", "status", "sheets_total", "sheets_done", "rows_processed",
+    "error", "created_at", "updated_at", "finished_at"
+)
+
+class SQLiteJobStore:
+    """เก็บสถานะงานในไฟล์ SQLite และผลลัพธ์เป็นไฟล์ JSON ข้างกัน"""
+
+    def __init__(self, path: str = DEFAULT_JOB_STORE):
+        """
+        Args:
+            path: พาธของไฟล์ SQLite (ผลลัพธ์เก็บในโฟลเดอร์ results ข้างไฟล์นี้)
+        """
+        self.path = Path(path)
+        self.result_dir = self.path.parent / "results"
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    status TEXT NOT NULL,
+                    sheets_total INTEGER,
+                    sheets_done INTEGER NOT NULL DEFAULT 0,
+                    rows_processed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """เปิด connection ใหม่ทุกครั้ง (เรียกได้จากทุก thread) commit เมื่อสำเร็จแล้วปิด"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, job_id: str, filename: Optional[str]) -> Dict[str, Any]:
+        """สร้างงานใหม่ในสถานะ queued"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, filename, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, filename, JOB_QUEUED, now, now)
+            )
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """อัปเดตข้อมูลของงาน (updated_at ถูกตั้งให้อัตโนมัติ)"""
+        fields["updated_at"] = time.time()
+        unknown = set(fields) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"ไม่รู้จักข้อมูลของงาน: {', '.join(sorted(unknown))}")
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ข้อมูลของงาน (None ถ้าไม่พบ)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.result_dir / f"{job_id}.json"
+
+    def save_result(self, job_id: str, result: Any) -> None:
+        """บันทึกผลลัพธ์ของงาน (เขียนไฟล์ชั่วคราวแล้วแทนที่ เพื่อไม่ให้อ่านได้ไฟล์ที่เขียนไม่ครบ)"""
+        fd, temp_path = tempfile.mkstemp(dir=self.result_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_path, self._result_path(job_id))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def load_result(self, job_id: str) -> Optional[Any]:
+        """ผลลัพธ์ของงาน (None ถ้ายังไม่มี)"""
+        try:
+            with open(self._result_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def fail_interrupted(self) -> int:
+        """
+        เปลี่ยนงานที่ค้างจากการปิดระบบครั้งก่อนเป็น failed
+
+        Returns:
+            int: จำนวนงานที่ถูกเปลี่ยนสถานะ
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ? "
+                "WHERE status IN (?, ?)",
+                (JOB_FAILED, "ระบบหยุดทำงานระหว่างประมวลผล", now, now, JOB_QUEUED, JOB_RUNNING)
+            )
+        return cursor.rowcount
+
+class RedisJobStore:
+    """เก็บสถานะงานใน Redis (hash ต่องาน) สำหรับรันหลาย instance ร่วมกัน"""
+
+    def __init__(self, url: str, ttl: int = 7 * 24 * 3600):
+        """
+        Args:
+            url: URL ของ Redis เช่น redis://redis:6379/0
+            ttl: อายุของข้อมูลงานและผลลัพธ์ (วินาที)
+
+        Raises:
+            ValueError: ถ้ายังไม่ได้ติดตั้งแพ็คเกจ redis
+        """
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("ต้องติดตั้งแพ็คเกจ redis เพื่อใช้ JOB_STORE_URL แบบ redis://")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(job_id: str, suffix: str = "") -> str:
+        return f"excel-jobs:{job_id}{suffix}"
+
+    def create(self, job_id: str, filename: Optional[str]) -> Dict[str, Any]:
+        """สร้างงานใหม่ในสถานะ queued"""
+        now = time.time()
+        job = {"id": job_id, "filename": filename or "", "status": JOB_QUEUED,
+               "sheets_done": 0, "rows_processed": 0, "created_at": now, "updated_at": now}
+        self.client.hset(self._key(job_id), mapping=job)
+        self.client.expire(self._key(job_id), self.ttl)
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """อัปเดตข้อมูลของงาน (updated_at ถูกตั้งให้อัตโนมัติ)"""
+        fields["updated_at"] = time.time()
+        unknown = set(fields) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"ไม่รู้จักข้อมูลของงาน: {', '.join(sorted(unknown))}")
+        self.client.hset(self._key(job_id), mapping={
+            name: "" if value is None else value for name, value in fields.items()
+        })
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ข้อมูลของงาน (None ถ้าไม่พบ)"""
+        raw = self.client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        job = {name: raw.get(name) or None for name in JOB_FIELDS}
+        for name in ("sheets_total", "sheets_done", "rows_processed"):
+            job[name] = int(job[name]) if job[name] is not None else None
+        for name in ("created_at", "updated_at", "finished_at"):
+            job[name] = float(job[name]) if job[name] is not None else None
+        return job
+
+    def save_result(self, job_id: str, result: Any) -> None:
+        """บันทึกผลลัพธ์ของงาน"""
+        self.client.set(self._key(job_id, ":result"), json.dumps(result, ensure_ascii=False), ex=self.ttl)
+
+    def load_result(self, job_id: str) -> Optional[Any]:
+        """ผลลัพธ์ของงาน (None ถ้ายังไม่มี)"""
+        raw = self.client.get(self._key(job_id, ":result"))
+        return json.loads(raw) if raw is not None else None
+
+    def fail_interrupted(self) -> int:
+        """
+        ไม่เปลี่ยนสถานะงานใน Redis เพราะงานที่ค้างอาจเป็นของ instance อื่นที่ยังทำงานอยู่
+        """
+        return 0
+
+def _remove_file(file_path: str) -> None:
+    """ลบไฟล์ที่อัปโหลด (ถ้ายังอยู่)"""
+    if os.path.exists(file_path):
+        os.unlink(file_path)
+
+def open_job_store(url: str = DEFAULT_JOB_STORE):
+    """เปิดที่เก็บสถานะงานตาม URL (redis://... ใช้ Redis นอกนั้นเป็นพาธของไฟล์ SQLite)"""
+    if url.startswith(("redis://", "rediss://")):
+        return RedisJobStore(url)
+    return SQLiteJobStore(url)
+
+class JobQueue:
+    """
+    คิวงานประมวลผลไฟล์ Excel ในเบื้องหลัง
+
+    แต่ละงานแยกวิเคราะห์ทีละ sheet ใน process pool (พร้อมกันได้หลาย sheet)
+    อัปเดตความคืบหน้าเมื่อแต่ละ sheet เสร็จ แล้วบันทึกลงฐานข้อมูลใน thread pool
+    จำนวนงานที่ทำพร้อมกันถูกจำกัดด้วย slot "jobs" ของ ExecutorLayer
+    """
+
+    def __init__(self, store, executors: ExecutorLayer,
+                 processor_factory: Callable[..., Any],
+                 upload_dir: str = DEFAULT_JOB_UPLOAD_DIR, endpoint: str = "jobs"):
+        """
+        Args:
+            store: ที่เก็บสถานะงาน (SQLiteJobStore หรือ RedisJobStore)
+            executors: ชั้นส่งงานที่ใช้ร่วมกับ API
+            processor_factory: ฟังก์ชันสร้าง main.ExcelProcessor จากพาธไฟล์และตัวเลือก
+            upload_dir: โฟลเดอร์เก็บไฟล์ที่อัปโหลดระหว่างรอประมวลผล
+            endpoint: ชื่อ slot ของ ExecutorLayer ที่ใช้จำกัดจำนวนงานพร้อมกัน
+        """
+        self.store = store
+        self.executors = executors
+        self.processor_factory = processor_factory
+        self.upload_dir = Path(upload_dir)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.endpoint = endpoint
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, file_path: str, filename: Optional[str] = None,
+                     **options: Any) -> Dict[str, Any]:
+        """
+        รับไฟล์เข้าคิว แล้วคืนข้อมูลงานทันทีโดยไม่รอประมวลผล
+
+        Args:
+            file_path: พาธของไฟล์ที่อัปโหลดไว้ใน upload_dir (คิวลบไฟล์ให้เมื่องานจบ)
+            filename: ชื่อไฟล์ต้นฉบับ
+            **options: ตัวเลือกของ main.ExcelProcessor (เช่น incremental, source_name, content_hash)
+        """
+        job_id = uuid.uuid4().hex
+        job = await self.executors.run_io(self.store.create, job_id, filename)
+
+        task = asyncio.create_task(self._run(job_id, str(file_path), options))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ข้อมูลและความคืบหน้าของงาน"""
+        return self.store.get(job_id)
+
+    def result(self, job_id: str) -> Optional[Any]:
+        """ผลลัพธ์ของงานที่เสร็จแล้ว"""
+        return self.store.load_result(job_id)
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        """อัปเดตข้อมูลของงานใน thread pool (ที่เก็บสถานะอาจบล็อกระหว่างรอ lock ของ SQLite)"""
+        await self.executors.run_io(self.store.update, job_id, **fields)
+
+    async def _run(self, job_id: str, file_path: str, options: Dict[str, Any]) -> None:
+        try:
+            async with self.executors.slot(self.endpoint):
+                await self._update(job_id, status=JOB_RUNNING)
+                result = await self._process(job_id, file_path, options)
+                await self.executors.run_io(self.store.save_result, job_id, result)
+            await self._update(job_id, status=JOB_SUCCEEDED, finished_at=time.time())
+            logger.info(f"งาน {job_id} เสร็จสมบูรณ์")
+        except asyncio.CancelledError:
+            # บันทึกสถานะให้เสร็จแม้ task จะถูกยกเลิกระหว่างรอ thread pool
+            await asyncio.shield(self._update(
+                job_id, status=JOB_FAILED, error="งานถูกยกเลิก", finished_at=time.time()
+            ))
+            raise
+        except Exception as e:
+            logger.error(f"งาน {job_id} ล้มเหลว: {str(e)}")
+            await self._update(job_id, status=JOB_FAILED, error=str(e), finished_at=time.time())
+        finally:
+            await self.executors.run_io(_remove_file, file_path)
+
+    async def _process(self, job_id: str, file_path: str, options: Dict[str, Any]) -> Any:
+        processor = self.processor_factory(file_path, **options)
+        sheet_names = await self.executors.run_io(processor.sheet_names)
+        await self._update(job_id, sheets_total=len(sheet_names))
+
+        if processor.incremental:
+            # incremental อ่านไฟล์สลับกับเทียบลายนิ้วมือในฐานข้อมูลภายใน transaction เดียว
+            summary = await self.executors.run_io(processor.process_file)
+            await self._update(job_id, sheets_done=len(sheet_names), rows_processed=sum(
+                report["structure_rows"] for report in summary.values()
+            ))
+            return summary
+
+        cached = await self.executors.run_io(processor.cached_result)
+        if cached is not None:
+            await self._update(job_id, sheets_done=len(cached), rows_processed=sum(
+                len(sheet["structure"]) for sheet in cached.values()
+            ))
+            return cached
+
+        worker_options = processor.parse_options
+        parsed: Dict[str, Dict] = {}
+        rows = 0
+
+        async def parse(sheet_name: str):
+            nonlocal rows
+            parsed[sheet_name] = await self.executors.run_cpu(
+                parse_sheet_worker, file_path, sheet_name, worker_options
+            )
+            rows += len(parsed[sheet_name]["structure"])
+            await self._update(job_id, sheets_done=len(parsed), rows_processed=rows)
+
+        await asyncio.gather(*(parse(sheet_name) for sheet_name in sheet_names))
+        # เรียงผลตามลำดับ sheet ใน workbook ไม่ขึ้นกับลำดับที่ process ทำงานเสร็จ
+        processed_data = {sheet_name: parsed[sheet_name] for sheet_name in sheet_names}
+        await self.executors.run_io(processor.store, processed_data)
+        return processed_data
+
+    async def shutdown(self) -> None:
+        """ยกเลิกงานที่ยังไม่เสร็จ (สถานะเป็น failed)"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -14,13 +14,23 @@ Version: 1.0.0
 
 import pandas as pd
 from openpyxl import load_workbook
+from openpyxl.cell.read_only import EmptyCell, ReadOnlyCell
 from openpyxl.styles import Font, Alignment, Border
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 import json
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Integer, JSON
+import hashlib
+from sqlalchemy import MetaData, Table, Column, Index, String, Integer, JSON, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from pathlib import Path
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
 import re
+import time
 import logging
+from result_cache import ResultCache, file_hash
+from database.engine import get_engine, ensure_schema
 
 # ตั้งค่า logging
 logging.basicConfig(
@@ -29,6 +39,367 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# เวอร์ชันของตัวประมวลผล (ใช้เป็นส่วนหนึ่งของกุญแจแคช)
+PROCESSOR_VERSION = "1.1.0"
+
+# ฐานข้อมูลเริ่มต้นของตัวประมวลผล
+DEFAULT_DATABASE_URL = 'sqlite:///excel_data.db'
+
+# จำนวนแถวต่อหนึ่งชุดคำสั่ง executemany
+DEFAULT_CHUNK_SIZE = 1000
+
+# รูปแบบการเก็บข้อมูลเนื้อหา
+# eav: หนึ่งแถวต่อเซลล์ในตาราง Content
+# wide: หนึ่งตารางต่อ sheet หนึ่งแถวต่อแถวข้อมูล แยกคอลัมน์ตามหัวตารางพร้อมชนิดข้อมูล
+# parquet: หนึ่งไฟล์ Parquet ต่อ sheet ในรูปแบบเดียวกับ wide
+STORAGE_BACKENDS = ("eav", "wide", "parquet")
+DEFAULT_STORAGE_BACKEND = "eav"
+DEFAULT_PARQUET_DIR = "data/parquet"
+ROW_INDEX_COLUMN = "row_index"
+
+# รูปแบบชื่อลูกค้า: คำนำหน้า ชื่อ และนามสกุล
+THAI_NAME_PATTERN = re.compile(r'^(นาย|นาง|นางสาว)\s+(.+?)\s+(.+)$')
+NAME_FIELDS = ("title", "first_name", "last_name")
+
+# โครงสร้างตารางในฐานข้อมูล
+metadata = MetaData()
+
+# ตารางเก็บข้อมูลเนื้อหา
+content_table = Table(
+    'Content', metadata,
+    Column('entry_id', Integer, primary_key=True),
+    Column('sheet_name', String),
+    Column('column_name', String),
+    Column('cell_value', String),
+    Column('source_name', String),
+    Column('row_number', Integer),
+    Index('ix_content_source_row', 'source_name', 'sheet_name', 'row_number')
+)
+
+# ตารางเก็บข้อมูลโครงสร้าง
+structure_table = Table(
+    'Structure', metadata,
+    Column('entry_id', Integer, primary_key=True),
+    Column('sheet_name', String),
+    Column('row_number', Integer),
+    Column('formatting', JSON),
+    Column('style_ids', JSON),
+    Column('source_name', String),
+    Index('ix_structure_source_row', 'source_name', 'sheet_name', 'row_number')
+)
+
+# ตารางเก็บสไตล์ที่ไม่ซ้ำกัน
+style_table = Table(
+    'Style', metadata,
+    Column('style_id', Integer, primary_key=True),
+    Column('style_key', String, unique=True),
+    Column('formatting', JSON)
+)
+
+# ทะเบียนตารางแบบ wide และไฟล์ Parquet ของแต่ละ sheet
+content_table_registry = Table(
+    'ContentTable', metadata,
+    Column('entry_id', Integer, primary_key=True),
+    Column('source_name', String),
+    Column('sheet_name', String),
+    Column('storage_backend', String),
+    Column('location', String),
+    Column('row_count', Integer),
+    Column('columns', JSON)
+)
+
+# ลายนิ้วมือของ sheet และของแต่ละ block แถว สำหรับการประมวลผลเฉพาะส่วนที่เปลี่ยน
+fingerprint_table = Table(
+    'SheetFingerprint', metadata,
+    Column('entry_id', Integer, primary_key=True),
+    Column('source_name', String),
+    Column('sheet_name', String),
+    Column('header_fingerprint', String),
+    Column('sheet_fingerprint', String),
+    Column('block_fingerprints', JSON)
+)
+
+# ตารางเก็บเทมเพลต
+template_table = Table(
+    'Template', metadata,
+    Column('template_id', Integer, primary_key=True),
+    Column('name', String),
+    Column('structure', JSON)
+)
+
+def _add_missing_columns(engine: Engine, metadata: MetaData):
+    """เพิ่มคอลัมน์และ index ใหม่ให้ตารางที่สร้างไว้ก่อนหน้าในฐานข้อมูลเดิม"""
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {quote(table.name)} "
+                        f"ADD COLUMN {quote(column.name)} {column_type}"
+                    ))
+                    logger.info(f"เพิ่มคอลัมน์ {column.name} ในตาราง {table.name}")
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def init_database(engine: Optional[Engine] = None) -> Engine:
+    """
+    เตรียมฐานข้อมูลของตัวประมวลผล (สร้างตารางเพียงครั้งเดียวต่อ engine)
+    
+    Args:
+        engine: engine ที่ต้องการใช้ (ค่าเริ่มต้นใช้ engine ร่วมของ DEFAULT_DATABASE_URL)
+        
+    Returns:
+        Engine ที่พร้อมใช้งาน
+    """
+    engine = engine if engine is not None else get_engine(DEFAULT_DATABASE_URL)
+    ensure_schema(engine, metadata, _add_missing_columns)
+    return engine
+
+def _content_frame(content: List[Dict[str, Any]],
+                   numeric_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    แปลงข้อมูล content ของ sheet เป็น DataFrame แบบ wide พร้อมคอลัมน์ row_index
+    
+    เฉพาะคอลัมน์ใน numeric_columns (เซลล์ต้นทางเป็นตัวเลขใน Excel) ถูกเก็บเป็นตัวเลข
+    คอลัมน์อื่นเก็บเป็นข้อความตามเดิม เช่น เบอร์โทรหรือรหัสไปรษณีย์ที่ขึ้นต้นด้วย 0
+    """
+    frame = pd.DataFrame.from_records(content)
+    for column in numeric_columns:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column])
+    frame.insert(0, ROW_INDEX_COLUMN, range(len(frame)))
+    return frame
+
+def _numeric_columns(structure: List[Dict[str, Any]]) -> List[str]:
+    """คอลัมน์ตัวเลขที่บันทึกไว้ในแถวส่วนหัวของ structure"""
+    return structure[0].get("numeric_columns", []) if structure else []
+
+class _ColumnTypes:
+    """
+    บันทึกชนิดของเซลล์ต้นทางระหว่างอ่าน sheet เพื่อแยกคอลัมน์ตัวเลขออกจากคอลัมน์ข้อความ
+    
+    คอลัมน์เป็นตัวเลขเมื่อทุกเซลล์ที่มีค่าเป็น int หรือ float (ไม่นับ bool)
+    """
+
+    def __init__(self):
+        self.headers: Optional[List[str]] = None
+        self._numeric: Dict[int, bool] = {}
+
+    def observe(self, values) -> None:
+        """รับค่าดิบของแถว (แถวแรกเป็นส่วนหัว)"""
+        if self.headers is None:
+            self.headers = [str(value) if value is not None else "" for value in values]
+            return
+        for idx, value in enumerate(values):
+            if value is None or (isinstance(value, str) and (not value or value.isspace())):
+                continue
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            self._numeric[idx] = self._numeric.get(idx, True) and is_number
+
+    def numeric_columns(self) -> List[str]:
+        """ชื่อคอลัมน์ที่เซลล์ต้นทางเป็นตัวเลขทั้งหมด"""
+        headers = self.headers or []
+        return [
+            headers[idx] for idx, numeric in sorted(self._numeric.items())
+            if numeric and idx < len(headers)
+        ]
+
+def _fingerprint(*parts: Any) -> str:
+    """SHA-256 ของข้อมูลที่แปลงเป็น JSON ได้"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _chunked(rows, size: int):
+    """แบ่งข้อมูลจาก iterator ออกเป็นชุดละ size แถว"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _cell_style_id(cell) -> Optional[int]:
+    """ดึงรหัสสไตล์ของเซลล์ใน workbook (None สำหรับเซลล์ว่างในโหมด read-only)"""
+    if hasattr(cell, "_style_id"):  # ReadOnlyCell
+        return cell._style_id
+    return getattr(cell, "style_id", None)
+
+class _StyleInterner:
+    """
+    แปลงข้อมูลการจัดรูปแบบเป็นรหัสในตาราง Style
+    
+    สไตล์ที่เหมือนกันจะถูกเก็บเพียงครั้งเดียว โดยใช้ hash ของข้อมูลเป็นกุญแจ
+    """
+
+    def __init__(self, conn, style_table: Table):
+        self.conn = conn
+        self.style_table = style_table
+        self.style_index = {
+            style_key: style_id
+            for style_key, style_id in conn.execute(
+                select(style_table.c.style_key, style_table.c.style_id)
+            )
+        }
+        # เซลล์ที่ใช้สไตล์เดียวกันจะอ้างถึง dict เดียวกันจาก cache
+        self._memo: Dict[int, Any] = {}
+
+    def _insert_ignore(self):
+        """คำสั่ง INSERT ที่ข้ามแถวซึ่งมี style_key ซ้ำ ตามชนิดฐานข้อมูล"""
+        dialect = self.conn.dialect.name
+        if dialect == "sqlite":
+            return sqlite_insert(self.style_table).on_conflict_do_nothing(index_elements=["style_key"])
+        if dialect == "postgresql":
+            return postgresql_insert(self.style_table).on_conflict_do_nothing(index_elements=["style_key"])
+        if dialect == "mysql":
+            return self.style_table.insert().prefix_with("IGNORE")
+        return self.style_table.insert()
+
+    def intern(self, formatting: dict) -> int:
+        """คืนรหัสสไตล์ของข้อมูลการจัดรูปแบบ และบันทึกสไตล์ใหม่ถ้ายังไม่มี"""
+        cached = self._memo.get(id(formatting))
+        if cached is not None:
+            return cached[1]
+        
+        style_key = hashlib.sha1(
+            json.dumps(formatting, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        style_id = self.style_index.get(style_key)
+        if style_id is None:
+            # process อื่นอาจบันทึกสไตล์เดียวกันไปแล้วหลังจากโหลด style_index
+            self.conn.execute(
+                self._insert_ignore().values(style_key=style_key, formatting=formatting)
+            )
+            style_id = self.conn.execute(
+                select(self.style_table.c.style_id)
+                .where(self.style_table.c.style_key == style_key)
+            ).scalar_one()
+            self.style_index[style_key] = style_id
+        
+        self._memo[id(formatting)] = (formatting, style_id)
+        return style_id
+
+class NameColumnParser:
+    """
+    แยกข้อมูลชื่อลูกค้าทีละคอลัมน์
+    
+    ตัดสินใจเพียงครั้งเดียวต่อ sheet ว่าคอลัมน์ใดเก็บชื่อลูกค้า โดยดูจากหัวคอลัมน์
+    และตัวอย่างข้อมูล จากนั้นใช้ pandas.Series.str.extract กับทั้งคอลัมน์
+    แทนการเรียก regex กับทุกเซลล์
+    """
+
+    HEADER_KEYWORDS = ("ชื่อ", "name")
+
+    def __init__(self, sample_size: int = 50, min_match_ratio: float = 0.5):
+        """
+        Args:
+            sample_size: จำนวนแถวตัวอย่างที่ใช้ตรวจสอบคอลัมน์
+            min_match_ratio: สัดส่วนขั้นต่ำของค่าตัวอย่างที่ตรงรูปแบบชื่อ
+                สำหรับคอลัมน์ที่หัวคอลัมน์ไม่ได้บอกว่าเป็นชื่อ
+        """
+        self.sample_size = sample_size
+        self.min_match_ratio = min_match_ratio
+
+    def detect_columns(self, headers: List[Any], sample_rows: List[List[Any]]) -> List[int]:
+        """
+        หาคอลัมน์ที่เก็บชื่อลูกค้า
+        
+        Args:
+            headers: หัวคอลัมน์
+            sample_rows: แถวข้อมูลตัวอย่าง
+            
+        Returns:
+            ลำดับของคอลัมน์ที่เก็บชื่อลูกค้า
+        """
+        sample_rows = sample_rows[:self.sample_size]
+        width = max([len(headers)] + [len(row) for row in sample_rows])
+        name_columns = []
+        
+        for idx in range(width):
+            values = [row[idx] for row in sample_rows
+                      if idx < len(row) and isinstance(row[idx], str) and row[idx]]
+            if not values:
+                continue
+            matches = sum(1 for value in values if THAI_NAME_PATTERN.match(value))
+            header = str(headers[idx]).lower() if idx < len(headers) else ""
+            if any(keyword in header for keyword in self.HEADER_KEYWORDS):
+                is_name_column = matches > 0
+            else:
+                is_name_column = matches / len(values) >= self.min_match_ratio
+            if is_name_column:
+                name_columns.append(idx)
+        
+        return name_columns
+
+    def parse_rows(self, rows: List[List[Any]], columns: List[int]) -> List[List[Any]]:
+        """
+        แทนค่าที่ตรงรูปแบบชื่อในคอลัมน์ที่กำหนดด้วยข้อมูลที่แยกแล้ว (แก้ไขในตัว)
+        
+        Args:
+            rows: แถวข้อมูล
+            columns: ลำดับของคอลัมน์ที่เก็บชื่อลูกค้า
+            
+        Returns:
+            แถวข้อมูลชุดเดิม
+        """
+        for idx in columns:
+            values = pd.Series(
+                [row[idx] if idx < len(row) else None for row in rows], dtype=object
+            )
+            extracted = values.str.extract(THAI_NAME_PATTERN)
+            parts = extracted.to_numpy()
+            for row_idx in extracted[0].notna().to_numpy().nonzero()[0]:
+                rows[row_idx][idx] = dict(zip(NAME_FIELDS, parts[row_idx]))
+        return rows
+
+    def iter_parsed_rows(self, rows, block_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        แยกข้อมูลชื่อลูกค้าจากแถวที่อ่านแบบ lazy ทีละ block
+        
+        Args:
+            rows: iterator ของ (ข้อมูลในแถว, การจัดรูปแบบของแถว) โดยแถวแรกเป็นส่วนหัว
+            block_size: จำนวนแถวต่อ block ที่ส่งให้ str.extract
+            
+        Yields:
+            tuple (ข้อมูลในแถว, การจัดรูปแบบของแถว)
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield header
+        
+        columns = None
+        for block in _chunked(rows, max(block_size, self.sample_size)):
+            data = [row_data for row_data, _ in block]
+            if columns is None:
+                columns = self.detect_columns(header[0], data)
+            if columns:
+                self.parse_rows(data, columns)
+            yield from block
+
+def parse_sheet_worker(file_path: str, sheet_name: str, options: Dict[str, Any]) -> Dict[str, List]:
+    """ประมวลผล sheet เดียวใน process แยก (ใช้กับ ProcessPoolExecutor)"""
+    # เปิดแบบ read-only เพื่อให้แต่ละ process แยกวิเคราะห์เฉพาะ sheet ของตัวเอง
+    processor = ExcelProcessor(file_path, streaming=True, **options)
+    try:
+        return processor.process_sheet(sheet_name)
+    finally:
+        processor.workbook.close()
+
+def parse_file_worker(file_path: str, options: Dict[str, Any]) -> Dict[str, Dict]:
+    """แยกข้อมูลและโครงสร้างของทั้งไฟล์ใน process แยก โดยไม่แตะฐานข้อมูล (ใช้กับ ProcessPoolExecutor)"""
+    processor = ExcelProcessor(file_path, **options)
+    try:
+        return processor.parse()
+    finally:
+        if processor._workbook is not None:
+            processor._workbook.close()
+
 class ExcelProcessor:
     """
     คลาสหลักสำหรับการประมวลผลเอกสาร Excel
@@ -39,53 +410,95 @@ class ExcelProcessor:
     - บันทึกและใช้งานเทมเพลต
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 streaming: bool = False, include_formatting: bool = True,
+                 intern_styles: bool = True, workers: int = 1,
+                 cache: Optional[ResultCache] = None, content_hash: Optional[str] = None,
+                 engine: Optional[Engine] = None,
+                 storage_backend: str = DEFAULT_STORAGE_BACKEND,
+                 parquet_dir: str = DEFAULT_PARQUET_DIR,
+                 incremental: bool = False, source_name: Optional[str] = None):
         """
         เริ่มต้นระบบประมวลผล Excel
         
         Args:
             file_path: พาธของไฟล์ Excel ที่ต้องการประมวลผล
+            chunk_size: จำนวนแถวต่อหนึ่งชุดการบันทึกลงฐานข้อมูล
+            streaming: อ่านไฟล์แบบ read-only และส่งข้อมูลทีละแถวลงฐานข้อมูล
+                โดยไม่เก็บข้อมูลทั้ง sheet ไว้ในหน่วยความจำ
+            include_formatting: อ่านการจัดรูปแบบของเซลล์ด้วย
+                (False จะอ่านเฉพาะค่าด้วย values_only)
+            intern_styles: เก็บสไตล์ที่ไม่ซ้ำกันไว้ในตาราง Style และให้ Structure
+                อ้างถึงด้วยรหัสสไตล์แทนการเก็บข้อมูลการจัดรูปแบบทุกเซลล์
+            workers: จำนวน process สำหรับแยกวิเคราะห์ sheet พร้อมกัน
+                (1 = ประมวลผลทีละ sheet, ไม่มีผลในโหมด streaming)
+            cache: แคชผลการประมวลผล ไฟล์ที่มีเนื้อหาเดิมจะได้ผลจากแคช
+                โดยไม่อ่านไฟล์และไม่บันทึกลงฐานข้อมูลซ้ำ (ไม่มีผลในโหมด streaming)
+            content_hash: SHA-256 ของเนื้อหาไฟล์ ถ้าคำนวณไว้แล้ว
+            engine: engine ของฐานข้อมูลที่ใช้ร่วมกัน
+                (ค่าเริ่มต้นใช้ engine ร่วมของ DEFAULT_DATABASE_URL)
+            storage_backend: รูปแบบการเก็บข้อมูลเนื้อหา (eav/wide/parquet)
+                โหมด streaming รองรับเฉพาะ eav
+            parquet_dir: โฟลเดอร์เก็บไฟล์ Parquet สำหรับ storage_backend="parquet"
+            incremental: เก็บลายนิ้วมือของแต่ละ sheet และ block แถว แล้วบันทึกใหม่
+                เฉพาะส่วนที่เปลี่ยนเมื่อประมวลผลไฟล์เดิมซ้ำ (รองรับเฉพาะ eav
+                และไม่ใช้ cache กับ workers)
+            source_name: ชื่อที่ใช้ระบุไฟล์ต้นทางในฐานข้อมูล
+                (ค่าเริ่มต้นใช้ชื่อไฟล์ไม่รวมนามสกุล)
         """
+        if chunk_size < 1:
+            raise ValueError("chunk_size ต้องมากกว่า 0")
+        if workers < 1:
+            raise ValueError("workers ต้องมากกว่า 0")
+        self._check_storage_backend(storage_backend)
+        if streaming and storage_backend != "eav":
+            raise ValueError("โหมด streaming รองรับเฉพาะ storage_backend='eav'")
+        if incremental and storage_backend != "eav":
+            raise ValueError("โหมด incremental รองรับเฉพาะ storage_backend='eav'")
         self.file_path = file_path
-        self.workbook = load_workbook(file_path) if file_path else None
-        
-        # สร้างการเชื่อมต่อกับฐานข้อมูล
-        logger.info(f"กำลังเชื่อมต่อกับฐานข้อมูล...")
-        self.engine = create_engine('sqlite:///excel_data.db')
-        self.setup_database()
-
-    def setup_database(self):
-        """ตั้งค่าโครงสร้างฐานข้อมูล"""
-        metadata = MetaData()
-        
-        # ตารางเก็บข้อมูลเนื้อหา
-        self.content_table = Table(
-            'Content', metadata,
-            Column('entry_id', Integer, primary_key=True),
-            Column('sheet_name', String),
-            Column('column_name', String),
-            Column('cell_value', String)
-        )
+        self.chunk_size = chunk_size
+        self.streaming = streaming
+        self.include_formatting = include_formatting
+        self.intern_styles = intern_styles
+        self.workers = workers
+        self.cache = cache
+        self.content_hash = content_hash
+        self.storage_backend = storage_backend
+        self.parquet_dir = Path(parquet_dir)
+        self.incremental = incremental
+        self._source_name = source_name
+        self._style_cache: Dict[Optional[int], dict] = {}
+        self._formatting_keys: Dict[int, Any] = {}
+        self.name_parser = NameColumnParser()
+        self.last_ingest_stats: Optional[Dict[str, float]] = None
+        self._workbook = None
+        self._engine = engine
+        self._database_ready = False
+        self.content_table = content_table
+        self.structure_table = structure_table
+        self.style_table = style_table
+        self.content_table_registry = content_table_registry
+        self.fingerprint_table = fingerprint_table
+        self.template_table = template_table
 
-        # ตารางเก็บข้อมูลโครงสร้าง
-        self.structure_table = Table(
-            'Structure', metadata,
-            Column('entry_id', Integer, primary_key=True),
-            Column('sheet_name', String),
-            Column('row_number', Integer),
-            Column('formatting', JSON)
-        )
+    @property
+    def engine(self) -> Engine:
+        """การเชื่อมต่อฐานข้อมูล (ตั้งค่าตารางเมื่อใช้งานครั้งแรก)"""
+        if not self._database_ready:
+            self._engine = init_database(self._engine)
+            self._database_ready = True
+        return self._engine
 
-        # ตารางเก็บเทมเพลต
-        self.template_table = Table(
-            'Template', metadata,
-            Column('template_id', Integer, primary_key=True),
-            Column('name', String),
-            Column('structure', JSON)
-        )
+    @property
+    def workbook(self):
+        """Workbook ของไฟล์ (โหลดเมื่อใช้งานครั้งแรก)"""
+        if self._workbook is None and self.file_path:
+            self._workbook = load_workbook(self.file_path, read_only=self.streaming)
+        return self._workbook
 
-        metadata.create_all(self.engine)
-        logger.info("สร้างโครงสร้างฐานข้อมูลเรียบร้อย")
+    def setup_database(self):
+        """ตั้งค่าโครงสร้างฐานข้อมูล"""
+        init_database(self.engine)
 
     def extract_customer_info(self, cell_value: str) -> Optional[Dict[str, str]]:
         """
@@ -108,28 +521,45 @@ class ExcelProcessor:
             return None
 
         # แยกคำนำหน้า ชื่อ และนามสกุล
-        name_match = re.match(r'^(นาย|นาง|นางสาว)\s+(.+?)\s+(.+)$', cell_value)
+        name_match = THAI_NAME_PATTERN.match(cell_value)
         if name_match:
-            return {
-                "title": name_match.group(1),
-                "first_name": name_match.group(2),
-                "last_name": name_match.group(3)
-            }
+            return dict(zip(NAME_FIELDS, name_match.groups()))
         return None
 
     def get_cell_formatting(self, cell) -> dict:
         """
         อ่านข้อมูลการจัดรูปแบบของเซลล์
         
+        เซลล์ที่ใช้สไตล์เดียวกันใน workbook จะได้ dict เดียวกันจาก cache
+        ผู้เรียกจึงไม่ควรแก้ไขค่าที่ได้รับ
+        
         Args:
             cell: เซลล์ที่ต้องการอ่านข้อมูล
             
         Returns:
             Dictionary ของข้อมูลการจัดรูปแบบ
         """
-        font = cell.font
-        alignment = cell.alignment
-        border = cell.border
+        style_id = _cell_style_id(cell)
+        formatting = self._style_cache.get(style_id)
+        if formatting is None:
+            formatting = self._style_cache[style_id] = self._build_cell_formatting(cell)
+        return formatting
+
+    def _default_formatting(self, sheet) -> dict:
+        """การจัดรูปแบบของสไตล์เริ่มต้น สำหรับเซลล์ว่างที่ไม่มีข้อมูลสไตล์ในโหมด read-only"""
+        formatting = self._style_cache.get(0)
+        if formatting is None:
+            formatting = self._style_cache[0] = self._build_cell_formatting(
+                ReadOnlyCell(sheet, 0, 0, None, style_id=0)
+            )
+        return formatting
+
+    def _build_cell_formatting(self, cell) -> dict:
+        """สร้างข้อมูลการจัดรูปแบบจาก font, alignment และ border ของเซลล์"""
+        # เซลล์ว่างในโหมด read-only ไม่มีข้อมูลการจัดรูปแบบ
+        font = cell.font or Font()
+        alignment = cell.alignment or Alignment()
+        border = cell.border or Border()
         
         return {
             "font": {
@@ -137,7 +567,8 @@ class ExcelProcessor:
                 "size": font.size,
                 "bold": font.bold,
                 "italic": font.italic,
-                "color": font.color.rgb if font.color else None
+                # สีแบบ theme/indexed ไม่มีค่า rgb เป็นข้อความ
+                "color": font.color.rgb if font.color and isinstance(font.color.rgb, str) else None
             },
             "alignment": {
                 "horizontal": alignment.horizontal,
@@ -152,6 +583,49 @@ class ExcelProcessor:
             }
         }
 
+    def iter_sheet_rows(self, sheet_name: str, column_types: Optional[_ColumnTypes] = None):
+        """
+        อ่านข้อมูลทีละแถวจาก sheet
+        
+        ค่าในเซลล์ถูกแปลงเป็นข้อความ และคอลัมน์ชื่อลูกค้าถูกแยกเป็น
+        คำนำหน้า ชื่อ และนามสกุลด้วย NameColumnParser
+        
+        Args:
+            sheet_name: ชื่อ sheet
+            column_types: ตัวบันทึกชนิดของเซลล์ต้นทางก่อนแปลงเป็นข้อความ (ไม่บังคับ)
+            
+        Yields:
+            tuple (ข้อมูลในแถว, การจัดรูปแบบของแถว)
+        """
+        return self.name_parser.iter_parsed_rows(
+            self._iter_raw_rows(sheet_name, column_types), self.chunk_size
+        )
+
+    def _iter_raw_rows(self, sheet_name: str, column_types: Optional[_ColumnTypes] = None):
+        """อ่านค่าในเซลล์เป็นข้อความและการจัดรูปแบบทีละแถว"""
+        sheet = self.workbook[sheet_name]
+        if not self.include_formatting:
+            for values in sheet.iter_rows(values_only=True):
+                if column_types is not None:
+                    column_types.observe(values)
+                yield [str(value) if value is not None else "" for value in values], []
+            return
+        
+        for row in sheet.iter_rows():
+            if column_types is not None:
+                column_types.observe([cell.value for cell in row])
+            row_data = []
+            row_formatting = []
+            
+            for cell in row:
+                row_data.append(str(cell.value) if cell.value is not None else "")
+                if isinstance(cell, EmptyCell):
+                    row_formatting.append(self._default_formatting(sheet))
+                else:
+                    row_formatting.append(self.get_cell_formatting(cell))
+            
+            yield row_data, row_formatting
+
     def read_excel_content(self) -> Dict[str, List[Any]]:
         """
         อ่านข้อมูลและการจัดรูปแบบทั้งหมดจากไฟล์ Excel
@@ -163,35 +637,127 @@ class ExcelProcessor:
         sheet_data = {}
         
         for sheet_name in self.workbook.sheetnames:
-            sheet = self.workbook[sheet_name]
             data = []
             formatting = []
+            column_types = _ColumnTypes()
             
-            for row in sheet.iter_rows():
-                row_data = []
-                row_formatting = []
-                
-                for cell in row:
-                    cell_value = str(cell.value) if cell.value is not None else ""
-                    # ตรวจสอบและแยกข้อมูลลูกค้า
-                    customer_info = self.extract_customer_info(cell_value)
-                    if customer_info:
-                        row_data.append(customer_info)
-                    else:
-                        row_data.append(cell_value)
-                    row_formatting.append(self.get_cell_formatting(cell))
-                
+            for row_data, row_formatting in self.iter_sheet_rows(sheet_name, column_types):
                 data.append(row_data)
                 formatting.append(row_formatting)
             
             sheet_data[sheet_name] = {
                 "data": data,
-                "formatting": formatting
+                "formatting": formatting,
+                "numeric_columns": column_types.numeric_columns()
             }
             
         logger.info(f"อ่านข้อมูลเรียบร้อย พบ {len(sheet_data)} sheets")
         return sheet_data
 
+    def _separate_rows(self, rows):
+        """
+        แยกข้อมูลและโครงสร้างของ sheet ทีละแถว
+        
+        Args:
+            rows: iterator ของ (ข้อมูลในแถว, การจัดรูปแบบของแถว) โดยแถวแรกเป็นส่วนหัว
+            
+        Yields:
+            tuple (ข้อมูลของแถว หรือ None ถ้าแถวว่าง, โครงสร้างของแถว)
+        """
+        rows = iter(rows)
+        headers, header_formatting = next(rows, ([], []))
+        
+        # เก็บข้อมูลส่วนหัว
+        yield None, {
+            "row_number": 0,
+            "type": "header",
+            "formatting": header_formatting
+        }
+        
+        for row_idx, (row, row_formatting) in enumerate(rows, 1):
+            yield self._separate_row(headers, row, row_formatting, row_idx)
+
+    @staticmethod
+    def _separate_row(headers: List[Any], row: List[Any], row_formatting: List[dict],
+                      row_number: int):
+        """แยกข้อมูลและโครงสร้างของแถวข้อมูลหนึ่งแถว"""
+        row_content = {}
+        row_structure = {
+            "row_number": row_number,
+            "type": "data",
+            "formatting": row_formatting
+        }
+        
+        for header, cell in zip(headers, row):
+            if isinstance(cell, dict):  # กรณีเป็นข้อมูลลูกค้าที่แยกแล้ว
+                row_content.update(cell)
+            elif cell and not (isinstance(cell, str) and cell.isspace()):
+                row_content[str(header)] = cell
+        
+        return row_content or None, row_structure
+
+    def process_sheet(self, sheet_name: str) -> Dict[str, List]:
+        """
+        อ่านและแยกข้อมูลและโครงสร้างของ sheet เดียว
+        
+        Args:
+            sheet_name: ชื่อ sheet
+            
+        Returns:
+            Dictionary ของ content และ structure ของ sheet โดยแถวส่วนหัวของ structure
+            มี numeric_columns (คอลัมน์ที่เซลล์ต้นทางเป็นตัวเลข)
+        """
+        content = []
+        structure = []
+        column_types = _ColumnTypes()
+        rows = self.iter_sheet_rows(sheet_name, column_types)
+        for row_content, row_structure in self._separate_rows(rows):
+            if row_content:
+                content.append(row_content)
+            structure.append(row_structure)
+        structure[0]["numeric_columns"] = column_types.numeric_columns()
+        return {"content": content, "structure": structure}
+
+    def sheet_names(self) -> List[str]:
+        """รายชื่อ sheet ตามลำดับใน workbook"""
+        if self._workbook is not None:
+            return list(self._workbook.sheetnames)
+        workbook = load_workbook(self.file_path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+
+    def process_sheets_parallel(self) -> Dict[str, Dict]:
+        """
+        แยกวิเคราะห์ทุก sheet พร้อมกันด้วย process pool
+        
+        แต่ละ sheet ถูกประมวลผลใน process ของตัวเอง และผลลัพธ์ถูกรวม
+        ตามลำดับ sheet ใน workbook เสมอ ไม่ขึ้นกับลำดับที่ process ทำงานเสร็จ
+        
+        Returns:
+            Dictionary ของข้อมูลและโครงสร้างที่แยกแล้วในรูปแบบเดียวกับ
+            separate_structure_and_content
+        """
+        sheet_names = self.sheet_names()
+        workers = min(self.workers, len(sheet_names))
+        if workers <= 1:
+            return self.separate_structure_and_content(self.read_excel_content())
+        
+        logger.info(f"กำลังประมวลผล {len(sheet_names)} sheets ด้วย {workers} processes...")
+        options = self.parse_options
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(parse_sheet_worker, str(self.file_path), sheet_name, options)
+                for sheet_name in sheet_names
+            ]
+            result = {
+                sheet_name: future.result()
+                for sheet_name, future in zip(sheet_names, futures)
+            }
+        logger.info("แยกข้อมูลและโครงสร้างเรียบร้อย")
+        return result
+
     def separate_structure_and_content(self, sheet_data: Dict[str, Dict]) -> Dict[str, Dict]:
         """
         แยกข้อมูลและโครงสร้างออกจากกัน
@@ -209,33 +775,12 @@ class ExcelProcessor:
             structure = []
             content = []
             
-            headers = data["data"][0] if data["data"] else []
-            header_formatting = data["formatting"][0] if data["formatting"] else []
-            
-            # เก็บข้อมูลส่วนหัว
-            structure.append({
-                "row_number": 0,
-                "type": "header",
-                "formatting": header_formatting
-            })
-            
-            for row_idx, (row, row_formatting) in enumerate(zip(data["data"][1:], data["formatting"][1:]), 1):
-                row_content = {}
-                row_structure = {
-                    "row_number": row_idx,
-                    "type": "data",
-                    "formatting": row_formatting
-                }
-                
-                for header, cell, cell_format in zip(headers, row, row_formatting):
-                    if isinstance(cell, dict):  # กรณีเป็นข้อมูลลูกค้าที่แยกแล้ว
-                        row_content.update(cell)
-                    elif cell and not (isinstance(cell, str) and cell.isspace()):
-                        row_content[str(header)] = cell
-                
+            rows = zip(data["data"], data["formatting"])
+            for row_content, row_structure in self._separate_rows(rows):
                 if row_content:
                     content.append(row_content)
                 structure.append(row_structure)
+            structure[0]["numeric_columns"] = data.get("numeric_columns", [])
             
             result[sheet_name] = {
                 "content": content,
@@ -245,47 +790,441 @@ class ExcelProcessor:
         logger.info("แยกข้อมูลและโครงสร้างเรียบร้อย")
         return result
 
-    def save_to_database(self, processed_data: Dict[str, Dict]):
+    def _iter_content_rows(self, sheet_name: str, content: List[Dict[str, Any]]):
+        """แปลงข้อมูล content ของ sheet เป็นแถวสำหรับตาราง Content"""
+        for content_row in content:
+            for col_name, value in content_row.items():
+                if isinstance(value, dict):  # กรณีเป็นข้อมูลลูกค้าที่แยกแล้ว
+                    for k, v in value.items():
+                        yield {
+                            "sheet_name": sheet_name,
+                            "column_name": f"{col_name}_{k}",
+                            "cell_value": v,
+                            "source_name": self.source_name
+                        }
+                else:
+                    yield {
+                        "sheet_name": sheet_name,
+                        "column_name": col_name,
+                        "cell_value": value,
+                        "source_name": self.source_name
+                    }
+
+    def _iter_structure_rows(self, sheet_name: str, structure: List[Dict[str, Any]],
+                             styles: Optional[_StyleInterner] = None):
+        """
+        แปลงข้อมูล structure ของ sheet เป็นแถวสำหรับตาราง Structure
+        
+        ถ้ากำหนด styles จะเก็บเฉพาะรหัสสไตล์ของแต่ละเซลล์ใน style_ids
+        """
+        for structure_row in structure:
+            if styles is not None:
+                yield {
+                    "sheet_name": sheet_name,
+                    "row_number": structure_row["row_number"],
+                    "formatting": None,
+                    "style_ids": [styles.intern(fmt) for fmt in structure_row["formatting"]],
+                    "source_name": self.source_name
+                }
+            else:
+                yield {
+                    "sheet_name": sheet_name,
+                    "row_number": structure_row["row_number"],
+                    "formatting": json.dumps(structure_row["formatting"]),
+                    "style_ids": None,
+                    "source_name": self.source_name
+                }
+
+    def _style_interner(self, conn) -> Optional[_StyleInterner]:
+        """สร้างตัวแปลงสไตล์สำหรับ connection ถ้าเปิดใช้ intern_styles"""
+        return _StyleInterner(conn, self.style_table) if self.intern_styles else None
+
+    def _bulk_insert(self, conn, table: Table, rows, chunk_size: int) -> int:
+        """
+        บันทึกแถวแบบ executemany ทีละชุด
+        
+        Returns:
+            จำนวนแถวที่บันทึก
+        """
+        inserted = 0
+        for chunk in _chunked(rows, chunk_size):
+            conn.execute(table.insert(), chunk)
+            inserted += len(chunk)
+        return inserted
+
+    @staticmethod
+    def _check_storage_backend(storage_backend: str):
+        if storage_backend not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"ไม่รองรับ storage_backend '{storage_backend}' "
+                f"(เลือกได้: {', '.join(STORAGE_BACKENDS)})"
+            )
+
+    @property
+    def source_name(self) -> str:
+        """ชื่อไฟล์ต้นทางที่ใช้ระบุข้อมูลในฐานข้อมูล ตั้งชื่อตารางแบบ wide และไฟล์ Parquet"""
+        return self._source_name or Path(self.file_path).stem
+
+    def wide_table_name(self, sheet_name: str) -> str:
+        """ชื่อตารางแบบ wide ของ sheet"""
+        return f"Content_{self.source_name}_{sheet_name}"
+
+    def parquet_path(self, sheet_name: str) -> Path:
+        """พาธไฟล์ Parquet ของ sheet"""
+        return self.parquet_dir / self.source_name / f"{sheet_name}.parquet"
+
+    def _save_columnar_content(self, conn, sheet_name: str, content: List[Dict[str, Any]],
+                               storage_backend: str, chunk_size: int,
+                               numeric_columns: Sequence[str] = ()) -> int:
+        """
+        บันทึกข้อมูล content ของ sheet เป็นตารางแบบ wide หรือไฟล์ Parquet
+        
+        ข้อมูลเดิมของ sheet เดียวกันจากไฟล์เดียวกันจะถูกแทนที่ คอลัมน์ใน
+        numeric_columns ถูกเก็บเป็นตัวเลข คอลัมน์อื่นเก็บเป็นข้อความ
+        
+        Returns:
+            จำนวนแถวที่บันทึก
+        """
+        frame = _content_frame(content, numeric_columns)
+        if storage_backend == "wide":
+            location = self.wide_table_name(sheet_name)
+            frame.to_sql(location, conn, if_exists="replace", index=False, chunksize=chunk_size)
+        else:
+            path = self.parquet_path(sheet_name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(path, index=False)
+            location = str(path)
+        
+        registry = self.content_table_registry
+        conn.execute(registry.delete().where(
+            (registry.c.storage_backend == storage_backend) & (registry.c.location == location)
+        ))
+        conn.execute(registry.insert().values(
+            source_name=self.source_name,
+            sheet_name=sheet_name,
+            storage_backend=storage_backend,
+            location=location,
+            row_count=len(frame),
+            columns={column: str(dtype) for column, dtype in frame.dtypes.items()}
+        ))
+        return len(frame)
+
+    def load_sheet(self, sheet_name: str, storage_backend: Optional[str] = None) -> pd.DataFrame:
+        """
+        อ่านข้อมูลของ sheet ที่บันทึกแบบ wide หรือ Parquet กลับมาด้วยการอ่านครั้งเดียว
+        
+        Args:
+            sheet_name: ชื่อ sheet
+            storage_backend: wide หรือ parquet (ค่าเริ่มต้นใช้ self.storage_backend)
+            
+        Returns:
+            DataFrame หนึ่งแถวต่อแถวข้อมูล เรียงตาม row_index
+        """
+        storage_backend = storage_backend or self.storage_backend
+        if storage_backend == "wide":
+            frame = pd.read_sql_table(self.wide_table_name(sheet_name), self.engine)
+        elif storage_backend == "parquet":
+            frame = pd.read_parquet(self.parquet_path(sheet_name))
+        else:
+            raise ValueError("load_sheet รองรับเฉพาะ storage_backend 'wide' และ 'parquet'")
+        return frame.sort_values(ROW_INDEX_COLUMN, ignore_index=True)
+
+    def save_to_database(self, processed_data: Dict[str, Dict],
+                         chunk_size: Optional[int] = None,
+                         storage_backend: Optional[str] = None) -> Dict[str, float]:
         """
         บันทึกข้อมูลลงฐานข้อมูล
         
+        ข้อมูลทั้งหมดถูกบันทึกภายใน transaction เดียว โดยรวมแถวเป็นชุด
+        แล้วส่งด้วย executemany แทนการ insert ทีละเซลล์
+        
         Args:
             processed_data: ข้อมูลที่ประมวลผลแล้ว
+            chunk_size: จำนวนแถวต่อชุด (ค่าเริ่มต้นใช้ self.chunk_size)
+            storage_backend: รูปแบบการเก็บข้อมูลเนื้อหา eav/wide/parquet
+                (ค่าเริ่มต้นใช้ self.storage_backend) โครงสร้างยังเก็บในตาราง Structure เสมอ
+            
+        Returns:
+            สถิติการบันทึก ได้แก่ rows, seconds และ rows_per_sec
         """
-        logger.info("กำลังบันทึกข้อมูลลงฐานข้อมูล...")
-        with self.engine.connect() as conn:
+        chunk_size = chunk_size or self.chunk_size
+        storage_backend = storage_backend or self.storage_backend
+        self._check_storage_backend(storage_backend)
+        logger.info(f"กำลังบันทึกข้อมูลลงฐานข้อมูล ({storage_backend}, ชุดละ {chunk_size} แถว)...")
+        start_time = time.perf_counter()
+        rows = 0
+        with self.engine.begin() as conn:
+            styles = self._style_interner(conn)
             for sheet_name, data in processed_data.items():
-                # บันทึกข้อมูล Content
-                for content_row in data["content"]:
-                    for col_name, value in content_row.items():
-                        if isinstance(value, dict):  # กรณีเป็นข้อมูลลูกค้าที่แยกแล้ว
-                            for k, v in value.items():
-                                conn.execute(
-                                    self.content_table.insert().values(
-                                        sheet_name=sheet_name,
-                                        column_name=f"{col_name}_{k}",
-                                        cell_value=v
-                                    )
-                                )
-                        else:
-                            conn.execute(
-                                self.content_table.insert().values(
-                                    sheet_name=sheet_name,
-                                    column_name=col_name,
-                                    cell_value=value
-                                )
-                            )
+                if storage_backend == "eav":
+                    rows += self._bulk_insert(
+                        conn, self.content_table,
+                        self._iter_content_rows(sheet_name, data["content"]),
+                        chunk_size
+                    )
+                elif data["content"]:
+                    rows += self._save_columnar_content(
+                        conn, sheet_name, data["content"], storage_backend, chunk_size,
+                        _numeric_columns(data["structure"])
+                    )
+                rows += self._bulk_insert(
+                    conn, self.structure_table,
+                    self._iter_structure_rows(sheet_name, data["structure"], styles),
+                    chunk_size
+                )
+        return self._record_ingest_stats(rows, time.perf_counter() - start_time)
+
+    def _record_ingest_stats(self, rows: int, elapsed: float) -> Dict[str, float]:
+        """เก็บและแสดงสถิติความเร็วในการบันทึกข้อมูล"""
+        stats = {
+            "rows": rows,
+            "seconds": elapsed,
+            "rows_per_sec": rows / elapsed if elapsed > 0 else float(rows)
+        }
+        self.last_ingest_stats = stats
+        logger.info(
+            f"บันทึกข้อมูลเรียบร้อย {rows} แถว "
+            f"ใน {elapsed:.2f} วินาที ({stats['rows_per_sec']:,.0f} แถว/วินาที)"
+        )
+        return stats
+
+    def stream_to_database(self, chunk_size: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+        """
+        อ่าน แยก และบันทึกข้อมูลลงฐานข้อมูลทีละแถว
+        
+        ข้อมูลไม่ถูกเก็บไว้ทั้ง sheet ในหน่วยความจำ แต่ละแถวถูกส่งผ่าน
+        _separate_rows ไปยังบัฟเฟอร์ขนาด chunk_size แล้วบันทึกทันทีที่บัฟเฟอร์เต็ม
+        
+        Args:
+            chunk_size: จำนวนแถวต่อชุด (ค่าเริ่มต้นใช้ self.chunk_size)
+            
+        Returns:
+            จำนวนแถว content และ structure ที่บันทึกแยกตาม sheet
+        """
+        chunk_size = chunk_size or self.chunk_size
+        logger.info(f"กำลังอ่านและบันทึกข้อมูลแบบ streaming จากไฟล์ {self.file_path}")
+        start_time = time.perf_counter()
+        rows = 0
+        summary = {}
+        
+        with self.engine.begin() as conn:
+            styles = self._style_interner(conn)
+            
+            def flush(table: Table, buffer: List[Dict[str, Any]]) -> int:
+                if buffer:
+                    conn.execute(table.insert(), buffer)
+                return len(buffer)
+            
+            for sheet_name in self.workbook.sheetnames:
+                content_buffer = []
+                structure_buffer = []
+                counts = {"content_rows": 0, "structure_rows": 0}
+                
+                for row_content, row_structure in self._separate_rows(self.iter_sheet_rows(sheet_name)):
+                    if row_content:
+                        content_buffer.extend(self._iter_content_rows(sheet_name, [row_content]))
+                        counts["content_rows"] += 1
+                    structure_buffer.extend(self._iter_structure_rows(sheet_name, [row_structure], styles))
+                    counts["structure_rows"] += 1
+                    
+                    if len(content_buffer) >= chunk_size:
+                        rows += flush(self.content_table, content_buffer)
+                        content_buffer = []
+                    if len(structure_buffer) >= chunk_size:
+                        rows += flush(self.structure_table, structure_buffer)
+                        structure_buffer = []
                 
-                # บันทึกข้อมูล Structure
-                for structure_row in data["structure"]:
-                    conn.execute(
-                        self.structure_table.insert().values(
-                            sheet_name=sheet_name,
-                            row_number=structure_row["row_number"],
-                            formatting=json.dumps(structure_row["formatting"])
-                        )
+                rows += flush(self.content_table, content_buffer)
+                rows += flush(self.structure_table, structure_buffer)
+                summary[sheet_name] = counts
+        
+        if self.streaming:
+            # workbook แบบ read-only เปิดไฟล์ค้างไว้จนกว่าจะปิด
+            self.workbook.close()
+            self._workbook = None
+        
+        self._record_ingest_stats(rows, time.perf_counter() - start_time)
+        return summary
+
+    def _block_fingerprint(self, block) -> str:
+        """ลายนิ้วมือของ block แถวจากค่าและการจัดรูปแบบของเซลล์"""
+        digest = hashlib.sha256()
+        for row_data, row_formatting in block:
+            digest.update(json.dumps(row_data, ensure_ascii=False).encode("utf-8"))
+            for formatting in row_formatting:
+                # เซลล์ที่ใช้สไตล์เดียวกันอ้างถึง dict เดียวกันจาก cache
+                cached = self._formatting_keys.get(id(formatting))
+                if cached is None:
+                    cached = self._formatting_keys[id(formatting)] = (
+                        formatting, _fingerprint(formatting).encode("ascii")
                     )
-        logger.info("บันทึกข้อมูลเรียบร้อย")
+                digest.update(cached[1])
+        return digest.hexdigest()
+
+    def _delete_sheet_rows(self, conn, sheet_name: str,
+                           first_row: Optional[int] = None, last_row: Optional[int] = None):
+        """ลบแถว Content และ Structure ของ sheet จากไฟล์นี้ (เฉพาะช่วง row_number ถ้ากำหนด)"""
+        for table in (self.content_table, self.structure_table):
+            condition = (table.c.source_name == self.source_name) & (table.c.sheet_name == sheet_name)
+            if first_row is not None:
+                condition &= table.c.row_number >= first_row
+            if last_row is not None:
+                condition &= table.c.row_number <= last_row
+            conn.execute(table.delete().where(condition))
+
+    def _insert_separated_rows(self, conn, sheet_name: str, separated, styles: _StyleInterner) -> int:
+        """บันทึกแถวที่แยกแล้ว โดยเก็บ row_number ของแถว Content ด้วย"""
+        content_rows = []
+        for row_content, row_structure in separated:
+            if row_content:
+                for row in self._iter_content_rows(sheet_name, [row_content]):
+                    row["row_number"] = row_structure["row_number"]
+                    content_rows.append(row)
+        structure_rows = self._iter_structure_rows(sheet_name, [row for _, row in separated], styles)
+        return (self._bulk_insert(conn, self.content_table, content_rows, self.chunk_size)
+                + self._bulk_insert(conn, self.structure_table, structure_rows, self.chunk_size))
+
+    def _process_sheet_incremental(self, conn, sheet_name: str, styles: _StyleInterner,
+                                   previous: Optional[Dict[str, Any]]):
+        """
+        บันทึก sheet ใหม่เฉพาะ block แถวที่ลายนิ้วมือเปลี่ยนจากครั้งก่อน
+        
+        ถ้าส่วนหัว คอลัมน์ชื่อลูกค้า หรือขนาด block เปลี่ยน จะบันทึกใหม่ทั้ง sheet
+        
+        Args:
+            conn: connection ภายใน transaction
+            sheet_name: ชื่อ sheet
+            styles: ตัวแปลงข้อมูลการจัดรูปแบบเป็นรหัสสไตล์
+            previous: ลายนิ้วมือที่บันทึกไว้ครั้งก่อน (None ถ้ายังไม่เคยประมวลผล)
+            
+        Returns:
+            tuple (สรุปผลของ sheet, จำนวนแถวที่บันทึกลงฐานข้อมูล)
+        """
+        # block ต้องใหญ่พอให้ตรวจคอลัมน์ชื่อลูกค้าได้จาก block แรก เช่นเดียวกับ iter_parsed_rows
+        block_size = max(self.chunk_size, self.name_parser.sample_size)
+        rows = self._iter_raw_rows(sheet_name)
+        header = next(rows, None)
+        headers = header[0] if header else []
+        blocks = _chunked(rows, block_size)
+        first_block = next(blocks, [])
+        name_columns = self.name_parser.detect_columns(
+            headers, [row_data for row_data, _ in first_block]
+        ) if first_block else []
+        header_fingerprint = _fingerprint(
+            self._block_fingerprint([header] if header else []), name_columns, block_size
+        )
+        
+        rebuild = previous is None or previous["header_fingerprint"] != header_fingerprint
+        old_blocks = [] if rebuild else previous["block_fingerprints"]
+        report = {"blocks": 0, "blocks_skipped": 0, "content_rows": 0, "structure_rows": 0}
+        written = 0
+        
+        if rebuild:
+            self._delete_sheet_rows(conn, sheet_name)
+            if header:
+                header_row = {"row_number": 0, "type": "header", "formatting": header[1]}
+                written += self._insert_separated_rows(conn, sheet_name, [(None, header_row)], styles)
+                report["structure_rows"] += 1
+        
+        block_fingerprints = []
+        for block_index, block in enumerate(chain([first_block], blocks) if first_block else []):
+            fingerprint = self._block_fingerprint(block)
+            block_fingerprints.append(fingerprint)
+            if block_index < len(old_blocks) and old_blocks[block_index] == fingerprint:
+                report["blocks_skipped"] += 1
+                continue
+            
+            first_row = block_index * block_size + 1
+            if not rebuild:
+                self._delete_sheet_rows(conn, sheet_name, first_row, first_row + block_size - 1)
+            if name_columns:
+                self.name_parser.parse_rows([row_data for row_data, _ in block], name_columns)
+            separated = [
+                self._separate_row(headers, row_data, row_formatting, first_row + offset)
+                for offset, (row_data, row_formatting) in enumerate(block)
+            ]
+            written += self._insert_separated_rows(conn, sheet_name, separated, styles)
+            report["content_rows"] += sum(1 for row_content, _ in separated if row_content)
+            report["structure_rows"] += len(separated)
+        
+        report["blocks"] = len(block_fingerprints)
+        if len(block_fingerprints) < len(old_blocks):
+            # แถวท้าย sheet ถูกลบออก
+            self._delete_sheet_rows(conn, sheet_name, len(block_fingerprints) * block_size + 1)
+        
+        sheet_fingerprint = _fingerprint(header_fingerprint, block_fingerprints)
+        if previous is None:
+            report["status"] = "new"
+        elif rebuild:
+            report["status"] = "rebuilt"
+        elif previous["sheet_fingerprint"] == sheet_fingerprint:
+            report["status"] = "unchanged"
+        else:
+            report["status"] = "updated"
+        
+        fingerprints = self.fingerprint_table
+        conn.execute(fingerprints.delete().where(
+            (fingerprints.c.source_name == self.source_name) & (fingerprints.c.sheet_name == sheet_name)
+        ))
+        conn.execute(fingerprints.insert().values(
+            source_name=self.source_name,
+            sheet_name=sheet_name,
+            header_fingerprint=header_fingerprint,
+            sheet_fingerprint=sheet_fingerprint,
+            block_fingerprints=block_fingerprints
+        ))
+        return report, written
+
+    def process_incremental(self) -> Dict[str, Dict[str, Any]]:
+        """
+        ประมวลผลไฟล์โดยบันทึกใหม่เฉพาะ sheet และ block แถวที่เปลี่ยนจากครั้งก่อน
+        
+        ไฟล์เดียวกันระบุด้วย source_name ทุก sheet ยังถูกอ่านเพื่อคำนวณลายนิ้วมือ
+        แต่ block ที่ไม่เปลี่ยนจะไม่ถูกแยกข้อมูลและไม่ถูกบันทึกซ้ำ
+        sheet ที่หายไปจากไฟล์จะถูกลบออกจากฐานข้อมูล
+        
+        Returns:
+            สรุปผลแยกตาม sheet ได้แก่ status (new/rebuilt/updated/unchanged/removed),
+            blocks, blocks_skipped, content_rows และ structure_rows ที่บันทึกใหม่
+        """
+        logger.info(f"กำลังประมวลผลแบบ incremental จากไฟล์ {self.file_path} ({self.source_name})")
+        start_time = time.perf_counter()
+        rows = 0
+        summary = {}
+        fingerprints = self.fingerprint_table
+        
+        with self.engine.begin() as conn:
+            styles = self._style_interner(conn)
+            previous = {
+                row.sheet_name: dict(row._mapping)
+                for row in conn.execute(
+                    select(fingerprints).where(fingerprints.c.source_name == self.source_name)
+                )
+            }
+            for sheet_name in self.workbook.sheetnames:
+                summary[sheet_name], written = self._process_sheet_incremental(
+                    conn, sheet_name, styles, previous.pop(sheet_name, None)
+                )
+                rows += written
+            
+            for sheet_name in previous:
+                self._delete_sheet_rows(conn, sheet_name)
+                conn.execute(fingerprints.delete().where(
+                    (fingerprints.c.source_name == self.source_name)
+                    & (fingerprints.c.sheet_name == sheet_name)
+                ))
+                summary[sheet_name] = {"status": "removed", "blocks": 0, "blocks_skipped": 0,
+                                       "content_rows": 0, "structure_rows": 0}
+        
+        if self.streaming:
+            self.workbook.close()
+            self._workbook = None
+        
+        self._record_ingest_stats(rows, time.perf_counter() - start_time)
+        skipped_sheets = sum(1 for report in summary.values() if report["status"] == "unchanged")
+        skipped_blocks = sum(report["blocks_skipped"] for report in summary.values())
+        logger.info(f"ข้าม {skipped_sheets} sheets และ {skipped_blocks} blocks ที่ไม่เปลี่ยนแปลง")
+        return summary
 
     def save_as_template(self, name: str, processed_data: Dict[str, Dict]):
         """
@@ -296,7 +1235,7 @@ class ExcelProcessor:
             processed_data: ข้อมูลที่จะบันทึกเป็นเทมเพลต
         """
         logger.info(f"กำลังบันทึกเทมเพลต '{name}'...")
-        with self.engine.connect() as conn:
+        with self.engine.begin() as conn:
             conn.execute(
                 self.template_table.insert().values(
                     name=name,
@@ -305,20 +1244,98 @@ class ExcelProcessor:
             )
         logger.info(f"บันทึกเทมเพลต '{name}' เรียบร้อย")
 
-    def process_file(self) -> Dict[str, Dict]:
+    def process_file(self, storage_backend: Optional[str] = None) -> Dict[str, Dict]:
         """
         ประมวลผลไฟล์ Excel ทั้งหมด
         
+        Args:
+            storage_backend: รูปแบบการเก็บข้อมูลเนื้อหา eav/wide/parquet
+                (ค่าเริ่มต้นใช้ self.storage_backend)
+        
         Returns:
             Dictionary ของข้อมูลที่ประมวลผลแล้ว
+            (โหมด streaming จะคืนจำนวนแถวที่บันทึกแยกตาม sheet แทน
+            และโหมด incremental จะคืนสรุปผลของ process_incremental)
         """
         logger.info("เริ่มการประมวลผลไฟล์...")
-        sheet_data = self.read_excel_content()
-        processed_data = self.separate_structure_and_content(sheet_data)
-        self.save_to_database(processed_data)
+        storage_backend = storage_backend or self.storage_backend
+        self._check_storage_backend(storage_backend)
+        if self.incremental:
+            if storage_backend != "eav":
+                raise ValueError("โหมด incremental รองรับเฉพาะ storage_backend='eav'")
+            summary = self.process_incremental()
+            logger.info("ประมวลผลไฟล์เสร็จสมบูรณ์")
+            return summary
+        if self.streaming:
+            if storage_backend != "eav":
+                raise ValueError("โหมด streaming รองรับเฉพาะ storage_backend='eav'")
+            summary = self.stream_to_database()
+            logger.info("ประมวลผลไฟล์เสร็จสมบูรณ์")
+            return summary
+        
+        cached = self.cached_result(storage_backend)
+        if cached is not None:
+            return cached
+        
+        processed_data = self.parse()
+        self.store(processed_data, storage_backend)
         logger.info("ประมวลผลไฟล์เสร็จสมบูรณ์")
         return processed_data
 
+    @property
+    def parse_options(self) -> Dict[str, Any]:
+        """ตัวเลือกที่ส่งให้ worker แยกวิเคราะห์ใน process อื่น (และเป็นส่วนหนึ่งของกุญแจแคช)"""
+        return {
+            "chunk_size": self.chunk_size,
+            "include_formatting": self.include_formatting
+        }
+
+    def _cache_key(self, storage_backend: str) -> str:
+        """
+        กุญแจแคชของไฟล์นี้
+        
+        รวมรูปแบบการเก็บข้อมูลและตัวเลือกการแยกวิเคราะห์ เช่นผลที่อ่านโดยไม่มี
+        การจัดรูปแบบจะไม่ถูกส่งให้ผู้ที่ต้องการการจัดรูปแบบ และรวม source_name
+        เพื่อให้ไฟล์เดียวกันที่อัปโหลดในชื่อใหม่ถูกบันทึกลงฐานข้อมูลภายใต้ชื่อนั้นด้วย
+        """
+        if self.content_hash is None:
+            self.content_hash = file_hash(self.file_path)
+        options = ",".join(f"{name}={value}" for name, value in sorted(self.parse_options.items()))
+        return f"{self.content_hash}:{storage_backend}:{self.source_name}:{options}"
+
+    def cached_result(self, storage_backend: Optional[str] = None) -> Optional[Dict[str, Dict]]:
+        """ผลการประมวลผลจากแคช (None ถ้าไม่ได้ใช้แคชหรือยังไม่เคยประมวลผลไฟล์นี้)"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(storage_backend or self.storage_backend))
+        if cached is not None:
+            logger.info(f"พบผลการประมวลผลในแคช ({self.content_hash[:12]})")
+        return cached
+
+    def parse(self) -> Dict[str, Dict]:
+        """
+        อ่านไฟล์และแยกข้อมูลและโครงสร้าง (งานที่ใช้ CPU ล้วน ไม่บันทึกลงฐานข้อมูล)
+        
+        Returns:
+            Dictionary ของข้อมูลและโครงสร้างที่แยกแล้ว
+        """
+        if self.workers > 1:
+            return self.process_sheets_parallel()
+        return self.separate_structure_and_content(self.read_excel_content())
+
+    def store(self, processed_data: Dict[str, Dict], storage_backend: Optional[str] = None) -> None:
+        """
+        บันทึกผลของ parse ลงฐานข้อมูลและแคช
+        
+        Args:
+            processed_data: ผลลัพธ์จาก parse
+            storage_backend: รูปแบบการเก็บข้อมูลเนื้อหา (ค่าเริ่มต้นใช้ self.storage_backend)
+        """
+        storage_backend = storage_backend or self.storage_backend
+        self.save_to_database(processed_data, storage_backend=storage_backend)
+        if self.cache is not None:
+            self.cache.put(self._cache_key(storage_backend), processed_data)
+
 def main():
     """ฟังก์ชันหลักสำหรับการทดสอบ"""
     file_path = "นางสาว ราตรี สกุลวงษ์.xlsx"
@@ -0,0 +1,153 @@
+"""
+ระบบแคชผลการประมวลผลไฟล์ Excel
+รองรับ:
+- ใช้ SHA-256 ของเนื้อหาไฟล์และเวอร์ชันของตัวประมวลผลเป็นกุญแจ
+- เก็บผลลัพธ์เป็นไฟล์ JSON บนดิสก์
+- จำกัดขนาดรวมและลบรายการที่ไม่ได้ใช้นานที่สุดก่อน (LRU)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+# ตั้งค่า logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "cache/results")
+DEFAULT_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+def file_hash(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """
+    คำนวณ SHA-256 ของเนื้อหาไฟล์
+
+    Args:
+        file_path: พาธของไฟล์
+        chunk_size: ขนาดข้อมูลที่อ่านต่อครั้ง
+
+    Returns:
+        ค่า hash แบบ hex
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    """แคชผลการประมวลผลโดยใช้เนื้อหาไฟล์เป็นกุญแจ"""
+
+    def __init__(self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES, version: Optional[str] = None):
+        """
+        เริ่มต้นระบบแคช
+
+        Args:
+            cache_dir: โฟลเดอร์เก็บไฟล์แคช
+            max_bytes: ขนาดรวมสูงสุดของแคช
+            version: เวอร์ชันของตัวประมวลผล (ผลลัพธ์ต่างเวอร์ชันจะไม่ใช้ร่วมกัน
+                ค่าเริ่มต้นใช้ main.PROCESSOR_VERSION)
+        """
+        if version is None:
+            # import ตอนเรียกใช้ เพราะ main import โมดูลนี้
+            from main import PROCESSOR_VERSION as version
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, content_hash: str) -> str:
+        """สร้างกุญแจจาก hash ของเนื้อหาไฟล์และเวอร์ชัน"""
+        return hashlib.sha256(f"{content_hash}:{self.version}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{self.key(content_hash)}.json"
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        ดึงผลลัพธ์จากแคช
+
+        Args:
+            content_hash: SHA-256 ของเนื้อหาไฟล์
+
+        Returns:
+            ผลการประมวลผล หรือ None ถ้าไม่มีในแคช
+        """
+        path = self._entry_path(content_hash)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"ไม่สามารถอ่านแคช {path.name}: {str(e)}")
+            return None
+
+        # อัปเดตเวลาใช้งานล่าสุดสำหรับ LRU
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return result
+
+    def put(self, content_hash: str, result: Dict[str, Any]) -> None:
+        """
+        บันทึกผลลัพธ์ลงแคช แล้วลบรายการเก่าถ้าเกินขนาดที่กำหนด
+
+        Args:
+            content_hash: SHA-256 ของเนื้อหาไฟล์
+            result: ผลการประมวลผล
+        """
+        path = self._entry_path(content_hash)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        """ลบรายการที่ไม่ได้ใช้นานที่สุดจนขนาดรวมไม่เกิน max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                logger.info(f"ลบแคช {path.name} ({size} bytes)")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> Dict[str, int]:
+        """ข้อมูลสรุปของแคช"""
+        sizes = [path.stat().st_size for path in self.cache_dir.glob("*.json")]
+        return {
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes
+        }
+
+    def clear(self) -> None:
+        """ลบแคชทั้งหมด"""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,96 @@
+"""
+ระบบส่งผลการประมวลผล workbook แบบแบ่งส่วน
+รองรับ:
+- ตัดข้อมูล structure (การจัดรูปแบบรายเซลล์) ออกจากผลลัพธ์
+- แบ่งหน้าข้อมูล content ด้วย offset และ limit
+- แปลงผลลัพธ์เป็น NDJSON ทีละบรรทัด (หนึ่งบรรทัดต่อ sheet หรือแถว) โดยไม่สร้าง JSON ก้อนใหญ่ก้อนเดียว
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+def _json_default(value: Any) -> Any:
+    """แปลงค่าที่ json แปลงเองไม่ได้ (วันที่ เวลา Decimal) แบบเดียวกับ jsonable_encoder"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+
+def _page(rows: List[Any], offset: int, limit: Optional[int]) -> List[Any]:
+    return rows[offset:] if limit is None else rows[offset:offset + limit]
+
+def _validate(offset: int, limit: Optional[int]) -> None:
+    if offset < 0:
+        raise ValueError("offset ต้องไม่ติดลบ")
+    if limit is not None and limit < 1:
+        raise ValueError("limit ต้องมากกว่า 0")
+
+def select_result(processed_data: Dict[str, Dict], include_structure: bool = True,
+                  offset: int = 0, limit: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    เลือกส่วนของผลลัพธ์ที่ต้องการส่งกลับ
+
+    sheet ที่แบ่งหน้าได้ total_rows (จำนวนแถว content ทั้งหมด) เพิ่มเติม
+    ผลของโหมด incremental (ไม่มี content) ถูกส่งกลับตามเดิม
+
+    Args:
+        processed_data: ผลลัพธ์จาก ExcelProcessor.parse หรือ process_file
+        include_structure: ส่งข้อมูล structure ด้วย
+        offset: แถว content แรกที่ต้องการของแต่ละ sheet
+        limit: จำนวนแถว content สูงสุดต่อ sheet (None = ทั้งหมด)
+    """
+    _validate(offset, limit)
+    paginate = offset > 0 or limit is not None
+    selected = {}
+    for sheet_name, sheet in processed_data.items():
+        if not isinstance(sheet, dict) or "content" not in sheet:
+            selected[sheet_name] = sheet
+            continue
+        sheet = dict(sheet)
+        if not include_structure:
+            sheet.pop("structure", None)
+        if paginate:
+            sheet["total_rows"] = len(sheet["content"])
+            sheet["content"] = _page(sheet["content"], offset, limit)
+        selected[sheet_name] = sheet
+    return selected
+
+def iter_ndjson(processed_data: Dict[str, Dict], include_structure: bool = True,
+                offset: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+    """
+    แปลงผลลัพธ์เป็น NDJSON ทีละบรรทัด
+
+    ลำดับของบรรทัดในแต่ละ sheet:
+    {"type": "sheet", "sheet": "...", "total_rows": 120, "offset": 0, "count": 100}
+    {"type": "row", "sheet": "...", "index": 0, "content": {...}}
+    {"type": "structure", "sheet": "...", "row": {...}}   (เมื่อ include_structure)
+    และปิดท้ายด้วย {"type": "end", "sheets": 2}
+    ผลของโหมด incremental ได้บรรทัด {"type": "sheet", "sheet": "...", "summary": {...}} ต่อ sheet
+
+    Args:
+        ดู select_result
+    """
+    _validate(offset, limit)
+    for sheet_name, sheet in processed_data.items():
+        if not isinstance(sheet, dict) or "content" not in sheet:
+            yield _dumps({"type": "sheet", "sheet": sheet_name, "summary": sheet})
+            continue
+
+        content = sheet["content"]
+        page = _page(content, offset, limit)
+        yield _dumps({
+            "type": "sheet", "sheet": sheet_name,
+            "total_rows": len(content), "offset": offset, "count": len(page)
+        })
+        for index, row in enumerate(page, start=offset):
+            yield _dumps({"type": "row", "sheet": sheet_name, "index": index, "content": row})
+        if include_structure:
+            for row in sheet.get("structure", []):
+                yield _dumps({"type": "structure", "sheet": sheet_name, "row": row})
+    yield _dumps({"type": "end", "sheets": len(processed_data)})
@@ -45,6 +45,12 @@ setup(
             "mypy>=0.910",
             "pre-commit>=2.15.0"
         ],
+        'fast': [
+            "python-calamine>=0.1.7"
+        ],
+        'redis': [
+            "redis>=4.2.0"
+        ],
         'doc': [
             "sphinx>=4.2.0",
             "sphinx-rtd-theme>=1.0.0"
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.chunked import ColumnAccumulator, iter_excel_chunks, profile_excel
+from excel_processor.profiling import profile_dataframe
+from excel_processor.readers import available_engines
+
+CHUNK_SIZE = 37
+
+@pytest.fixture
+def sales_file(tmp_path):
+    """สร้างไฟล์ Excel ยอดขายที่มีค่าว่าง แถวซ้ำข้าม block และชนิดข้อมูลหลายแบบ"""
+    rng = np.random.default_rng(11)
+    frame = pd.DataFrame({
+        "รหัส": np.arange(300),
+        "จำนวน": rng.integers(0, 50, 300),
+        "ราคา": rng.normal(1000, 250, 300),
+        "ส่วนลด": np.where(rng.random(300) < 0.2, np.nan, rng.random(300)),
+        "จังหวัด": rng.choice(["กรุงเทพฯ", "เชียงใหม่", "ขอนแก่น", None], 300),
+        "เลขที่": rng.choice(["100", "200", "ไม่ทราบ"], 300),
+        "วันที่": pd.date_range("2024-01-01", periods=300, freq="D")
+    })
+    frame = pd.concat([frame, frame.iloc[:10]], ignore_index=True)
+    file_path = tmp_path / "sales.xlsx"
+    frame.to_excel(file_path, index=False)
+    return file_path
+
+def test_iter_chunks_matches_read_excel(sales_file):
+    """ทดสอบว่าการอ่านทีละ block ได้ข้อมูลเดียวกับ pd.read_excel"""
+    chunks = list(iter_excel_chunks(sales_file, CHUNK_SIZE))
+    assert max(len(chunk) for chunk in chunks) == CHUNK_SIZE
+    combined = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(combined, pd.read_excel(sales_file), check_dtype=False)
+
+def test_chunked_profile_within_tolerance(sales_file):
+    """ทดสอบว่า profile แบบทีละ block ตรงกับการโหลดทั้งไฟล์ภายในความคลาดเคลื่อนที่ระบุ"""
+    df = pd.read_excel(sales_file)
+    expected = profile_dataframe(df)
+    profile = profile_excel(sales_file, CHUNK_SIZE)
+
+    assert profile.row_count == expected.row_count
+    assert profile.columns == expected.columns
+    assert profile.null_counts.equals(expected.null_counts)
+    assert profile.duplicate_count == expected.duplicate_count
+    assert profile.distinct_counts == expected.distinct_counts
+    assert profile.dtypes == expected.dtypes
+    for column, inference in expected.inferred_types.items():
+        chunked_inference = profile.inferred_types[column]
+        assert chunked_inference.inferred_type == inference.inferred_type
+        assert chunked_inference.invalid_count == inference.invalid_count
+
+    for column, stats in expected.numeric.items():
+        assert profile.numeric[column]["count"] == stats["count"]
+        assert profile.numeric[column]["min"] == stats["min"]
+        assert profile.numeric[column]["max"] == stats["max"]
+        for name in ("mean", "std"):
+            assert profile.numeric[column][name] == pytest.approx(stats[name], rel=1e-9)
+    assert profile.value_counts["จังหวัด"].to_dict() == expected.value_counts["จังหวัด"].to_dict()
+
+def test_accumulator_merge_matches_single_pass():
+    """ทดสอบว่าการรวม accumulator สองตัวได้ผลเท่ากับการสะสมรวดเดียว"""
+    values = pd.Series(np.random.default_rng(3).normal(size=1000))
+    whole, left, right = ColumnAccumulator(), ColumnAccumulator(), ColumnAccumulator()
+    whole.update(values)
+    left.update(values.iloc[:400])
+    right.update(values.iloc[400:])
+    merged = left.merge(right).numeric_stats()
+    for name, value in whole.numeric_stats().items():
+        assert merged[name] == pytest.approx(value, rel=1e-9)
+
+def test_distinct_sketch_estimate():
+    """ทดสอบว่าจำนวนค่าที่ไม่ซ้ำเกินขนาด sketch ยังประมาณได้ใกล้เคียง"""
+    accumulator = ColumnAccumulator(distinct_size=256)
+    for start in range(0, 20000, 5000):
+        accumulator.update(pd.Series([f"ค่า{i}" for i in range(start, start + 5000)]))
+    assert accumulator.distinct_count == pytest.approx(20000, rel=0.15)
+
+def test_distinct_count_across_int_and_float_chunks():
+    """ทดสอบว่าค่าเดียวกันใน block ชนิด int64 และ block ที่มีค่าว่าง (float64) นับเป็นค่าเดียว"""
+    accumulator = ColumnAccumulator()
+    accumulator.update(pd.Series([1, 2, 3]))
+    accumulator.update(pd.Series([4, None, 1]))
+    assert accumulator.distinct_count == pd.Series([1, 2, 3, 4, None, 1]).nunique() == 4
+
+def test_chunked_processor_methods(sales_file):
+    """ทดสอบว่า ExcelProcessor โหมด chunked ให้ผลเดียวกับโหมดโหลดทั้งไฟล์โดยไม่โหลด self.df"""
+    in_memory = ExcelProcessor(sales_file)
+    chunked = ExcelProcessor(sales_file, chunk_size=CHUNK_SIZE)
+
+    drop_sampled = lambda result: [
+        {key: value for key, value in warning.items() if key != "sampled"} for warning in result["warnings"]
+    ]
+    assert drop_sampled(chunked.validate_data()) == drop_sampled(in_memory.validate_data())
+    statistics, expected = chunked._calculate_statistics(), in_memory._calculate_statistics()
+    assert statistics["row_count"] == expected["row_count"]
+    assert statistics["numeric_columns"].keys() == expected["numeric_columns"].keys()
+    analysis, expected = chunked.analyze_data(), in_memory.analyze_data()
+    assert analysis["groupby_results"] == expected["groupby_results"]
+    assert analysis["time_series"] == expected["time_series"]
+    for column, stats in expected["numeric_stats"].items():
+        assert analysis["numeric_stats"][column] == pytest.approx(stats, rel=1e-9)
+    assert chunked.df is None
+
+def test_chunked_clean_data(sales_file, tmp_path):
+    """ทดสอบว่า clean_data โหมด chunked เขียนผลลัพธ์เดียวกับโหมดโหลดทั้งไฟล์"""
+    in_memory = ExcelProcessor(sales_file)
+    in_memory.clean_data()
+    output = tmp_path / "cleaned.csv"
+    chunked = ExcelProcessor(sales_file, chunk_size=CHUNK_SIZE)
+    chunked.clean_data(output)
+
+    expected_path = tmp_path / "expected.csv"
+    in_memory.df.to_csv(expected_path, index=False)
+    pd.testing.assert_frame_equal(pd.read_csv(output), pd.read_csv(expected_path))
+    with pytest.raises(ValueError):
+        chunked.clean_data()
+
+@pytest.fixture
+def second_sheet_file(sales_file, tmp_path):
+    """สร้างไฟล์ที่ข้อมูลยอดขายอยู่ใน sheet ที่สอง ต่อจาก sheet สรุปที่มีคอลัมน์ต่างกัน"""
+    file_path = tmp_path / "sales_second.xlsx"
+    with pd.ExcelWriter(file_path) as writer:
+        pd.DataFrame({"หมายเหตุ": ["สรุปรายเดือน"]}).to_excel(writer, sheet_name="สรุป", index=False)
+        pd.read_excel(sales_file).to_excel(writer, sheet_name="ยอดขาย", index=False)
+    return file_path
+
+@pytest.mark.parametrize("engine", ["openpyxl", "calamine"])
+def test_iter_chunks_selected_sheet_and_engine(second_sheet_file, engine):
+    """ทดสอบการอ่านทีละ block จาก sheet ที่ไม่ใช่ sheet แรกด้วยชื่อหรือลำดับ และตัวอ่านแต่ละแบบ"""
+    if engine not in available_engines():
+        pytest.skip(f"ยังไม่ได้ติดตั้งตัวอ่าน {engine}")
+    expected = pd.read_excel(second_sheet_file, sheet_name="ยอดขาย")
+    for sheet in ("ยอดขาย", 1):
+        chunks = iter_excel_chunks(second_sheet_file, CHUNK_SIZE, sheet, engine)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+def test_chunked_processor_uses_selected_sheet(second_sheet_file, tmp_path):
+    """ทดสอบว่าโหมด chunked ตรวจสอบ วิเคราะห์ และทำความสะอาด sheet ที่เลือก ไม่ใช่ sheet แรก"""
+    in_memory = ExcelProcessor(second_sheet_file)
+    in_memory.load_file("ยอดขาย")
+    chunked = ExcelProcessor(second_sheet_file, chunk_size=CHUNK_SIZE, sheet_name="ยอดขาย")
+
+    assert chunked.profile.columns == in_memory.profile.columns
+    assert chunked._calculate_statistics()["row_count"] == in_memory._calculate_statistics()["row_count"]
+    analysis, expected = chunked.analyze_data(), in_memory.analyze_data()
+    assert analysis["groupby_results"] == expected["groupby_results"]
+    assert analysis["numeric_stats"].keys() == expected["numeric_stats"].keys()
+
+    output = tmp_path / "cleaned.csv"
+    chunked.clean_data(output)
+    in_memory.clean_data()
+    assert list(pd.read_csv(output).columns) == list(in_memory.df.columns)
+    assert chunked.df is None
+
+def test_invalid_chunk_size(sales_file):
+    """ทดสอบการกำหนดขนาด block ที่ไม่ถูกต้อง"""
+    with pytest.raises(ValueError):
+        ExcelProcessor(sales_file, chunk_size=0)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.cleaning import CleaningPipeline
+
+@pytest.fixture
+def customers_frame():
+    """สร้างข้อมูลลูกค้าที่มีคอลัมน์ไม่มีชื่อ ค่าว่าง แถวซ้ำ และวันที่"""
+    return pd.DataFrame({
+        "ชื่อ-นามสกุล": ["  สมชาย ใจดี ", None, "สมหญิง รักงาน", None],
+        "ที่อยู่": ["กรุงเทพฯ", None, "เชียงใหม่", None],
+        "ยอดซื้อ": [100.0, 250.5, 80.0, 250.5],
+        "Unnamed: 3": [None, None, None, None],
+        "วันที่": pd.to_datetime(["2024-01-05 10:30", "2024-02-01", "2024-03-15", "2024-02-01"])
+    })
+
+def legacy_clean(df):
+    """ขั้นตอนทำความสะอาดแบบเดิม สำหรับเทียบผลลัพธ์"""
+    df = df.drop(columns=[col for col in df.columns if 'Unnamed:' in str(col)])
+    df = df.fillna({'ชื่อ-นามสกุล': 'ไม่ระบุ', 'ที่อยู่': 'ไม่ระบุ', 'เลขประจำตัวผู้เสียภาษี': '0000000000'})
+    df = df.drop_duplicates()
+    for col in df.select_dtypes(include=['datetime64']).columns:
+        df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d')
+    return df
+
+def test_default_rules_match_legacy_steps(customers_frame):
+    """ทดสอบว่ากฎเริ่มต้นให้ผลเหมือนขั้นตอนเดิม โดยคัดลอกทั้งตารางครั้งเดียว"""
+    original = customers_frame.copy()
+    cleaned, report = CleaningPipeline().apply(customers_frame)
+
+    pd.testing.assert_frame_equal(cleaned, legacy_clean(customers_frame))
+    pd.testing.assert_frame_equal(customers_frame, original)
+    assert report.to_dict() == {
+        "rows_in": 4,
+        "rows_out": 3,
+        "dropped_columns": ["Unnamed: 3"],
+        "modified_columns": ["ชื่อ-นามสกุล", "ที่อยู่", "วันที่"],
+        "frame_copies": 1,
+        "copies_avoided": 2
+    }
+
+def test_unmodified_columns_are_not_copied(customers_frame):
+    """ทดสอบว่าไม่มีแถวซ้ำแล้วคอลัมน์ที่ไม่ถูกแก้ไขใช้หน่วยความจำร่วมกับข้อมูลเดิม"""
+    unique = customers_frame.iloc[:3]
+    cleaned, report = CleaningPipeline().apply(unique)
+    assert report.frame_copies == 0 and report.copies_avoided == 3
+    assert np.shares_memory(cleaned["ยอดซื้อ"].to_numpy(), unique["ยอดซื้อ"].to_numpy())
+
+def test_template_rules(customers_frame):
+    """ทดสอบกฎจาก validation_rules: ลบคอลัมน์ ตัดช่องว่าง เติมค่า และรูปแบบวันที่"""
+    rules = {
+        "ชื่อ-นามสกุล": {"strip": True, "fill": "-", "required": True},
+        "ที่อยู่": {"drop": True},
+        "ยอดซื้อ": {"min": 0},
+        "วันที่": {"date_format": "%d/%m/%Y"}
+    }
+    pipeline = CleaningPipeline(rules, drop_duplicates=False)
+    cleaned, report = pipeline.apply(customers_frame)
+
+    assert cleaned.columns.tolist() == ["ชื่อ-นามสกุล", "ยอดซื้อ", "วันที่"]
+    assert cleaned["ชื่อ-นามสกุล"].tolist() == ["สมชาย ใจดี", "-", "สมหญิง รักงาน", "-"]
+    assert cleaned["วันที่"].tolist() == ["05/01/2024", "01/02/2024", "15/03/2024", "01/02/2024"]
+    assert report.dropped_columns == ["ที่อยู่", "Unnamed: 3"]
+
+def test_compiled_plan_is_reused(customers_frame):
+    """ทดสอบว่าไฟล์หัวตารางเดียวกันใช้แผนที่คอมไพล์ไว้แล้วซ้ำ"""
+    pipeline = CleaningPipeline()
+    for _ in range(3):
+        pipeline.apply(customers_frame)
+    pipeline.apply(customers_frame.iloc[:2])
+    assert len(pipeline._plans) == 1
+    assert pipeline.files_cleaned == 4
+    assert pipeline.copies_avoided == 2 + 2 + 2 + 3
+
+def test_category_fill(customers_frame):
+    """ทดสอบการเติมค่าว่างในคอลัมน์ category"""
+    frame = customers_frame.astype({"ที่อยู่": "category"})
+    cleaned, _ = CleaningPipeline(drop_duplicates=False).apply(frame)
+    assert cleaned["ที่อยู่"].tolist() == ["กรุงเทพฯ", "ไม่ระบุ", "เชียงใหม่", "ไม่ระบุ"]
+
+def test_processor_shares_pipeline(customers_frame, tmp_path):
+    """ทดสอบการใช้ pipeline ตัวเดียวกับหลายไฟล์ และรายงานรวมในโหมด chunked"""
+    pipeline = CleaningPipeline()
+    file_path = tmp_path / "customers.xlsx"
+    customers_frame.to_excel(file_path, index=False)
+
+    processor = ExcelProcessor(file_path, cleaning=pipeline)
+    processor.clean_data()
+    assert processor.cleaning_report.rows_out == 3
+
+    chunked = ExcelProcessor(file_path, chunk_size=2, cleaning=pipeline)
+    chunked.clean_data(tmp_path / "cleaned.csv")
+    assert chunked.cleaning_report.rows_in == 4
+    assert chunked.cleaning_report.rows_out == 3
+    assert chunked.cleaning_report.legacy_copies == 6
+    assert pipeline.files_cleaned == 3
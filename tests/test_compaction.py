@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.compaction import compact_dataframe
+from excel_processor.fingerprints import row_fingerprints
+
+@pytest.fixture
+def customers_frame():
+    """สร้างข้อมูลลูกค้าที่มีข้อความซ้ำมาก ตัวเลขช่วงแคบ และค่าว่าง"""
+    rng = np.random.default_rng(17)
+    rows = 2000
+    return pd.DataFrame({
+        "รหัส": np.arange(rows),
+        "อายุ": rng.integers(18, 90, rows),
+        "คะแนน": rng.integers(0, 5, rows) / 2,
+        "ยอดซื้อ": rng.normal(1000, 250, rows),
+        "จังหวัด": rng.choice(["กรุงเทพฯ", "เชียงใหม่", "ขอนแก่น", None], rows),
+        "ชื่อ-นามสกุล": [None if n % 50 == 0 else f"ลูกค้า {n}" for n in range(rows)],
+        "หมายเหตุ": rng.choice(["ปกติ", 5, None], rows)
+    })
+
+def test_compact_dataframe(customers_frame):
+    """ทดสอบการลดขนาดตัวเลข แปลง category และ string[pyarrow] โดยค่าไม่เปลี่ยน"""
+    compacted, report = compact_dataframe(customers_frame)
+    assert report.conversions == {
+        "รหัส": ("int64", "int16"),
+        "อายุ": ("int64", "int8"),
+        "คะแนน": ("float64", "float32"),
+        "จังหวัด": ("object", "category"),
+        "ชื่อ-นามสกุล": ("object", "string")
+    }
+    assert report.after_bytes < report.before_bytes / 2
+    assert report.to_dict()["saved_ratio"] > 0.5
+
+    for column in customers_frame.columns:
+        original = customers_frame[column]
+        restored = compacted[column].astype(object).where(compacted[column].notna(), None)
+        expected = original.astype(object).where(original.notna(), None)
+        assert restored.tolist() == expected.tolist()
+    assert (row_fingerprints(compacted) == row_fingerprints(customers_frame)).all()
+
+def test_compacted_processor_matches_default(customers_frame, tmp_path):
+    """ทดสอบว่าผลตรวจสอบและวิเคราะห์ข้อมูลที่ลดขนาดแล้วตรงกับแบบเดิม"""
+    file_path = tmp_path / "customers.xlsx"
+    customers_frame.to_excel(file_path, index=False)
+    default = ExcelProcessor(file_path)
+    compact = ExcelProcessor(file_path, compact=True)
+
+    assert compact.validate_data() == default.validate_data()
+    assert compact.compaction_report.saved_bytes > 0
+    analysis, expected = compact.analyze_data(), default.analyze_data()
+    assert analysis["groupby_results"] == expected["groupby_results"]
+    assert analysis["numeric_stats"].keys() == expected["numeric_stats"].keys()
+    for column, stats in expected["numeric_stats"].items():
+        assert analysis["numeric_stats"][column] == pytest.approx(stats, rel=1e-6)
+    assert "memory" in compact.process_file()
+
+    compact.clean_data()
+    default.clean_data()
+    assert (compact.df["ชื่อ-นามสกุล"] == "ไม่ระบุ").sum() == (default.df["ชื่อ-นามสกุล"] == "ไม่ระบุ").sum()
+    assert len(compact.df) == len(default.df)
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import pytest
+from openpyxl import Workbook
+from executors import ExecutorLayer, fan_out
+from main import ExcelProcessor, parse_file_worker
+
+@pytest.fixture
+def layer():
+    """สร้างชั้นส่งงานขนาดเล็กสำหรับทดสอบ"""
+    layer = ExecutorLayer(process_workers=1, io_workers=4, endpoint_limits={"upload": 2})
+    yield layer
+    layer.shutdown()
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive(layer):
+    """ทดสอบว่างานที่บล็อกใน thread pool ไม่หยุด coroutine อื่น"""
+    release = threading.Event()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while not release.is_set():
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    work = asyncio.create_task(layer.run_io(release.wait, 5))
+    await asyncio.sleep(0.2)
+    assert ticks > 5
+    assert layer.metrics()["thread_pool"]["pending"] == 1
+    release.set()
+    assert await work is True
+    await ticking
+    assert layer.metrics()["thread_pool"]["pending"] == 0
+
+@pytest.mark.asyncio
+async def test_endpoint_limit_and_queue_depth(layer):
+    """ทดสอบการจำกัดงานพร้อมกันต่อ endpoint และการนับความยาวคิว"""
+    release = asyncio.Event()
+    active = []
+
+    async def request():
+        async with layer.slot("upload"):
+            active.append(layer.metrics()["endpoints"]["upload"]["active"])
+            await release.wait()
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    endpoint = layer.metrics()["endpoints"]["upload"]
+    assert endpoint["active"] == 2 and endpoint["queue_depth"] == 3
+    release.set()
+    await asyncio.gather(*tasks)
+
+    endpoint = layer.metrics()["endpoints"]["upload"]
+    assert max(active) == 2
+    assert endpoint["completed"] == 5 and endpoint["queue_depth"] == 0
+    assert endpoint["max_queue_depth"] == 3
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_counted(layer):
+    """ทดสอบว่างานที่ล้มเหลวคืน slot และถูกนับ"""
+    with pytest.raises(ZeroDivisionError):
+        async with layer.slot("report"):
+            await layer.run_io(divmod, 1, 0)
+    endpoint = layer.metrics()["endpoints"]["report"]
+    assert endpoint == {
+        "limit": layer.default_limit, "active": 0, "queue_depth": 0,
+        "max_queue_depth": 0, "completed": 0, "failed": 1
+    }
+
+@pytest.mark.asyncio
+async def test_parse_in_process_pool(layer, tmp_path):
+    """ทดสอบว่าการแยกวิเคราะห์ใน process pool ได้ผลเดียวกับใน process หลัก"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "ลูกค้า"
+    sheet.append(["ชื่อ-นามสกุล", "จังหวัด", "ยอดซื้อ"])
+    sheet.append(["นาย สมชาย ใจดี", "เชียงใหม่", 850])
+    file_path = str(tmp_path / "customers.xlsx")
+    workbook.save(file_path)
+
+    result = await layer.run_cpu(parse_file_worker, file_path, {"chunk_size": 100})
+    assert result == ExcelProcessor(file_path).parse()
+    assert layer.metrics()["process_pool"] == {"workers": 1, "pending": 0, "queued": 0}
+
+def test_invalid_sizes():
+    """ทดสอบการตรวจขนาด pool"""
+    with pytest.raises(ValueError):
+        ExecutorLayer(process_workers=0)
+
+@pytest.mark.asyncio
+async def test_fan_out_completion_order_and_errors():
+    """ทดสอบว่า fan_out คืนผลตามลำดับที่เสร็จ จำกัดงานพร้อมกัน และแยก error ต่อรายการ"""
+    running = 0
+    peak = 0
+
+    async def work(delay):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(delay)
+            if delay == 0.02:
+                raise ValueError("ไฟล์เสียหาย")
+            return delay * 100
+        finally:
+            running -= 1
+
+    entries = [entry async for entry in fan_out([0.08, 0.02, 0.01, 0.05], work, max_parallel=2)]
+    assert [entry.index for entry in entries] == [1, 2, 0, 3]
+    assert isinstance(entries[0].error, ValueError)
+    assert entries[1].result == pytest.approx(1) and entries[1].error is None
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_fan_out_cancels_remaining_work():
+    """ทดสอบว่างานที่เหลือถูกยกเลิกเมื่อผู้เรียกหยุดอ่านผล"""
+    started = []
+
+    async def work(item):
+        started.append(item)
+        await asyncio.sleep(0.01 * item)
+        return item
+
+    stream = fan_out(range(1, 6), work, max_parallel=1)
+    first = await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0.05)
+    assert first.result == 1
+    assert len(started) <= 2
+
+    with pytest.raises(ValueError):
+        await fan_out([], work, max_parallel=0).__anext__()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from excel_processor.processor import ExcelProcessor
+from excel_processor.fingerprints import RowFingerprintIndex, duplicated_fingerprints, row_fingerprints
+
+def make_invoices(start, stop):
+    """สร้างข้อมูลใบแจ้งหนี้ตามช่วงเลขที่"""
+    numbers = np.arange(start, stop)
+    return pd.DataFrame({
+        "เลขที่ใบแจ้งหนี้": [f"INV{n:05d}" for n in numbers],
+        "จำนวนเงิน": numbers * 10,
+        "ลูกค้า": [f"ลูกค้า{n % 7}" for n in numbers]
+    })
+
+def test_duplicated_matches_pandas():
+    """ทดสอบว่าแถวซ้ำจากลายนิ้วมือตรงกับ DataFrame.duplicated()"""
+    df = pd.concat([make_invoices(0, 50), make_invoices(10, 20)], ignore_index=True)
+    df.loc[3, "ลูกค้า"] = None
+    mask = duplicated_fingerprints(row_fingerprints(df))
+    assert (mask == df.duplicated().to_numpy()).all()
+
+def test_integer_and_float_columns_share_fingerprint():
+    """ทดสอบว่าคอลัมน์จำนวนเต็มได้ลายนิ้วมือเดียวกับคอลัมน์เดียวกันที่เป็น float"""
+    df = make_invoices(0, 5)
+    as_float = df.astype({"จำนวนเงิน": np.float64})
+    assert (row_fingerprints(df) == row_fingerprints(as_float)).all()
+
+def test_index_persisted_and_compact(tmp_path):
+    """ทดสอบการบันทึกและค้นหาลายนิ้วมือจากไฟล์ของแม่แบบ"""
+    fingerprints = row_fingerprints(make_invoices(0, 1000))
+    index = RowFingerprintIndex("ใบแจ้งหนี้/รายเดือน", tmp_path)
+    assert index.add(fingerprints) == 1000
+    assert index.add(fingerprints[:10]) == 0
+
+    reopened = RowFingerprintIndex("ใบแจ้งหนี้/รายเดือน", tmp_path)
+    assert len(reopened) == 1000
+    assert reopened.path.stat().st_size < 1000 * 8 + 256
+    probe = row_fingerprints(make_invoices(990, 1010))
+    assert reopened.contains(probe).tolist() == [True] * 10 + [False] * 10
+
+def test_concurrent_adds_keep_every_fingerprint(tmp_path):
+    """ทดสอบว่าการบันทึกพร้อมกันของแม่แบบเดียวกันไม่ทำให้ลายนิ้วมือหาย"""
+    batches = [np.arange(start, start + 50, dtype=np.uint64) for start in range(0, 2000, 50)]
+
+    def add(batch):
+        return RowFingerprintIndex("ใบแจ้งหนี้", tmp_path).add(batch)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert sum(executor.map(add, batches)) == 2000
+    assert len(RowFingerprintIndex("ใบแจ้งหนี้", tmp_path)) == 2000
+    assert not list(tmp_path.glob("*.tmp.npy"))
+
+def test_resubmitted_invoices_rejected(tmp_path):
+    """ทดสอบว่าไฟล์ที่มีแถวซ้ำกับไฟล์ก่อนหน้าของแม่แบบเดียวกันไม่ผ่านการตรวจสอบ"""
+    first, second = tmp_path / "january.xlsx", tmp_path / "february.xlsx"
+    make_invoices(0, 30).to_excel(first, index=False)
+    make_invoices(25, 60).to_excel(second, index=False)
+    store = tmp_path / "fingerprints"
+
+    results = ExcelProcessor(first, template="invoice", fingerprint_dir=store).process_file()
+    assert results["validation"]["is_valid"]
+    assert results["registered_rows"] == 30
+
+    results = ExcelProcessor(second, template="invoice", fingerprint_dir=store).process_file()
+    assert not results["validation"]["is_valid"]
+    assert results["validation"]["errors"] == [{
+        "type": "previously_processed", "template": "invoice", "count": 5, "rows": [0, 1, 2, 3, 4]
+    }]
+    assert "registered_rows" not in results
+
+    other_template = ExcelProcessor(second, template="receipt", fingerprint_dir=store)
+    assert other_template.validate_data()["is_valid"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.inference import infer_column_type
+
+@pytest.mark.parametrize("values, inferred_type, invalid_count", [
+    (["1", "2", 3, None], "integer", 0),
+    (["1.5", "2", None], "float", 0),
+    (["ก", "ข", None], "string", 2),
+    (["10", "ไม่ทราบ", "20", "30"], "mixed", 1),
+    ([None, None], "empty", 0),
+])
+def test_infer_column_type(values, inferred_type, invalid_count):
+    """ทดสอบการอนุมานชนิดข้อมูลและนับค่าที่แปลงเป็นตัวเลขไม่ได้"""
+    inference = infer_column_type(pd.Series(values, dtype=object))
+    assert inference.inferred_type == inferred_type
+    assert inference.invalid_count == invalid_count
+    assert not inference.sampled
+
+def test_text_column_decided_from_sample():
+    """ทดสอบว่าคอลัมน์ข้อความล้วนตัดสินจากค่าตัวอย่างโดยไม่แปลงทั้งคอลัมน์"""
+    inference = infer_column_type(pd.Series([f"ลูกค้า{i}" for i in range(1000)]), sample_size=50)
+    assert inference.sampled
+    assert inference.inferred_type == "string"
+    assert inference.invalid_ratio == 1.0
+
+def test_sparse_invalid_values_confirmed():
+    """ทดสอบว่าค่าที่ไม่ใช่ตัวเลขเพียงไม่กี่ค่านอกตัวอย่างยังถูกนับครบ"""
+    values = pd.Series([str(i) for i in range(1000)], dtype=object)
+    values.iloc[[3, 501]] = "ไม่ทราบ"
+    inference = infer_column_type(values, sample_size=10)
+    assert (inference.inferred_type, inference.invalid_count) == ("mixed", 2)
+    assert inference.invalid_ratio == pytest.approx(0.002)
+
+def test_validate_data_reports_invalid_ratio(tmp_path):
+    """ทดสอบว่า validate_data รายงานชนิดข้อมูลและสัดส่วนค่าที่ไม่ใช่ตัวเลข"""
+    file_path = tmp_path / "orders.xlsx"
+    pd.DataFrame({
+        "จำนวน": np.arange(4),
+        "เลขที่": ["100", "200", "ไม่ทราบ", "400"],
+        "ชื่อสินค้า": ["ก", "ข", "ค", "ง"]
+    }).to_excel(file_path, index=False)
+
+    warnings = ExcelProcessor(file_path).validate_data()["warnings"]
+    assert warnings == [
+        {"type": "invalid_numeric", "column": "เลขที่", "inferred_type": "mixed",
+         "invalid_count": 1, "invalid_ratio": 0.25, "sampled": False},
+        {"type": "invalid_numeric", "column": "ชื่อสินค้า", "inferred_type": "string",
+         "invalid_count": 4, "invalid_ratio": 1.0, "sampled": False}
+    ]
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import shutil
+import threading
+import pytest
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from executors import ExecutorLayer
+from jobs import JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobQueue, SQLiteJobStore
+from main import ExcelProcessor
+
+@pytest.fixture
+def branches_file(tmp_path):
+    """สร้างไฟล์ Excel หลาย sheet สำหรับทดสอบ"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for idx in range(3):
+        sheet = workbook.create_sheet(f"สาขา{idx}")
+        sheet.append(["ชื่อ-นามสกุล", "จังหวัด", "ยอดซื้อ"])
+        for row in range(idx + 2):
+            sheet.append([f"นาย ลูกค้า{row} สาขา{idx}", "เชียงใหม่", row * 100])
+    file_path = tmp_path / "branches.xlsx"
+    workbook.save(file_path)
+    return file_path
+
+@pytest.fixture
+def queue(tmp_path):
+    """สร้างคิวงานที่ใช้ฐานข้อมูลและที่เก็บสถานะชั่วคราว"""
+    layer = ExecutorLayer(process_workers=1, io_workers=2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'excel_data.db'}")
+    queue = JobQueue(
+        SQLiteJobStore(tmp_path / "jobs" / "jobs.db"), layer,
+        lambda file_path, **options: ExcelProcessor(file_path, engine=engine, **options),
+        upload_dir=tmp_path / "uploads"
+    )
+    yield queue
+    layer.shutdown()
+    engine.dispose()
+
+async def wait_for(queue, job_id, timeout=60):
+    """รอจนงานเสร็จหรือล้มเหลว"""
+    for _ in range(int(timeout / 0.05)):
+        job = queue.get(job_id)
+        if job["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+            return job
+        await asyncio.sleep(0.05)
+    raise TimeoutError(job_id)
+
+def test_store_lifecycle(tmp_path):
+    """ทดสอบการสร้าง อัปเดต และบันทึกผลของงานใน SQLite"""
+    store = SQLiteJobStore(tmp_path / "jobs.db")
+    job = store.create("abc", "ยอดขาย.xlsx")
+    assert job["status"] == JOB_QUEUED
+    assert job["sheets_done"] == 0 and job["rows_processed"] == 0
+
+    store.update("abc", status=JOB_RUNNING, sheets_total=2, sheets_done=1)
+    assert store.get("abc")["sheets_done"] == 1
+    with pytest.raises(ValueError):
+        store.update("abc", owner="admin")
+
+    assert store.load_result("abc") is None
+    store.save_result("abc", {"สาขา0": {"content": [1, 2]}})
+    assert store.load_result("abc") == {"สาขา0": {"content": [1, 2]}}
+    assert store.get("missing") is None
+
+def test_interrupted_jobs_are_failed(tmp_path):
+    """ทดสอบว่างานที่ค้างจากการปิดระบบถูกเปลี่ยนเป็น failed เมื่อเปิดใหม่"""
+    store = SQLiteJobStore(tmp_path / "jobs.db")
+    store.create("queued", None)
+    store.create("running", None)
+    store.update("running", status=JOB_RUNNING)
+    store.create("done", None)
+    store.update("done", status=JOB_SUCCEEDED)
+
+    reopened = SQLiteJobStore(tmp_path / "jobs.db")
+    assert reopened.fail_interrupted() == 2
+    assert reopened.get("running")["status"] == JOB_FAILED
+    assert reopened.get("done")["status"] == JOB_SUCCEEDED
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background(queue, branches_file):
+    """ทดสอบว่า submit คืนทันที และผลของงานตรงกับการประมวลผลโดยตรง"""
+    upload = shutil.copy(branches_file, queue.upload_dir / "upload.xlsx")
+    job = await queue.submit(upload, "branches.xlsx")
+    assert job["status"] == JOB_QUEUED
+
+    job = await wait_for(queue, job["id"])
+    assert job["status"] == JOB_SUCCEEDED, job["error"]
+    assert job["sheets_total"] == 3 and job["sheets_done"] == 3
+    expected = ExcelProcessor(str(branches_file)).parse()
+    assert job["rows_processed"] == sum(len(sheet["structure"]) for sheet in expected.values())
+    assert queue.result(job["id"]) == json.loads(json.dumps(expected, ensure_ascii=False))
+    assert list(queue.upload_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_store_updates_run_off_event_loop(queue, branches_file, monkeypatch):
+    """ทดสอบว่าการอัปเดตสถานะงานไม่บล็อก event loop (เรียกใน thread pool ทั้งหมด)"""
+    threads = []
+    update = queue.store.update
+
+    def recording_update(job_id, **fields):
+        threads.append(threading.current_thread())
+        update(job_id, **fields)
+
+    monkeypatch.setattr(queue.store, "update", recording_update)
+    upload = shutil.copy(branches_file, queue.upload_dir / "upload.xlsx")
+    job = await wait_for(queue, (await queue.submit(upload, "branches.xlsx"))["id"])
+    assert job["status"] == JOB_SUCCEEDED
+    assert threads and threading.main_thread() not in threads
+
+@pytest.mark.asyncio
+async def test_invalid_file_fails_job(queue):
+    """ทดสอบว่าไฟล์ที่อ่านไม่ได้ทำให้งานล้มเหลวพร้อมข้อความ error"""
+    upload = queue.upload_dir / "broken.xlsx"
+    upload.write_bytes(b"not an excel file")
+    job = await queue.submit(upload, "broken.xlsx")
+    job = await wait_for(queue, job["id"])
+    assert job["status"] == JOB_FAILED
+    assert job["error"]
+    assert queue.result(job["id"]) is None
+
+def test_redis_store_requires_package():
+    """ทดสอบ Redis store เมื่อติดตั้งแพ็คเกจ redis แล้วเท่านั้น"""
+    pytest.importorskip("redis")
+    from jobs import open_job_store, RedisJobStore
+    assert isinstance(open_job_store("redis://localhost:6379/0"), RedisJobStore)
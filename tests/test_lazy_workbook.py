@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor, LazyWorkbook
+
+@pytest.fixture
+def form_file(tmp_path):
+    """สร้างแบบฟอร์มหลาย sheet"""
+    file_path = tmp_path / "form.xlsx"
+    with pd.ExcelWriter(file_path) as writer:
+        pd.DataFrame({"ชื่อ": ["ก", "ข"], "อายุ": [30, 40]}).to_excel(writer, sheet_name="ข้อมูลส่วนตัว", index=False)
+        pd.DataFrame({"ที่อยู่": ["กรุงเทพฯ", None], "รหัสไปรษณีย์": [10200, 50000]}).to_excel(writer, sheet_name="ที่อยู่", index=False)
+        pd.DataFrame({"โทรศัพท์": ["081", "081"]}).to_excel(writer, sheet_name="ติดต่อ", index=False)
+    return file_path
+
+def test_sheets_parsed_on_first_access(form_file):
+    """ทดสอบว่าแต่ละ sheet ถูก parse ครั้งเดียวเมื่อเรียกใช้ครั้งแรก"""
+    workbook = LazyWorkbook(form_file)
+    assert list(workbook) == ["ข้อมูลส่วนตัว", "ที่อยู่", "ติดต่อ"]
+    assert workbook.parse_count == 0
+
+    assert workbook["ที่อยู่"]["ที่อยู่"].tolist()[0] == "กรุงเทพฯ"
+    assert workbook[1] is workbook["ที่อยู่"]
+    assert workbook.parse_count == 1
+    assert "ติดต่อ" in workbook and "ไม่มี" not in workbook
+    with pytest.raises(KeyError):
+        workbook["ไม่มี"]
+
+def test_bounded_cache_evicts_least_recently_used(form_file):
+    """ทดสอบว่า sheet ที่ไม่ได้ใช้นานที่สุดถูกนำออกเมื่อเกินขนาดแคช"""
+    workbook = LazyWorkbook(form_file, max_cached_sheets=2)
+    workbook["ข้อมูลส่วนตัว"]
+    workbook["ที่อยู่"]
+    workbook["ข้อมูลส่วนตัว"]
+    workbook["ติดต่อ"]
+    assert workbook.cached_sheets == ["ติดต่อ", "ข้อมูลส่วนตัว"]
+    workbook["ที่อยู่"]
+    assert workbook.parse_count == 4
+    with pytest.raises(ValueError):
+        LazyWorkbook(form_file, max_cached_sheets=0)
+
+def test_validate_sheets(form_file):
+    """ทดสอบการตรวจสอบข้อมูลทีละ sheet โดยเก็บ sheet ในหน่วยความจำตามขนาดแคช"""
+    processor = ExcelProcessor(form_file, max_cached_sheets=1)
+    results = processor.validate_sheets()
+    assert list(results) == ["ข้อมูลส่วนตัว", "ที่อยู่", "ติดต่อ"]
+    warning_types = {
+        name: [warning["type"] for warning in result["warnings"]]
+        for name, result in results.items()
+    }
+    assert "null_values" not in warning_types["ข้อมูลส่วนตัว"]
+    assert "duplicates" not in warning_types["ข้อมูลส่วนตัว"]
+    assert "null_values" in warning_types["ที่อยู่"]
+    assert {"type": "duplicates", "count": 1} in results["ติดต่อ"]["warnings"]
+    assert processor.workbook.cached_sheets == ["ติดต่อ"]
+    assert processor.df is None
+
+    processor.load_file("ที่อยู่")
+    assert processor.df.columns.tolist() == ["ที่อยู่", "รหัสไปรษณีย์"]
+    assert list(processor.validate_sheets([2])) == ["ติดต่อ"]
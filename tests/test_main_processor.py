@@ -0,0 +1,318 @@
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from sqlalchemy import create_engine, select, func
+from main import ExcelProcessor, NameColumnParser
+from result_cache import ResultCache
+from database.engine import get_engine
+import main
+
+@pytest.fixture
+def customer_workbook(tmp_path):
+    """สร้างไฟล์ Excel ข้อมูลลูกค้าสำหรับทดสอบ"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "ลูกค้า"
+    sheet.append(["ชื่อ-นามสกุล", "จังหวัด", "ยอดซื้อ"])
+    sheet.append(["นางสาว ราตรี สกุลวงษ์", "กรุงเทพฯ", 1200])
+    sheet.append(["นาย สมชาย ใจดี", "เชียงใหม่", 850])
+    sheet.append(["นาง สมศรี มีสุข", "ขอนแก่น", 430])
+    file_path = tmp_path / "customers.xlsx"
+    workbook.save(file_path)
+    return str(file_path)
+
+@pytest.fixture
+def multi_sheet_workbook(tmp_path):
+    """สร้างไฟล์ Excel หลาย sheet ที่มีเซลล์ว่างและสไตล์ต่างกัน"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for idx in range(4):
+        sheet = workbook.create_sheet(f"สาขา{idx}")
+        sheet.append(["ชื่อ-นามสกุล", "สินค้า", "จำนวน"])
+        sheet["A1"].font = Font(bold=True)
+        for row in range(idx + 2):
+            sheet.append([f"นาย ลูกค้า{row} สาขา{idx}", f"สินค้า{row}", row * idx])
+        sheet.cell(row=idx + 5, column=5, value="หมายเหตุ")  # แถวที่มีเซลล์ว่างนำหน้า
+    file_path = tmp_path / "branches.xlsx"
+    workbook.save(file_path)
+    return str(file_path)
+
+@pytest.fixture
+def engine(tmp_path):
+    """สร้างฐานข้อมูล SQLite ชั่วคราวสำหรับแต่ละการทดสอบ"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'excel_data.db'}")
+    yield engine
+    engine.dispose()
+
+def count_rows(processor, table):
+    with processor.engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+def test_save_to_database_in_chunks(customer_workbook, engine):
+    """ทดสอบการบันทึกแบบ executemany ทีละชุด"""
+    processor = ExcelProcessor(customer_workbook, chunk_size=2, engine=engine)
+    processed = processor.separate_structure_and_content(processor.read_excel_content())
+    stats = processor.save_to_database(processed)
+
+    content_rows = count_rows(processor, processor.content_table)
+    structure_rows = count_rows(processor, processor.structure_table)
+    assert structure_rows == 4
+    assert content_rows == 3 * (3 + 2)  # ชื่อแยกเป็น 3 ฟิลด์ + อีก 2 คอลัมน์
+    assert stats["rows"] == content_rows + structure_rows
+    assert stats["rows_per_sec"] > 0
+    assert processor.last_ingest_stats == stats
+
+def test_invalid_chunk_size(customer_workbook):
+    """ทดสอบการกำหนดขนาดชุดที่ไม่ถูกต้อง"""
+    with pytest.raises(ValueError):
+        ExcelProcessor(customer_workbook, chunk_size=0)
+
+def test_streaming_matches_eager(customer_workbook, engine):
+    """ทดสอบว่าโหมด streaming บันทึกข้อมูลเท่ากับโหมดปกติ"""
+    eager = ExcelProcessor(customer_workbook, engine=engine)
+    processed = eager.separate_structure_and_content(eager.read_excel_content())
+
+    streaming = ExcelProcessor(customer_workbook, chunk_size=2, streaming=True, engine=engine)
+    summary = streaming.process_file()
+
+    assert summary == {"ลูกค้า": {"content_rows": 3, "structure_rows": 4}}
+    assert streaming.last_ingest_stats["rows"] == 3 * 5 + 4
+    with streaming.engine.connect() as conn:
+        stored = conn.execute(select(streaming.content_table.c.column_name,
+                                     streaming.content_table.c.cell_value)).fetchall()
+    expected = list(eager._iter_content_rows("ลูกค้า", processed["ลูกค้า"]["content"]))
+    assert sorted(stored) == sorted((r["column_name"], r["cell_value"]) for r in expected)
+
+def test_values_only_reading(customer_workbook):
+    """ทดสอบการอ่านเฉพาะค่าโดยไม่อ่านการจัดรูปแบบ"""
+    processor = ExcelProcessor(customer_workbook, streaming=True, include_formatting=False)
+    rows = list(processor.iter_sheet_rows("ลูกค้า"))
+    assert len(rows) == 4
+    row_data, _ = rows[1]
+    assert row_data[0]["first_name"] == "ราตรี"
+    assert all(formatting == [] for _, formatting in rows)
+
+def test_styles_are_interned(customer_workbook, engine):
+    """ทดสอบว่าสไตล์ที่ซ้ำกันถูกเก็บในตาราง Style เพียงครั้งเดียว"""
+    processor = ExcelProcessor(customer_workbook, engine=engine)
+    processor.process_file()
+    processor.process_file()  # ไฟล์เดิมต้องไม่สร้างสไตล์ใหม่
+
+    with processor.engine.connect() as conn:
+        styles = conn.execute(select(processor.style_table)).fetchall()
+        structure = conn.execute(select(processor.structure_table.c.formatting,
+                                        processor.structure_table.c.style_ids)).fetchall()
+    assert len(styles) == 1
+    style_id = styles[0].style_id
+    assert all(formatting is None for formatting, _ in structure)
+    assert all(style_ids == [style_id] * 3 for _, style_ids in structure)
+
+def test_formatting_cache_by_style_id(customer_workbook):
+    """ทดสอบว่าเซลล์ที่ใช้สไตล์เดียวกันได้ข้อมูลการจัดรูปแบบชุดเดียวกัน"""
+    processor = ExcelProcessor(customer_workbook)
+    sheet = processor.workbook["ลูกค้า"]
+    assert processor.get_cell_formatting(sheet["A1"]) is processor.get_cell_formatting(sheet["B2"])
+
+def test_name_columns_detected_once():
+    """ทดสอบการหาคอลัมน์ชื่อลูกค้าจากหัวคอลัมน์และตัวอย่างข้อมูล"""
+    parser = NameColumnParser()
+    headers = ["ผู้ติดต่อ", "ชื่อ-นามสกุล", "ยอดซื้อ", "หมายเหตุ"]
+    rows = [
+        ["นาย สมชาย ใจดี", "นางสาว ราตรี สกุลวงษ์", "1200", "นาย ก ข"],
+        ["นาง สมศรี มีสุข", "ไม่ระบุ", "850", "ส่งด่วน"],
+        ["นาย สมปอง ดีใจ", "", "430", "โทรก่อนส่ง"],
+    ]
+    assert parser.detect_columns(headers, rows) == [0, 1]
+
+    parser.parse_rows(rows, [0, 1])
+    assert rows[0][1] == {"title": "นางสาว", "first_name": "ราตรี", "last_name": "สกุลวงษ์"}
+    assert rows[1][0]["title"] == "นาง"
+    assert rows[1][1] == "ไม่ระบุ"
+    assert rows[0][3] == "นาย ก ข"  # คอลัมน์ที่ไม่ใช่ชื่อไม่ถูกแยก
+
+def test_name_parsing_matches_per_cell(customer_workbook):
+    """ทดสอบว่าการแยกทั้งคอลัมน์ได้ผลเท่ากับการแยกทีละเซลล์"""
+    processor = ExcelProcessor(customer_workbook)
+    data = processor.read_excel_content()["ลูกค้า"]["data"]
+    raw_rows = [row for row, _ in processor._iter_raw_rows("ลูกค้า")]
+    for row, raw_row in zip(data[1:], raw_rows[1:]):
+        assert row == [processor.extract_customer_info(value) or value for value in raw_row]
+
+def test_parallel_sheets_match_serial(multi_sheet_workbook, engine):
+    """ทดสอบว่าการประมวลผลหลาย process ได้ผลลัพธ์และลำดับเดียวกับการประมวลผลทีละ sheet"""
+    serial = ExcelProcessor(multi_sheet_workbook)
+    expected = serial.separate_structure_and_content(serial.read_excel_content())
+
+    parallel = ExcelProcessor(multi_sheet_workbook, workers=2, engine=engine)
+    result = parallel.process_file()
+
+    assert list(result) == ["สาขา0", "สาขา1", "สาขา2", "สาขา3"]
+    assert result == expected
+
+def test_repeat_upload_served_from_cache(customer_workbook, engine, tmp_path):
+    """ทดสอบว่าไฟล์เดิมได้ผลจากแคชโดยไม่บันทึกลงฐานข้อมูลซ้ำ"""
+    cache = ResultCache(tmp_path / "cache")
+    first = ExcelProcessor(customer_workbook, cache=cache, engine=engine)
+    result = first.process_file()
+    rows_after_first = count_rows(first, first.structure_table)
+
+    second = ExcelProcessor(customer_workbook, cache=cache, engine=engine)
+    assert second.process_file() == result
+    assert second._workbook is None  # ไม่ได้เปิดไฟล์
+    assert count_rows(second, second.structure_table) == rows_after_first
+
+def test_renamed_upload_stored_under_new_name(customer_workbook, engine, tmp_path):
+    """ทดสอบว่าไฟล์เดิมที่อัปโหลดในชื่อใหม่ไม่ใช้แคช และถูกบันทึกด้วย source_name ใหม่"""
+    cache = ResultCache(tmp_path / "cache")
+    first = ExcelProcessor(customer_workbook, cache=cache, engine=engine, source_name="ลูกค้า_มกราคม")
+    result = first.process_file()
+
+    renamed = ExcelProcessor(customer_workbook, cache=cache, engine=engine, source_name="ลูกค้า_สำเนา")
+    assert renamed.cached_result() is None
+    assert renamed.process_file() == result
+    with renamed.engine.connect() as conn:
+        names = conn.execute(select(renamed.structure_table.c.source_name).distinct()).scalars().all()
+    assert sorted(names) == ["ลูกค้า_มกราคม", "ลูกค้า_สำเนา"]
+
+def test_cache_separates_parse_options(customer_workbook, tmp_path):
+    """ทดสอบว่าผลที่อ่านโดยไม่มีการจัดรูปแบบไม่ถูกส่งให้ผู้ที่ต้องการการจัดรูปแบบ"""
+    cache = ResultCache(tmp_path / "cache")
+    plain = ExcelProcessor(customer_workbook, cache=cache, include_formatting=False)
+    cache.put(plain._cache_key("eav"), plain.parse())
+
+    formatted = ExcelProcessor(customer_workbook, cache=cache)
+    assert formatted.cached_result() is None
+    assert ExcelProcessor(customer_workbook, cache=cache, include_formatting=False).cached_result() is not None
+
+def test_schema_created_once_per_engine(customer_workbook, engine, monkeypatch):
+    """ทดสอบว่า processor ที่ใช้ engine ร่วมกันไม่สร้างตารางซ้ำ"""
+    ExcelProcessor(customer_workbook, engine=engine).engine
+    calls = []
+    monkeypatch.setattr(main.metadata, "create_all", lambda *args, **kwargs: calls.append(args))
+    for _ in range(3):
+        assert ExcelProcessor(customer_workbook, engine=engine).engine is engine
+    assert calls == []
+
+def test_shared_engine_registry():
+    """ทดสอบว่า URL เดียวกันได้ engine ตัวเดียวกัน"""
+    url = "sqlite:///shared-registry-test.db"
+    assert get_engine(url) is get_engine(url)
+
+def test_wide_storage_backend(customer_workbook, engine):
+    """ทดสอบการบันทึกแบบ wide หนึ่งแถวต่อแถวข้อมูลพร้อมชนิดข้อมูล"""
+    processor = ExcelProcessor(customer_workbook, engine=engine, storage_backend="wide")
+    result = processor.process_file()
+    processor.process_file()  # บันทึกซ้ำต้องแทนที่ข้อมูลเดิม
+
+    frame = processor.load_sheet("ลูกค้า")
+    assert list(frame["row_index"]) == [0, 1, 2]
+    assert list(frame["first_name"]) == ["ราตรี", "สมชาย", "สมศรี"]
+    assert frame["ยอดซื้อ"].tolist() == [1200, 850, 430]
+    assert count_rows(processor, processor.content_table) == 0
+    assert count_rows(processor, processor.structure_table) == 2 * len(result["ลูกค้า"]["structure"])
+    with processor.engine.connect() as conn:
+        registry = conn.execute(select(processor.content_table_registry)).fetchall()
+    assert [(r.sheet_name, r.row_count) for r in registry] == [("ลูกค้า", 3)]
+
+def test_parquet_storage_backend(customer_workbook, engine, tmp_path):
+    """ทดสอบการบันทึกข้อมูลเนื้อหาเป็นไฟล์ Parquet ต่อ sheet"""
+    processor = ExcelProcessor(customer_workbook, engine=engine, parquet_dir=str(tmp_path / "parquet"))
+    processed = processor.separate_structure_and_content(processor.read_excel_content())
+    processor.save_to_database(processed, storage_backend="parquet")
+
+    assert processor.parquet_path("ลูกค้า").exists()
+    frame = processor.load_sheet("ลูกค้า", storage_backend="parquet")
+    records = frame.drop(columns="row_index").astype(str).to_dict("records")
+    assert records == processed["ลูกค้า"]["content"]
+
+def test_invalid_storage_backend(customer_workbook):
+    """ทดสอบการเลือกรูปแบบการเก็บข้อมูลที่ไม่รองรับ"""
+    with pytest.raises(ValueError):
+        ExcelProcessor(customer_workbook, storage_backend="csv")
+    with pytest.raises(ValueError):
+        ExcelProcessor(customer_workbook, streaming=True, storage_backend="wide")
+
+def write_orders(path, rows=120, edits=None, extra_sheet=True):
+    """สร้างไฟล์คำสั่งซื้อ โดยแก้ค่าบางแถวตาม edits {ลำดับแถว: ค่าใหม่}"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "คำสั่งซื้อ"
+    sheet.append(["ชื่อ-นามสกุล", "สินค้า", "จำนวน"])
+    for row in range(rows):
+        sheet.append([f"นาย ลูกค้า{row} ทดสอบ", (edits or {}).get(row, f"สินค้า{row}"), row])
+    if extra_sheet:
+        workbook.create_sheet("สรุป").append(["ยอดรวม", rows])
+    workbook.save(path)
+    return str(path)
+
+def stored_rows(processor, source_name):
+    with processor.engine.connect() as conn:
+        content = processor.content_table
+        structure = processor.structure_table
+        cells = conn.execute(select(content.c.sheet_name, content.c.row_number,
+                                    content.c.column_name, content.c.cell_value)
+                             .where(content.c.source_name == source_name)).fetchall()
+        rows = conn.execute(select(structure.c.sheet_name, structure.c.row_number)
+                            .where(structure.c.source_name == source_name)).fetchall()
+    return sorted(cells), sorted(rows)
+
+def test_incremental_skips_unchanged_blocks(tmp_path, engine):
+    """ทดสอบว่าการประมวลผลซ้ำบันทึกใหม่เฉพาะ block ที่เปลี่ยน"""
+    path = tmp_path / "orders.xlsx"
+    options = {"chunk_size": 50, "incremental": True, "engine": engine, "source_name": "orders"}
+    first = ExcelProcessor(write_orders(path), **options).process_file()
+    assert first["คำสั่งซื้อ"]["status"] == "new"
+    assert first["คำสั่งซื้อ"]["blocks"] == 3
+
+    again = ExcelProcessor(str(path), **options)
+    summary = again.process_file()
+    assert {report["status"] for report in summary.values()} == {"unchanged"}
+    assert again.last_ingest_stats["rows"] == 0
+
+    edited = ExcelProcessor(write_orders(path, edits={60: "สินค้าใหม่"}), **options)
+    summary = edited.process_file()
+    assert summary["คำสั่งซื้อ"]["status"] == "updated"
+    assert summary["คำสั่งซื้อ"]["blocks_skipped"] == 2
+    assert summary["คำสั่งซื้อ"]["content_rows"] == 50
+    assert summary["สรุป"]["status"] == "unchanged"
+
+    # ผลลัพธ์ต้องเท่ากับการประมวลผลไฟล์ที่แก้ไขแล้วตั้งแต่ต้น
+    fresh = ExcelProcessor(str(path), **dict(options, source_name="fresh"))
+    fresh.process_file()
+    assert stored_rows(edited, "orders") == stored_rows(fresh, "fresh")
+
+def test_incremental_removes_deleted_rows_and_sheets(tmp_path, engine):
+    """ทดสอบการลบแถวท้าย sheet และ sheet ที่หายไปจากไฟล์"""
+    path = tmp_path / "orders.xlsx"
+    options = {"chunk_size": 50, "incremental": True, "engine": engine}
+    ExcelProcessor(write_orders(path), **options).process_file()
+
+    processor = ExcelProcessor(write_orders(path, rows=70, extra_sheet=False), **options)
+    summary = processor.process_file()
+    assert summary["สรุป"]["status"] == "removed"
+    assert summary["คำสั่งซื้อ"]["blocks"] == 2
+    cells, rows = stored_rows(processor, "orders")
+    assert len(rows) == 71
+    assert max(row_number for _, row_number in rows) == 70
+    assert {sheet for sheet, *_ in cells} == {"คำสั่งซื้อ"}
+
+def test_wide_storage_keeps_text_columns(tmp_path, engine):
+    """ทดสอบว่าคอลัมน์ข้อความที่ขึ้นต้นด้วย 0 ไม่ถูกแปลงเป็นตัวเลขเมื่อบันทึกแบบ wide และ Parquet"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "ติดต่อ"
+    sheet.append(["จังหวัด", "เบอร์โทร", "รหัสไปรษณีย์", "ยอดซื้อ"])
+    sheet.append(["กรุงเทพฯ", "0800000000", "01000", 1200])
+    sheet.append(["เชียงใหม่", "0891234567", "50000", 850.5])
+    file_path = tmp_path / "contacts.xlsx"
+    workbook.save(file_path)
+
+    processor = ExcelProcessor(str(file_path), engine=engine, parquet_dir=str(tmp_path / "parquet"))
+    # ผลจาก read_excel_content และจาก process_sheet (เส้นทางของ process pool)
+    for processed in (processor.parse(), {"ติดต่อ": processor.process_sheet("ติดต่อ")}):
+        for storage_backend in ("wide", "parquet"):
+            processor.save_to_database(processed, storage_backend=storage_backend)
+            frame = processor.load_sheet("ติดต่อ", storage_backend=storage_backend)
+            assert frame["เบอร์โทร"].tolist() == ["0800000000", "0891234567"]
+            assert frame["รหัสไปรษณีย์"].tolist() == ["01000", "50000"]
+            assert frame["ยอดซื้อ"].tolist() == [1200, 850.5]
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.profiling import profile_dataframe
+
+@pytest.fixture
+def sales_frame():
+    """สร้างข้อมูลยอดขายที่มีค่าว่าง แถวซ้ำ และชนิดข้อมูลหลายแบบ"""
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame({
+        "รหัส": np.arange(200),
+        "จำนวน": rng.integers(0, 50, 200),
+        "ราคา": rng.normal(1000, 250, 200),
+        "ส่วนลด": np.where(rng.random(200) < 0.2, np.nan, rng.random(200)),
+        "จังหวัด": rng.choice(["กรุงเทพฯ", "เชียงใหม่", "ขอนแก่น", None], 200),
+        "ว่าง": np.full(200, np.nan),
+        "วันที่": pd.date_range("2024-01-01", periods=200, freq="D")
+    })
+    return pd.concat([frame, frame.iloc[:5]], ignore_index=True)
+
+@pytest.fixture
+def processor(sales_frame, tmp_path):
+    """สร้าง ExcelProcessor จากไฟล์ Excel ของข้อมูลยอดขาย"""
+    file_path = tmp_path / "sales.xlsx"
+    sales_frame.to_excel(file_path, index=False)
+    processor = ExcelProcessor(file_path)
+    processor.load_file()
+    return processor
+
+def test_profile_matches_pandas(sales_frame):
+    """ทดสอบว่าสถิติจาก profile เท่ากับการคำนวณทีละคอลัมน์ด้วย pandas"""
+    profile = profile_dataframe(sales_frame)
+    assert profile.null_counts.equals(sales_frame.isnull().sum())
+    assert profile.duplicate_count == sales_frame.duplicated().sum()
+
+    for column in sales_frame.select_dtypes(include=[np.number]).columns:
+        series = sales_frame[column]
+        stats = profile.numeric[column]
+        assert stats["count"] == series.count()
+        for name in ("mean", "std", "min", "max"):
+            expected = getattr(series, name)()
+            assert stats[name] == pytest.approx(expected, rel=1e-12, nan_ok=True)
+        if series.count():
+            assert type(stats["min"]) is type(series.min())
+        assert profile.distinct_counts[column] == series.nunique()
+
+    counts = sales_frame["จังหวัด"].value_counts()
+    assert profile.value_counts["จังหวัด"].equals(counts)
+    assert profile.top_values("จังหวัด", 2) == counts.head(2).to_dict()
+
+def test_methods_share_profile(processor, monkeypatch):
+    """ทดสอบว่า validate_data, _calculate_statistics และ analyze_data ใช้ profile เดียวกัน"""
+    import excel_processor.processor as processor_module
+    calls = []
+    original = processor_module.profile_dataframe
+    monkeypatch.setattr(processor_module, "profile_dataframe",
+                        lambda df: calls.append(df) or original(df))
+
+    df = processor.df
+    validation = processor.validate_data()
+    statistics = processor._calculate_statistics()
+    analysis = processor.analyze_data()
+    assert len(calls) == 1
+
+    assert validation["warnings"][0] == {
+        "type": "null_values",
+        "columns": df.isnull().sum()[df.isnull().sum() > 0].to_dict()
+    }
+    assert validation["warnings"][1] == {"type": "duplicates", "count": df.duplicated().sum()}
+    assert statistics["numeric_columns"]["จำนวน"]["max"] == df["จำนวน"].max()
+    assert statistics["numeric_columns"]["ราคา"]["std"] == pytest.approx(df["ราคา"].std(), rel=1e-12)
+    assert analysis["numeric_stats"]["ส่วนลด"]["count"] == df["ส่วนลด"].count()
+    assert analysis["numeric_stats"]["ว่าง"] == {"count": 0, "mean": 0, "std": 0, "min": 0, "max": 0}
+    assert analysis["groupby_results"]["จังหวัด"] == df["จังหวัด"].value_counts().to_dict()
+
+def test_profile_refreshed_after_clean(processor):
+    """ทดสอบว่า profile ถูกคำนวณใหม่หลังทำความสะอาดข้อมูล"""
+    assert processor.profile.duplicate_count == 5
+    processor.clean_data()
+    assert processor.profile.duplicate_count == 0
+    assert processor.profile.row_count == len(processor.df)
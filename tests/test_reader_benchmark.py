@@ -0,0 +1,103 @@
+import time
+import pytest
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from excel_processor.processor import ExcelProcessor
+from excel_processor.readers import available_engines, read_excel, select_engine
+
+SAMPLE_WORKBOOK = Path(__file__).parent / "data" / "test_invoice.xlsx"
+ROUNDS = 3
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+@pytest.fixture(scope="module")
+def large_workbook(tmp_path_factory):
+    """สร้างไฟล์ Excel ขนาดใหญ่ที่มีตัวเลข ข้อความ วันที่ และค่าว่าง"""
+    rng = np.random.default_rng(5)
+    rows = 20000
+    frame = pd.DataFrame({
+        "รหัส": np.arange(rows),
+        "จำนวน": rng.integers(0, 100, rows),
+        "ราคา": rng.normal(1000, 250, rows).round(2),
+        "ส่วนลด": np.where(rng.random(rows) < 0.1, np.nan, rng.random(rows)),
+        "ลูกค้า": [f"ลูกค้า{n % 500}" for n in range(rows)],
+        "จังหวัด": rng.choice(["กรุงเทพฯ", "เชียงใหม่", "ขอนแก่น", None], rows),
+        "วันที่": pd.date_range("2024-01-01", periods=rows, freq="h")
+    })
+    file_path = tmp_path_factory.mktemp("readers") / "large.xlsx"
+    frame.to_excel(file_path, index=False)
+    return file_path
+
+def _memory_kb(field):
+    """อ่านค่าหน่วยความจำ (KB) ของ process จาก /proc/self/status เช่น VmRSS, VmHWM"""
+    for line in PROC_STATUS.read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+
+def _parse_worker(file_path, engine):
+    """อ่านไฟล์ทุก sheet ใน process ใหม่ แล้วคืนเวลาที่ใช้และ peak RSS ที่เกินจาก RSS ก่อนอ่าน (KB)"""
+    select_engine(engine)
+    __import__("python_calamine" if engine == "calamine" else engine)  # ไม่นับหน่วยความจำตอน import
+    PROC_CLEAR_REFS.write_text("5")  # รีเซ็ต peak RSS (VmHWM) ให้เท่ากับ RSS ปัจจุบัน
+    baseline = _memory_kb("VmRSS")
+    start = time.perf_counter()
+    read_excel(file_path, sheet_name=None, engine=engine)
+    elapsed = time.perf_counter() - start
+    return elapsed, _memory_kb("VmHWM") - baseline
+
+def run_reader_benchmark(file_path, engines):
+    """วัดเวลาอ่านและ peak RSS ของแต่ละตัวอ่าน (process ใหม่ทุกรอบเพื่อไม่ให้ peak RSS ปนกัน)"""
+    results = {}
+    for engine in engines:
+        runs = []
+        for _ in range(ROUNDS):
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                runs.append(executor.submit(_parse_worker, str(file_path), engine).result())
+        results[engine] = {
+            "seconds": min(seconds for seconds, _ in runs),
+            "peak_rss_mb": max(rss for _, rss in runs) / 1024
+        }
+    return results
+
+@pytest.mark.parametrize("workbook", ["sample", "large"])
+def test_engines_read_identical_frames(workbook, large_workbook):
+    """ทดสอบว่าทุกตัวอ่านที่ติดตั้งไว้ได้ DataFrame เดียวกับ openpyxl"""
+    file_path = SAMPLE_WORKBOOK if workbook == "sample" else large_workbook
+    expected = read_excel(file_path, sheet_name=None, engine="openpyxl")
+    for engine in available_engines():
+        if engine == "xlrd":
+            continue  # xlrd อ่านได้เฉพาะไฟล์ .xls
+        frames = read_excel(file_path, sheet_name=None, engine=engine)
+        assert list(frames) == list(expected)
+        for sheet_name, frame in expected.items():
+            pd.testing.assert_frame_equal(frames[sheet_name], frame)
+
+def test_select_engine():
+    """ทดสอบการเลือกตัวอ่านอัตโนมัติและการระบุตัวอ่านที่ไม่รองรับ"""
+    expected = "calamine" if "calamine" in available_engines() else "openpyxl"
+    assert select_engine("auto", "invoice.xlsx") == expected
+    assert select_engine("openpyxl") == "openpyxl"
+    with pytest.raises(ValueError):
+        select_engine("turbo")
+    with pytest.raises(ValueError):
+        ExcelProcessor(SAMPLE_WORKBOOK, reader_engine="turbo")
+    # ตรวจไฟล์ก่อนเลือกตัวอ่าน ข้อผิดพลาดของไฟล์จึงไม่ถูกบังด้วยข้อผิดพลาดของตัวอ่าน
+    with pytest.raises(FileNotFoundError):
+        ExcelProcessor("missing.xlsx", reader_engine="turbo")
+
+@pytest.mark.performance
+@pytest.mark.skipif(not PROC_CLEAR_REFS.exists(), reason="วัด peak RSS ผ่าน /proc ได้เฉพาะบน Linux")
+@pytest.mark.parametrize("workbook", ["sample", "large"])
+def test_reader_engine_benchmark(workbook, large_workbook):
+    """เปรียบเทียบเวลาอ่านและ peak RSS ของตัวอ่านแต่ละแบบบนไฟล์ตัวอย่าง"""
+    file_path = SAMPLE_WORKBOOK if workbook == "sample" else large_workbook
+    engines = [engine for engine in available_engines() if engine != "xlrd"]
+    results = run_reader_benchmark(file_path, engines)
+    for engine, result in results.items():
+        print(f"{workbook} {engine}: {result['seconds']:.3f} s, peak RSS +{result['peak_rss_mb']:.1f} MB")
+
+    if "calamine" in results and workbook == "large":
+        assert results["calamine"]["seconds"] < results["openpyxl"]["seconds"]
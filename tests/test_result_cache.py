@@ -0,0 +1,47 @@
+import os
+import time
+import pytest
+from main import PROCESSOR_VERSION
+from result_cache import ResultCache, file_hash
+
+@pytest.fixture
+def cache(tmp_path):
+    """สร้างแคชในโฟลเดอร์ชั่วคราว"""
+    return ResultCache(tmp_path / "cache", max_bytes=10_000)
+
+def test_put_and_get(cache):
+    """ทดสอบการบันทึกและดึงผลลัพธ์จากแคช"""
+    result = {"ลูกค้า": {"content": [{"จังหวัด": "กรุงเทพฯ"}], "structure": []}}
+    cache.put("abc", result)
+    assert cache.get("abc") == result
+    assert cache.get("missing") is None
+
+def test_version_is_part_of_key(tmp_path):
+    """ทดสอบว่าผลลัพธ์ต่างเวอร์ชันไม่ใช้ร่วมกัน"""
+    ResultCache(tmp_path, version="1.0.0").put("abc", {"a": 1})
+    assert ResultCache(tmp_path, version="1.1.0").get("abc") is None
+    assert ResultCache(tmp_path).version == PROCESSOR_VERSION
+
+def test_lru_eviction(tmp_path):
+    """ทดสอบการลบรายการที่ไม่ได้ใช้นานที่สุดเมื่อเกินขนาด"""
+    cache = ResultCache(tmp_path, max_bytes=250)
+    payload = {"data": "x" * 100}
+    cache.put("first", payload)
+    cache.put("second", payload)
+    past = time.time() - 60
+    os.utime(cache._entry_path("first"), (past, past))
+    os.utime(cache._entry_path("second"), (past - 60, past - 60))
+    cache.get("second")  # ใช้งานล่าสุด
+
+    cache.put("third", payload)
+    assert cache.get("first") is None
+    assert cache.get("second") == payload
+    assert cache.stats()["bytes"] <= 250
+
+def test_file_hash(tmp_path):
+    """ทดสอบการคำนวณ hash จากเนื้อหาไฟล์"""
+    first = tmp_path / "a.xlsx"
+    second = tmp_path / "b.xlsx"
+    first.write_bytes(b"same content")
+    second.write_bytes(b"same content")
+    assert file_hash(first) == file_hash(second)
@@ -0,0 +1,63 @@
+import json
+from datetime import datetime
+import pytest
+from openpyxl import Workbook
+from main import ExcelProcessor
+from result_stream import iter_ndjson, select_result
+
+@pytest.fixture
+def processed(tmp_path):
+    """สร้างผลการประมวลผลของไฟล์สอง sheet"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for idx, rows in enumerate((5, 2)):
+        sheet = workbook.create_sheet(f"สาขา{idx}")
+        sheet.append(["ชื่อ-นามสกุล", "ยอดซื้อ", "วันที่"])
+        for row in range(rows):
+            sheet.append([f"นาย ลูกค้า{row} สาขา{idx}", row * 100, datetime(2024, 1, row + 1)])
+    file_path = tmp_path / "branches.xlsx"
+    workbook.save(file_path)
+    return ExcelProcessor(str(file_path)).parse()
+
+def test_select_without_structure_and_paginate(processed):
+    """ทดสอบการตัด structure และการแบ่งหน้า content โดยไม่แก้ไขผลลัพธ์เดิม"""
+    selected = select_result(processed, include_structure=False, offset=1, limit=3)
+    assert "structure" not in selected["สาขา0"]
+    assert selected["สาขา0"]["content"] == processed["สาขา0"]["content"][1:4]
+    assert selected["สาขา0"]["total_rows"] == 5
+    assert selected["สาขา1"]["content"] == processed["สาขา1"]["content"][1:]
+    assert "structure" in processed["สาขา0"]
+
+    assert select_result(processed) == processed
+    with pytest.raises(ValueError):
+        select_result(processed, limit=0)
+
+def test_ndjson_lines(processed):
+    """ทดสอบว่า NDJSON มีหนึ่งบรรทัดต่อแถวและประกอบกลับเป็นผลลัพธ์เดิมได้"""
+    records = [json.loads(line) for line in iter_ndjson(processed)]
+    assert records[0] == {"type": "sheet", "sheet": "สาขา0", "total_rows": 5, "offset": 0, "count": 5}
+    assert records[-1] == {"type": "end", "sheets": 2}
+
+    rebuilt = {}
+    for record in records:
+        if record["type"] == "sheet":
+            rebuilt[record["sheet"]] = {"content": [], "structure": []}
+        elif record["type"] == "row":
+            rebuilt[record["sheet"]]["content"].append(record["content"])
+        elif record["type"] == "structure":
+            rebuilt[record["sheet"]]["structure"].append(record["row"])
+    assert rebuilt == json.loads(json.dumps(processed, ensure_ascii=False, default=str))
+
+def test_ndjson_page_without_structure(processed):
+    """ทดสอบการแบ่งหน้าและการไม่ส่ง structure ในโหมด stream"""
+    records = [json.loads(line) for line in iter_ndjson(processed, False, offset=4, limit=2)]
+    assert [record["type"] for record in records] == ["sheet", "row", "sheet", "end"]
+    assert records[1]["index"] == 4
+    assert records[2]["count"] == 0
+
+def test_incremental_summary_passthrough():
+    """ทดสอบว่าสรุปผลของโหมด incremental ถูกส่งต่อโดยไม่แบ่งหน้า"""
+    summary = {"ลูกค้า": {"status": "unchanged", "structure_rows": 3}}
+    assert select_result(summary, include_structure=False, limit=1) == summary
+    records = [json.loads(line) for line in iter_ndjson(summary)]
+    assert records[0] == {"type": "sheet", "sheet": "ลูกค้า", "summary": summary["ลูกค้า"]}
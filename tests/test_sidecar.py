@@ -0,0 +1,104 @@
+import os
+import pandas as pd
+import pytest
+import excel_processor.sidecar as sidecar_module
+from excel_processor.processor import ExcelProcessor
+from excel_processor.readers import read_excel
+from excel_processor.sidecar import SidecarCache
+
+SAMPLE_WORKBOOK = os.path.join(os.path.dirname(__file__), "data", "test_invoice.xlsx")
+
+@pytest.fixture
+def cache(tmp_path):
+    return SidecarCache(tmp_path / "sidecar")
+
+@pytest.fixture
+def orders_file(tmp_path):
+    """สร้างไฟล์ Excel คำสั่งซื้อ"""
+    file_path = tmp_path / "orders.xlsx"
+    pd.DataFrame({
+        "เลขที่": [1, 2, 3],
+        "ลูกค้า": ["ก", None, "ค"],
+        "ยอดเงิน": [10.5, None, 30.0],
+        "วันที่": pd.date_range("2024-01-01", periods=3)
+    }).to_excel(file_path, index=False)
+    return file_path
+
+def test_sidecar_matches_excel(cache):
+    """ทดสอบว่า DataFrame จาก sidecar ตรงกับการอ่านไฟล์ Excel ทุก sheet"""
+    for sheet in range(3):
+        cache.read_excel(SAMPLE_WORKBOOK, sheet)
+        pd.testing.assert_frame_equal(cache.read_excel(SAMPLE_WORKBOOK, sheet),
+                                      read_excel(SAMPLE_WORKBOOK, sheet_name=sheet))
+    assert (cache.hits, cache.misses) == (3, 3)
+
+def test_repeated_reads_skip_parsing(cache, orders_file, monkeypatch):
+    """ทดสอบว่าการอ่านครั้งต่อไปไม่ parse ไฟล์ xlsx อีก"""
+    first = cache.read_excel(orders_file)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ไม่ควร parse ไฟล์ xlsx ซ้ำ")
+    monkeypatch.setattr(sidecar_module, "read_excel", fail)
+
+    second = cache.read_excel(orders_file)
+    pd.testing.assert_frame_equal(second, first)
+
+def test_modified_file_reconverted(cache, orders_file):
+    """ทดสอบว่าไฟล์ที่ถูกแก้ไขถูกแปลงใหม่และ sidecar เก่าถูกลบ"""
+    cache.read_excel(orders_file)
+    old_path = cache.sidecar_path(orders_file)
+
+    pd.DataFrame({"เลขที่": [7]}).to_excel(orders_file, index=False)
+    os.utime(orders_file, ns=(0, os.stat(orders_file).st_mtime_ns + 1_000_000))
+    assert cache.read_excel(orders_file)["เลขที่"].tolist() == [7]
+    assert cache.misses == 2
+    assert not old_path.exists()
+    assert list(cache.cache_dir.glob("*.arrow")) == [cache.sidecar_path(orders_file)]
+
+def test_unconvertible_sheet_not_cached(cache, tmp_path):
+    """ทดสอบว่า sheet ที่ Arrow แปลงไม่ได้ยังอ่านได้ แต่ไม่ถูกแคช"""
+    file_path = tmp_path / "mixed.xlsx"
+    pd.DataFrame({"รหัส": [1, "A2", 3.5]}).to_excel(file_path, index=False)
+    assert cache.read_excel(file_path)["รหัส"].tolist() == [1, "A2", 3.5]
+    assert not cache.sidecar_path(file_path).exists()
+
+def test_numeric_header_round_trip(cache, tmp_path):
+    """ทดสอบว่าหัวคอลัมน์ที่เป็นตัวเลขได้ชนิดเดิมทั้งตอนแปลงครั้งแรกและตอนอ่านจาก sidecar"""
+    file_path = tmp_path / "yearly.xlsx"
+    pd.DataFrame({"สาขา": ["ก", "ข"], 2024: [10, 20], 2024.5: [1.5, 2.5]}).to_excel(file_path, index=False)
+    first = cache.read_excel(file_path)
+    second = cache.read_excel(file_path)
+    assert cache.hits == 1
+    assert list(second.columns) == list(first.columns) == ["สาขา", 2024, 2024.5]
+    assert second[2024].tolist() == [10, 20]
+    pd.testing.assert_frame_equal(second, first)
+
+def test_processor_uses_sidecar(cache, orders_file):
+    """ทดสอบว่า ExcelProcessor หลายตัวใช้ sidecar เดียวกัน"""
+    for _ in range(2):
+        processor = ExcelProcessor(orders_file, sidecar=cache)
+        processor.load_file()
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert processor.validate_data()["is_valid"]
+
+def test_sidecar_columns_are_zero_copy(cache, orders_file):
+    """ทดสอบว่าคอลัมน์ตัวเลขที่ไม่มีค่าว่างอ้างถึงไฟล์ที่ memory-map ไว้โดยไม่คัดลอก"""
+    cache.read_excel(orders_file)
+    df = cache.read_excel(orders_file)
+    assert not df["เลขที่"].to_numpy().flags.writeable
+    assert df["ยอดเงิน"].to_numpy().flags.writeable  # มีค่าว่าง จึงเป็นสำเนา
+    with pytest.raises(ValueError):
+        df.loc[0, "เลขที่"] = 99
+    df["เลขที่"] = df["เลขที่"] + 1  # แทนที่ทั้งคอลัมน์ได้ตามปกติ
+    df.loc[0, "ยอดเงิน"] = 99.0
+    reread = cache.read_excel(orders_file)
+    assert reread["เลขที่"].tolist() == [1, 2, 3] and reread.loc[0, "ยอดเงิน"] == 10.5
+
+def test_failed_write_leaves_no_temp_file(cache, orders_file, monkeypatch):
+    """ทดสอบว่าการเขียน sidecar ที่ล้มเหลวไม่ทิ้งไฟล์ชั่วคราวหรือ sidecar ที่ไม่สมบูรณ์"""
+    def fail(*args, **kwargs):
+        raise OSError("ดิสก์เต็ม")
+    monkeypatch.setattr(sidecar_module.os, "replace", fail)
+    with pytest.raises(OSError):
+        cache.read_excel(orders_file)
+    assert list(cache.cache_dir.iterdir()) == []
@@ -0,0 +1,96 @@
+import time
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from main import ExcelProcessor, init_database
+from database.engine import get_engine, dispose_engines
+
+WORKERS = 4
+ROUNDS = 5
+
+@pytest.fixture
+def sales_workbook(tmp_path):
+    """สร้างไฟล์ Excel ยอดขายขนาดกลางสำหรับวัดการบันทึกพร้อมกัน"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "ยอดขาย"
+    sheet.append(["ชื่อ-นามสกุล", "สินค้า", "จำนวน"])
+    for row in range(200):
+        sheet.append([f"นาย ลูกค้า{row} ทดสอบ", f"สินค้า{row % 10}", row])
+    file_path = tmp_path / "sales.xlsx"
+    workbook.save(file_path)
+    return str(file_path)
+
+def _ingest_worker(file_path, url, profile):
+    """บันทึกไฟล์เดิมซ้ำหลายรอบ แล้วคืนจำนวนแถวและจำนวนครั้งที่ฐานข้อมูลถูกล็อก"""
+    processor = ExcelProcessor(file_path, engine=get_engine(url, sqlite_profile=profile))
+    processed = processor.separate_structure_and_content(processor.read_excel_content())
+    rows = locked = 0
+    for _ in range(ROUNDS):
+        try:
+            rows += processor.save_to_database(processed)["rows"]
+        except OperationalError as e:
+            if "database is locked" not in str(e):
+                raise
+            locked += 1
+    dispose_engines()
+    return rows, locked
+
+def run_concurrent_ingest(file_path, url, profile):
+    """รัน worker หลาย process เขียนลงไฟล์ SQLite เดียวกัน"""
+    init_database(get_engine(url, sqlite_profile=profile))
+    dispose_engines()  # ไม่ส่ง connection ที่เปิดไว้ต่อให้ process ลูก
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        futures = [executor.submit(_ingest_worker, file_path, url, profile) for _ in range(WORKERS)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    rows = sum(r for r, _ in results)
+    return {
+        "rows": rows,
+        "locked": sum(l for _, l in results),
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed
+    }
+
+def test_performance_profile_pragmas(tmp_path):
+    """ทดสอบว่า engine ของไฟล์ SQLite ได้ค่า PRAGMA ตามชุด performance"""
+    engine = get_engine(f"sqlite:///{tmp_path / 'pragma.db'}", sqlite_profile="performance")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 30000
+    dispose_engines()
+
+def test_unknown_sqlite_profile():
+    """ทดสอบการระบุชุดค่า SQLite ที่ไม่มีอยู่"""
+    with pytest.raises(ValueError):
+        get_engine("sqlite:///unknown-profile.db", sqlite_profile="turbo")
+
+def test_invalid_sqlite_profile_env(monkeypatch, tmp_path):
+    """ทดสอบว่า SQLITE_PROFILE ที่ไม่ถูกต้องแจ้ง ValueError เหมือนกันทั้ง get_engine และ DatabaseManager"""
+    import database.engine
+    from database.manager import DatabaseManager
+    monkeypatch.setattr(database.engine, "DEFAULT_SQLITE_PROFILE", "turbo")
+    with pytest.raises(ValueError):
+        get_engine(f"sqlite:///{tmp_path / 'env-profile.db'}")
+    with pytest.raises(ValueError):
+        DatabaseManager("sqlite").setup_connection({"database": str(tmp_path / "manager.db")})
+
+@pytest.mark.performance
+def test_concurrent_ingest_throughput(sales_workbook, tmp_path):
+    """เปรียบเทียบการบันทึกพร้อมกันหลาย process ระหว่างชุดค่า default และ performance"""
+    results = {}
+    for profile in ("default", "performance"):
+        url = f"sqlite:///{tmp_path / f'{profile}.db'}"
+        results[profile] = run_concurrent_ingest(sales_workbook, url, profile)
+        print(f"{profile}: {results[profile]['rows_per_sec']:.0f} rows/sec, "
+              f"locked={results[profile]['locked']}")
+
+    assert results["performance"]["locked"] == 0
+    rows_per_save = 200 * (3 + 2) + 201  # ชื่อแยกเป็น 3 ฟิลด์ + แถวโครงสร้างรวมหัวตาราง
+    assert results["performance"]["rows"] == WORKERS * ROUNDS * rows_per_save
@@ -0,0 +1,83 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from excel_processor.processor import ExcelProcessor
+from excel_processor.timeseries import choose_frequency, resample_time_series
+
+@pytest.fixture
+def orders_frame():
+    """สร้างคำสั่งซื้อรายชั่วโมงตลอด 90 วัน"""
+    rng = np.random.default_rng(20)
+    rows = 90 * 24
+    amounts = rng.integers(100, 1000, rows).astype(float)
+    amounts[::37] = np.nan
+    return pd.DataFrame({
+        "เวลาสั่งซื้อ": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "จำนวน": rng.integers(1, 10, rows),
+        "ยอดเงิน": amounts
+    })
+
+def test_daily_buckets(orders_frame):
+    """ทดสอบ count, sum และ mean รายวันเทียบกับ groupby ตามวันที่"""
+    result = resample_time_series(orders_frame, "เวลาสั่งซื้อ", ["จำนวน", "ยอดเงิน"], "D")
+    daily = orders_frame.groupby(orders_frame["เวลาสั่งซื้อ"].dt.date)
+
+    assert result["freq"] == "D"
+    assert result["start"] == "2024-01-01T00:00:00"
+    assert result["count"] == daily.size().tolist()
+    assert result["sum"]["จำนวน"] == daily["จำนวน"].sum().astype(float).tolist()
+    assert result["mean"]["ยอดเงิน"] == pytest.approx(daily["ยอดเงิน"].mean().tolist())
+
+def test_weekly_and_monthly_buckets(orders_frame):
+    """ทดสอบช่วงรายสัปดาห์และรายเดือน โดยช่วงที่ไม่มีข้อมูลมี mean เป็น None"""
+    weekly = resample_time_series(orders_frame, "เวลาสั่งซื้อ", ["จำนวน"], "W")
+    assert weekly["start"] == "2024-01-07T00:00:00"
+    assert sum(weekly["count"]) == len(orders_frame)
+
+    monthly = resample_time_series(orders_frame, "เวลาสั่งซื้อ", ["จำนวน"], "M")
+    assert monthly["count"] == [31 * 24, 29 * 24, 30 * 24]
+
+    gap = orders_frame[orders_frame["เวลาสั่งซื้อ"].dt.day != 2]
+    daily = resample_time_series(gap, "เวลาสั่งซื้อ", ["จำนวน"], "D")
+    assert daily["count"][1] == 0 and daily["mean"]["จำนวน"][1] is None
+
+    with pytest.raises(ValueError):
+        resample_time_series(orders_frame, "เวลาสั่งซื้อ", ["จำนวน"], "H")
+
+def test_auto_frequency():
+    """ทดสอบการเลือกความถี่ตามช่วงเวลาของข้อมูล"""
+    start = pd.Timestamp("2024-01-01")
+    assert choose_frequency(start, start + pd.Timedelta(days=300)) == "D"
+    assert choose_frequency(start, start + pd.Timedelta(days=1000)) == "W"
+    assert choose_frequency(start, start + pd.Timedelta(days=5000)) == "M"
+
+def test_analyze_data_payload(orders_frame, tmp_path):
+    """ทดสอบว่า analyze_data ได้ผลเหมือนกันทั้งสองโหมด และ payload เล็กกว่า dict ตาม timestamp"""
+    file_path = tmp_path / "orders.xlsx"
+    orders_frame.to_excel(file_path, index=False)
+
+    in_memory = ExcelProcessor(file_path).analyze_data(freq="W")
+    chunked = ExcelProcessor(file_path, chunk_size=500).analyze_data(freq="W")
+    assert chunked["time_series"] == in_memory["time_series"]
+
+    series = in_memory["time_series"]["เวลาสั่งซื้อ"]
+    assert set(series["sum"]) == {"จำนวน", "ยอดเงิน"}
+    legacy = orders_frame.groupby("เวลาสั่งซื้อ").size()
+    assert len(json.dumps(series)) * 10 < len(json.dumps({str(k): v for k, v in legacy.items()}))
+
+def test_chunked_time_series_uses_selected_sheet(orders_frame, tmp_path):
+    """ทดสอบว่า analyze_data โหมด chunked สรุปแนวโน้มจาก sheet ที่เลือก ไม่ใช่ sheet แรก"""
+    file_path = tmp_path / "orders.xlsx"
+    archive = orders_frame.head(48).assign(เวลาสั่งซื้อ=pd.date_range("2023-06-01", periods=48, freq="h"))
+    with pd.ExcelWriter(file_path) as writer:
+        archive.to_excel(writer, sheet_name="ปีก่อน", index=False)
+        orders_frame.to_excel(writer, sheet_name="คำสั่งซื้อ", index=False)
+
+    processor = ExcelProcessor(file_path, chunk_size=500, sheet_name="คำสั่งซื้อ")
+    series = processor.analyze_data(freq="M")["time_series"]["เวลาสั่งซื้อ"]
+    expected = resample_time_series(orders_frame, "เวลาสั่งซื้อ", ["จำนวน", "ยอดเงิน"], "M")
+    assert series["start"] == expected["start"]
+    assert series["count"] == expected["count"] == [31 * 24, 29 * 24, 30 * 24]
+    assert series["sum"] == pytest.approx(expected["sum"])
+    assert processor.df is None